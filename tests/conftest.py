@@ -0,0 +1,6 @@
+"""Главный conftest: подключает общие фикстуры и хуки для всех сайтов"""
+
+pytest_plugins = ["tests.shared.conftest"]
+
+# shared подключён как плагин, поэтому не собираем его повторно как обычный conftest
+collect_ignore = ["shared"]
@@ -0,0 +1,241 @@
+"""Артефакты упавших тестов: быстрый захват из браузера, сжатие в фоне и бюджеты размера"""
+import gzip
+import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional, Union
+
+from allure_commons.types import AttachmentType
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+IMAGE_FORMATS = ("png", "jpeg", "webp")
+IMAGE_TYPES = {"png": AttachmentType.PNG, "jpeg": AttachmentType.JPG, "webp": None}
+
+
+@dataclass(frozen=True)
+class ArtifactSettings:
+    """Формат скриншота, порог HTML и бюджеты размера вложений (байты)"""
+    image_format: str = "jpeg"
+    quality: int = 70
+    scale: float = 1.0
+    html_limit: int = 256 * 1024
+    test_budget: int = 5 * 1024 * 1024
+    run_budget: int = 200 * 1024 * 1024
+
+
+@dataclass
+class RawArtifacts:
+    """Сырые данные из браузера, снятые в момент падения (без кодирования)"""
+    url: Optional[str] = None
+    screenshot_png: Optional[bytes] = None
+    page_source: Optional[str] = None
+    console: list = field(default_factory=list)
+    network_events: list = field(default_factory=list)
+    mhtml: Optional[str] = None
+    errors: list = field(default_factory=list)
+
+
+@dataclass
+class Artifact:
+    """Готовое вложение Allure"""
+    name: str
+    body: Union[bytes, str]
+    attachment_type: Optional[AttachmentType] = None
+    extension: Optional[str] = None
+
+    @property
+    def size(self) -> int:
+        return len(self.body.encode("utf-8") if isinstance(self.body, str) else self.body)
+
+
+def capture(driver: WebDriver, network_events) -> RawArtifacts:
+    """Снять всё нужное из браузера: только быстрые вызовы WebDriver/CDP, кодирование — потом"""
+    raw = RawArtifacts(network_events=list(network_events))
+    steps = {
+        "url": lambda: setattr(raw, "url", driver.current_url),
+        "screenshot": lambda: setattr(raw, "screenshot_png", driver.get_screenshot_as_png()),
+        "html": lambda: setattr(raw, "page_source", driver.page_source),
+        "console": lambda: setattr(raw, "console", driver.get_log("browser")),
+        # MHTML — снимок DOM вместе с CSS и картинками, открывается в браузере как страница
+        "dom": lambda: setattr(raw, "mhtml", driver.execute_cdp_cmd("Page.captureSnapshot", {"format": "mhtml"})["data"]),
+    }
+    for name, step in steps.items():
+        try:
+            step()
+        except (AttributeError, KeyError, WebDriverException) as e:
+            raw.errors.append(f"{name}: {type(e).__name__}: {e}")
+    return raw
+
+
+def compress_screenshot(png: bytes, settings: ArtifactSettings) -> Artifact:
+    """Перекодировать скриншот в заданный формат, качество и масштаб; без Pillow — оставить PNG"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return Artifact("Скриншот при падении", png, AttachmentType.PNG)
+    if settings.image_format == "png" and settings.scale >= 1:
+        return Artifact("Скриншот при падении", png, AttachmentType.PNG)
+
+    with Image.open(io.BytesIO(png)) as image:
+        image = image.convert("RGB")
+        if settings.scale < 1:
+            size = (max(1, round(image.width * settings.scale)), max(1, round(image.height * settings.scale)))
+            image = image.resize(size, Image.LANCZOS)
+        buffer = io.BytesIO()
+        options = {"optimize": True} if settings.image_format == "png" else {"quality": settings.quality}
+        image.save(buffer, format=settings.image_format.upper(), **options)
+    return Artifact(
+        "Скриншот при падении",
+        buffer.getvalue(),
+        IMAGE_TYPES[settings.image_format],
+        extension=settings.image_format,
+    )
+
+
+def pack_text(name: str, text: str, limit: int, attachment_type: AttachmentType, extension: str) -> Artifact:
+    """Небольшой текст прикрепить как есть, большой — сжать gzip (скачивается из отчёта)"""
+    body = text.encode("utf-8")
+    if len(body) <= limit:
+        return Artifact(name, text, attachment_type)
+    return Artifact(f"{name} ({len(body) // 1024} КБ, gzip)", gzip.compress(body), extension=f"{extension}.gz")
+
+
+def _headers(headers: dict) -> list:
+    return [{"name": name, "value": str(value)} for name, value in (headers or {}).items()]
+
+
+def build_har(events) -> dict:
+    """HAR 1.2 из CDP-событий Network.* performance-лога"""
+    entries = {}
+    for event in events:
+        params = event.get("params", {})
+        request_id = params.get("requestId")
+        method = event.get("method")
+        if method == "Network.requestWillBeSent":
+            request = params["request"]
+            started = datetime.fromtimestamp(params.get("wallTime", 0), tz=timezone.utc)
+            entries[request_id] = {
+                "startedDateTime": started.isoformat(timespec="milliseconds"),
+                "time": 0,
+                "_start": params.get("timestamp", 0),
+                "request": {
+                    "method": request.get("method", "GET"),
+                    "url": request.get("url", ""),
+                    "httpVersion": "",
+                    "headers": _headers(request.get("headers")),
+                    "queryString": [],
+                    "cookies": [],
+                    "headersSize": -1,
+                    "bodySize": -1,
+                },
+                "response": {
+                    "status": 0,
+                    "statusText": "",
+                    "httpVersion": "",
+                    "headers": [],
+                    "cookies": [],
+                    "content": {"size": 0, "mimeType": ""},
+                    "redirectURL": "",
+                    "headersSize": -1,
+                    "bodySize": -1,
+                },
+                "cache": {},
+                "timings": {"send": 0, "wait": 0, "receive": 0},
+            }
+            continue
+        entry = entries.get(request_id)
+        if entry is None:
+            continue
+        if method == "Network.responseReceived":
+            response = params["response"]
+            entry["response"].update(
+                status=response.get("status", 0),
+                statusText=response.get("statusText", ""),
+                httpVersion=response.get("protocol", ""),
+                headers=_headers(response.get("headers")),
+                content={"size": 0, "mimeType": response.get("mimeType", "")},
+            )
+        elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+            entry["time"] = max(0.0, (params.get("timestamp", 0) - entry["_start"]) * 1000)
+            entry["timings"]["receive"] = entry["time"]
+            if method == "Network.loadingFinished":
+                entry["response"]["bodySize"] = params.get("encodedDataLength", -1)
+                entry["response"]["content"]["size"] = params.get("encodedDataLength", 0)
+            else:
+                entry["response"]["_error"] = params.get("errorText") or params.get("blockedReason", "")
+    for entry in entries.values():
+        del entry["_start"]
+    return {"log": {"version": "1.2", "creator": {"name": "pytest", "version": ""}, "entries": list(entries.values())}}
+
+
+def encode(raw: RawArtifacts, settings: ArtifactSettings) -> list:
+    """Подготовить вложения в порядке важности: при нехватке бюджета отбрасываются последние"""
+    artifacts = []
+    if raw.screenshot_png:
+        artifacts.append(compress_screenshot(raw.screenshot_png, settings))
+    if raw.url:
+        artifacts.append(Artifact("URL страницы", raw.url, AttachmentType.TEXT))
+    if raw.console:
+        lines = "\n".join(f"[{entry.get('level')}] {entry.get('message')}" for entry in raw.console)
+        artifacts.append(pack_text("Консоль браузера", lines, settings.html_limit, AttachmentType.TEXT, "txt"))
+    if raw.network_events:
+        har = json.dumps(build_har(raw.network_events), ensure_ascii=False)
+        artifacts.append(pack_text("Сетевые запросы (HAR)", har, settings.html_limit, AttachmentType.JSON, "har"))
+    if raw.page_source:
+        artifacts.append(pack_text("HTML страницы", raw.page_source, settings.html_limit, AttachmentType.HTML, "html"))
+    if raw.mhtml:
+        # MHTML всегда сжимаем: он содержит картинки и стили страницы
+        artifacts.append(Artifact("Снимок DOM (MHTML, gzip)", gzip.compress(raw.mhtml.encode("utf-8")), extension="mhtml.gz"))
+    if raw.errors:
+        artifacts.append(Artifact("Не удалось снять артефакты", "\n".join(raw.errors), AttachmentType.TEXT))
+    return artifacts
+
+
+class ArtifactPipeline:
+    """Очередь кодирования артефактов в фоне; вложения забираются до закрытия теста в Allure"""
+
+    def __init__(self, settings: ArtifactSettings, workers: int = 2):
+        self.settings = settings
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="artifacts")
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.attached_bytes = 0
+        self.dropped = 0
+
+    def submit(self, nodeid: str, raw: RawArtifacts):
+        """Поставить кодирование в очередь и сразу вернуться"""
+        self._pending[nodeid] = self._executor.submit(encode, raw, self.settings)
+
+    def collect(self, nodeid: str) -> list:
+        """Дождаться вложений теста и отобрать те, что помещаются в бюджеты теста и прогона"""
+        future = self._pending.pop(nodeid, None)
+        if future is None:
+            return []
+        artifacts = future.result()
+        kept, skipped, test_bytes = [], [], 0
+        with self._lock:
+            for artifact in artifacts:
+                size = artifact.size
+                fits_test = test_bytes + size <= self.settings.test_budget
+                fits_run = self.attached_bytes + size <= self.settings.run_budget
+                if fits_test and fits_run:
+                    kept.append(artifact)
+                    test_bytes += size
+                    self.attached_bytes += size
+                else:
+                    skipped.append(f"{artifact.name}: {size // 1024} КБ")
+            self.dropped += len(skipped)
+        if skipped:
+            kept.append(Artifact(
+                "Артефакты вне бюджета",
+                "Не прикреплены из-за бюджета размера:\n" + "\n".join(skipped),
+                AttachmentType.TEXT,
+            ))
+        return kept
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,180 @@
+"""Создание браузера и его переиспользование между тестами"""
+import os
+import shutil
+import socket
+from pathlib import Path
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from tests.shared.profiles import BrowserProfile
+from tests.shared.readiness import install_request_tracker
+from tests.shared.viewports import clear_viewport
+
+# Размер окна по умолчанию, который восстанавливается после каждого теста
+WINDOW_SIZE = (1920, 1080)
+
+
+def worker_id() -> str:
+    """Имя xdist-воркера (gw0, gw1, ...) или master при запуске без xdist"""
+    return os.getenv("PYTEST_XDIST_WORKER", "master")
+
+
+def free_port() -> int:
+    """Свободный локальный порт для remote debugging"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def create_driver(
+    driver_path: str,
+    user_data_dir: Path,
+    profile: BrowserProfile,
+    page_load_strategy: str = "normal",
+) -> WebDriver:
+    """Запустить новый экземпляр Chrome с собственным профилем и портом отладки"""
+    options = webdriver.ChromeOptions()
+    profile.apply(options)
+    # eager/none: driver.get не ждёт картинок и трекеров, готовность проверяют условия page object
+    options.page_load_strategy = page_load_strategy
+    # Отдельный профиль и порт, чтобы параллельные воркеры не делили состояние Chrome
+    options.add_argument(f"--user-data-dir={user_data_dir}")
+    options.add_argument(f"--remote-debugging-port={free_port()}")
+    # Консоль нужна проверке JS-ошибок, performance-лог — отчёту о сетевых запросах
+    options.set_capability("goog:loggingPrefs", {"browser": "ALL", "performance": "ALL"})
+
+    # Путь к ChromeDriver ищется один раз на прогон (см. driver_resolver)
+    service = Service(driver_path)
+    driver = webdriver.Chrome(service=service, options=options)
+    driver.set_window_size(*WINDOW_SIZE)
+    install_request_tracker(driver)
+    driver.user_data_dir = user_data_dir
+    return driver
+
+
+def process_tree_rss(driver: WebDriver):
+    """Суммарная память (RSS, байты) chromedriver и всех процессов Chrome; None вне Linux"""
+    process = getattr(driver.service, "process", None)
+    proc = Path("/proc")
+    if process is None or not proc.is_dir():
+        return None
+
+    # Строим дерево процессов по /proc: ppid -> дети и pid -> RSS в страницах
+    children, pages = {}, {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+            statm = (entry / "statm").read_text()
+        except OSError:
+            continue
+        # Имя процесса в скобках может содержать пробелы, поэтому режем по последней ')'
+        fields = stat[stat.rindex(")") + 2:].split()
+        children.setdefault(int(fields[1]), []).append(int(entry.name))
+        pages[int(entry.name)] = int(statm.split()[1])
+
+    total, queue = 0, [process.pid]
+    while queue:
+        pid = queue.pop()
+        total += pages.get(pid, 0)
+        queue.extend(children.get(pid, ()))
+    return total * os.sysconf("SC_PAGE_SIZE")
+
+
+def quit_driver(driver: WebDriver):
+    """Закрыть браузер и удалить его профиль"""
+    try:
+        driver.quit()
+    except WebDriverException:
+        pass
+    user_data_dir = getattr(driver, "user_data_dir", None)
+    if user_data_dir is not None:
+        shutil.rmtree(user_data_dir, ignore_errors=True)
+
+
+def reset_driver(driver: WebDriver):
+    """Быстро сбросить состояние браузера между тестами"""
+    # Закрываем все лишние окна и вкладки, оставляем первое
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+
+    # Storage привязан к origin, поэтому чистим его до ухода на about:blank
+    try:
+        driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    except WebDriverException:
+        # На about:blank и data:-страницах storage недоступен — чистить нечего
+        pass
+
+    # CDP чистит cookies всех доменов, WebDriver — только текущего
+    try:
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    except (AttributeError, WebDriverException):
+        driver.delete_all_cookies()
+    # Блоклист живёт, пока жив браузер: следующий тест (другой сайт, --no-blocklist) его не наследует
+    try:
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+    except (AttributeError, WebDriverException):
+        pass
+
+    driver.get("about:blank")
+    clear_viewport(driver)
+    driver.set_window_size(*WINDOW_SIZE)
+    # Консоль прошлых тестов не должна попасть в проверку JS-ошибок и артефакты следующего
+    try:
+        driver.get_log("browser")
+    except WebDriverException:
+        pass
+
+
+def is_alive(driver: WebDriver) -> bool:
+    """Проверить, что сессия браузера ещё отвечает"""
+    try:
+        driver.window_handles
+        return True
+    except WebDriverException:
+        return False
+
+
+class BrowserPool:
+    """Один браузер на профиль в рамках сессии (или xdist-воркера) со сбросом между тестами"""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._drivers = {}
+
+    def acquire(self, profile: str, reset: bool = True) -> WebDriver:
+        """Получить готовый к тесту браузер нужного профиля (reset=False — оставить открытую страницу)"""
+        driver = self._drivers.get(profile)
+        if driver is not None:
+            try:
+                if reset:
+                    reset_driver(driver)
+                elif not is_alive(driver):
+                    raise WebDriverException("Сессия браузера не отвечает")
+                return driver
+            except WebDriverException:
+                # Сессия сломалась (упал Chrome, завис драйвер) — поднимаем новую
+                quit_driver(self._drivers.pop(profile))
+
+        driver = self._drivers[profile] = self._factory(profile)
+        return driver
+
+    def current(self, profile: str):
+        """Браузер профиля, если он уже запущен"""
+        return self._drivers.get(profile)
+
+    def finish_test(self, profile: str):
+        """Тест закончился; локальный пул держит браузер до конца сессии (см. RemoteBrowserPool)"""
+
+    def close(self):
+        """Закрыть все браузеры пула"""
+        for driver in self._drivers.values():
+            quit_driver(driver)
+        self._drivers.clear()
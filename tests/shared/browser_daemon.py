@@ -0,0 +1,502 @@
+"""Локальный демон тёплых браузеров: Chrome запускается заранее и переживает запуски pytest"""
+import argparse
+import json
+import os
+import secrets
+import signal
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from tests.shared.browser import create_driver, is_alive, process_tree_rss, quit_driver, reset_driver
+from tests.shared.driver_resolver import ENV_OFFLINE, LOCKFILE_NAME, ROOT_DIR, resolve_chromedriver
+from tests.shared.profiles import DEFAULT_PROFILE, PROFILES
+
+# Адрес и токен запущенного демона: <rootdir>/.cache/browser-daemon.json
+STATE_PATH = Path(".cache") / "browser-daemon.json"
+TOKEN_HEADER = "X-Daemon-Token"
+HEALTH_CHECK = "health-check"
+
+
+class DaemonError(RuntimeError):
+    """Демон недоступен или не смог выдать браузер"""
+
+
+class PoolExhausted(DaemonError):
+    """Все браузеры демона выданы, а лимит размера пула достигнут"""
+
+
+@dataclass(frozen=True)
+class DaemonSettings:
+    """Лимиты пула демона"""
+    # Сколько браузеров держит демон всего: выданные и свободные
+    size: int = 4
+    # Сколько свободных браузеров профиля по умолчанию держать запущенными
+    warm: int = 2
+    profile: str = DEFAULT_PROFILE
+    page_load_strategy: str = "normal"
+    # Браузер перезапускается после стольких тестов или при такой памяти дерева процессов Chrome
+    max_tests: int = 50
+    max_rss: int = 1536 * 1024 * 1024
+    health_interval: float = 30
+    # Сколько ждать освобождения браузера, когда пул заполнен
+    lease_timeout: float = 60
+
+
+@dataclass
+class WarmBrowser:
+    """Браузер демона: профиль, число тестов с последнего запуска и текущая выдача"""
+    key: tuple
+    driver: WebDriver
+    tests: int = 0
+    lease: Optional[str] = None
+    started: float = field(default_factory=time.time)
+
+    def lease_info(self) -> dict:
+        """Всё, что нужно клиенту, чтобы подключиться к сессии по протоколу WebDriver"""
+        return {
+            "lease": self.lease,
+            "executor": self.driver.service.service_url,
+            "session_id": self.driver.session_id,
+            "capabilities": self.driver.caps,
+        }
+
+
+class WarmPool:
+    """Браузеры демона: выдача, возврат со сбросом, проверки здоровья и перезапуск по лимитам"""
+
+    def __init__(self, factory, settings: DaemonSettings, rss=process_tree_rss, reset=reset_driver,
+                 alive=is_alive, quit=quit_driver):
+        # factory(profile, page_load_strategy) -> WebDriver
+        self._factory = factory
+        self.settings = settings
+        self._rss = rss
+        self._reset = reset
+        self._alive = alive
+        self._quit = quit
+        self._browsers = []
+        # Браузеры, которые запускаются прямо сейчас: занимают место в пуле
+        self._launching = 0
+        self._changed = threading.Condition()
+        self.stats = {"launched": 0, "leases": 0, "recycled": 0, "unhealthy": 0}
+
+    @property
+    def default_key(self) -> tuple:
+        return (self.settings.profile, self.settings.page_load_strategy)
+
+    def lease(self, profile: str, page_load_strategy: str, timeout: float = None) -> WarmBrowser:
+        """Выдать свободный браузер профиля; нет свободного — запустить новый, если позволяет лимит"""
+        key = (profile, page_load_strategy)
+        deadline = time.monotonic() + (self.settings.lease_timeout if timeout is None else timeout)
+        while True:
+            evicted = None
+            with self._changed:
+                browser = next((b for b in self._browsers if b.lease is None and b.key == key), None)
+                if browser is None and self._free_slots() == 0:
+                    # Свободный браузер другого профиля уступает место нужному
+                    evicted = next((b for b in self._browsers if b.lease is None), None)
+                    if evicted is not None:
+                        self._browsers.remove(evicted)
+                if browser is None and (self._free_slots() > 0 or evicted is not None):
+                    self._launching += 1
+                elif browser is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolExhausted(f"Все {self.settings.size} браузеров демона заняты")
+                    self._changed.wait(remaining)
+                    continue
+                else:
+                    browser.lease = uuid.uuid4().hex
+            if evicted is not None:
+                self._quit(evicted.driver)
+            if browser is None:
+                browser = self._launch(key, leased=True)
+            elif not self._alive(browser.driver):
+                self._discard(browser, unhealthy=True)
+                continue
+            self.stats["leases"] += 1
+            return browser
+
+    def checkin(self, lease: str) -> bool:
+        """Тест на выданном браузере закончился; True — браузер пора вернуть на перезапуск"""
+        browser = self._find(lease)
+        browser.tests += 1
+        return self._worn_out(browser)
+
+    def release(self, lease: str, healthy: bool = True):
+        """Вернуть браузер: сбросить и отдать следующему клиенту или перезапустить по лимитам"""
+        browser = self._find(lease)
+        if not healthy or self._worn_out(browser):
+            self._discard(browser, unhealthy=not healthy)
+        else:
+            try:
+                self._reset(browser.driver)
+            except WebDriverException:
+                self._discard(browser, unhealthy=True)
+            else:
+                with self._changed:
+                    browser.lease = None
+                    self._changed.notify_all()
+        self.fill()
+
+    def fill(self):
+        """Держать settings.warm свободных браузеров профиля по умолчанию, пока есть место в пуле"""
+        while True:
+            with self._changed:
+                idle = sum(1 for b in self._browsers if b.lease is None and b.key == self.default_key)
+                if idle + self._launching >= self.settings.warm or self._free_slots() == 0:
+                    return
+                self._launching += 1
+            try:
+                self._launch(self.default_key, leased=False)
+            except (WebDriverException, OSError):
+                # Chrome не запустился — попробуем при следующей проверке здоровья
+                return
+
+    def check_health(self):
+        """Свободные браузеры, которые не отвечают или разрослись по памяти, перезапускаются"""
+        with self._changed:
+            idle = [b for b in self._browsers if b.lease is None]
+            # На время проверки браузер занят, чтобы его не выдали клиенту
+            for browser in idle:
+                browser.lease = HEALTH_CHECK
+        for browser in idle:
+            if not self._alive(browser.driver):
+                self._discard(browser, unhealthy=True)
+            elif self._worn_out(browser):
+                self._discard(browser)
+            else:
+                with self._changed:
+                    browser.lease = None
+                    self._changed.notify_all()
+        self.fill()
+
+    def status(self) -> dict:
+        with self._changed:
+            browsers = [
+                {"profile": b.key[0], "page_load_strategy": b.key[1], "tests": b.tests,
+                 "leased": b.lease is not None, "uptime_seconds": round(time.time() - b.started)}
+                for b in self._browsers
+            ]
+        return {"settings": asdict(self.settings), "stats": dict(self.stats), "browsers": browsers}
+
+    def close(self):
+        with self._changed:
+            browsers, self._browsers = self._browsers, []
+        for browser in browsers:
+            self._quit(browser.driver)
+
+    def _free_slots(self) -> int:
+        return self.settings.size - len(self._browsers) - self._launching
+
+    def _find(self, lease: str) -> WarmBrowser:
+        with self._changed:
+            browser = next((b for b in self._browsers if b.lease == lease), None)
+        if browser is None:
+            raise KeyError(f"Выдача {lease} не найдена")
+        return browser
+
+    def _worn_out(self, browser: WarmBrowser) -> bool:
+        if browser.tests >= self.settings.max_tests:
+            return True
+        rss = self._rss(browser.driver)
+        return rss is not None and rss > self.settings.max_rss
+
+    def _launch(self, key: tuple, leased: bool) -> WarmBrowser:
+        try:
+            driver = self._factory(*key)
+        finally:
+            with self._changed:
+                self._launching -= 1
+                self._changed.notify_all()
+        browser = WarmBrowser(key, driver, lease=uuid.uuid4().hex if leased else None)
+        with self._changed:
+            self._browsers.append(browser)
+            self.stats["launched"] += 1
+            self._changed.notify_all()
+        return browser
+
+    def _discard(self, browser: WarmBrowser, unhealthy: bool = False):
+        with self._changed:
+            if browser in self._browsers:
+                self._browsers.remove(browser)
+            self.stats["unhealthy" if unhealthy else "recycled"] += 1
+            self._changed.notify_all()
+        self._quit(browser.driver)
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    """JSON API демона: /lease, /checkin, /release, /status, /shutdown"""
+
+    def do_GET(self):
+        if self.path == "/status":
+            self._respond(200, self.server.pool.status())
+        else:
+            self._respond(404, {"error": self.path})
+
+    def do_POST(self):
+        if self.headers.get(TOKEN_HEADER) != self.server.token:
+            self._respond(403, {"error": "неверный токен"})
+            return
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        pool = self.server.pool
+        if self.path == "/release":
+            self._respond(200, {})
+            # Сброс браузера идёт после ответа: клиент его не ждёт
+            try:
+                pool.release(payload["lease"], payload.get("healthy", True))
+            except KeyError:
+                pass
+            return
+        try:
+            if self.path == "/lease":
+                browser = pool.lease(payload["profile"], payload["page_load_strategy"])
+                self._respond(200, browser.lease_info())
+            elif self.path == "/checkin":
+                self._respond(200, {"recycle": pool.checkin(payload["lease"])})
+            elif self.path == "/shutdown":
+                self._respond(200, {})
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            else:
+                self._respond(404, {"error": self.path})
+        except PoolExhausted as e:
+            self._respond(503, {"error": str(e)})
+        except KeyError as e:
+            self._respond(404, {"error": str(e.args[0])})
+        except WebDriverException as e:
+            self._respond(500, {"error": e.msg or type(e).__name__})
+
+    def _respond(self, status: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class DaemonServer(ThreadingHTTPServer):
+    """HTTP-сервер демона: слушает только 127.0.0.1, запросы подписаны токеном из файла состояния"""
+    daemon_threads = True
+
+    def __init__(self, pool: WarmPool, port: int = 0):
+        super().__init__(("127.0.0.1", port), DaemonHandler)
+        self.pool = pool
+        self.token = secrets.token_hex(16)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address
+        return f"http://{host}:{port}"
+
+
+class DaemonClient:
+    """Клиент демона; прокси из окружения не используются — демон только локальный"""
+
+    def __init__(self, url: str, token: str, timeout: float = 120):
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+        self._opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+    @classmethod
+    def from_state(cls, state_path: Path) -> Optional["DaemonClient"]:
+        """Клиент запущенного демона или None, если демон не запущен или не отвечает"""
+        try:
+            state = json.loads(state_path.read_text(encoding="utf-8"))
+            client = cls(state["url"], state["token"])
+            client.status()
+        except (OSError, ValueError, KeyError, DaemonError):
+            return None
+        return client
+
+    def lease(self, profile: str, page_load_strategy: str) -> dict:
+        return self._call("/lease", {"profile": profile, "page_load_strategy": page_load_strategy})
+
+    def checkin(self, lease: str) -> bool:
+        return self._call("/checkin", {"lease": lease})["recycle"]
+
+    def release(self, lease: str, healthy: bool = True):
+        self._call("/release", {"lease": lease, "healthy": healthy})
+
+    def status(self) -> dict:
+        return self._call("/status")
+
+    def shutdown(self):
+        self._call("/shutdown", {})
+
+    def _call(self, path: str, payload: dict = None) -> dict:
+        data = json.dumps(payload).encode() if payload is not None else None
+        request = urllib.request.Request(f"{self.url}{path}", data=data, headers={TOKEN_HEADER: self.token})
+        try:
+            with self._opener.open(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise DaemonError(f"{path}: {json.loads(e.read() or b'{}').get('error', e.code)}") from e
+        except (OSError, ValueError) as e:
+            raise DaemonError(f"Демон браузеров {self.url} не отвечает: {e}") from e
+
+
+class AttachedChrome(WebDriver):
+    """Remote WebDriver, подключённый к уже открытой сессии демона, с командами CDP как у Chrome"""
+
+    def __init__(self, lease: dict):
+        self._lease = lease
+        connection = ChromiumRemoteConnection(lease["executor"], "goog", "chrome", keep_alive=True)
+        super().__init__(command_executor=connection, options=webdriver.ChromeOptions())
+        # Процессами браузера владеет демон: память считает он, профиль удаляет тоже он
+        self.service = None
+        self.user_data_dir = None
+
+    def start_session(self, capabilities: dict):
+        self.session_id = self._lease["session_id"]
+        self.caps = self._lease["capabilities"]
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: dict):
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})["value"]
+
+    def quit(self):
+        # Сессия принадлежит демону: клиент возвращает браузер через release, а не закрывает его
+        self.command_executor.close()
+
+
+class RemoteBrowserPool:
+    """Пул pytest поверх демона: тот же интерфейс, что у BrowserPool, браузеры берутся в аренду"""
+
+    def __init__(self, client: DaemonClient, page_load_strategy: str):
+        self.client = client
+        self.page_load_strategy = page_load_strategy
+        # Профиль -> (номер выдачи, подключённый браузер)
+        self._leases = {}
+
+    def acquire(self, profile: str, reset: bool = True) -> WebDriver:
+        """Браузер профиля; свежая выдача демона уже сброшена, дальше сбрасываем между тестами сами"""
+        held = self._leases.get(profile)
+        if held is not None:
+            lease, driver = held
+            try:
+                if reset:
+                    reset_driver(driver)
+                elif not is_alive(driver):
+                    raise WebDriverException("Сессия браузера не отвечает")
+                return driver
+            except WebDriverException:
+                self._release(profile, healthy=False)
+
+        lease = self.client.lease(profile, self.page_load_strategy)
+        driver = AttachedChrome(lease)
+        self._leases[profile] = (lease["lease"], driver)
+        return driver
+
+    def current(self, profile: str):
+        held = self._leases.get(profile)
+        return held[1] if held is not None else None
+
+    def finish_test(self, profile: str):
+        """Отметить тест у демона; изношенный браузер возвращается, следующий тест получит новый"""
+        held = self._leases.get(profile)
+        if held is not None and self.client.checkin(held[0]):
+            self._release(profile)
+
+    def close(self):
+        for profile in list(self._leases):
+            self._release(profile)
+
+    def _release(self, profile: str, healthy: bool = True):
+        lease, driver = self._leases.pop(profile)
+        driver.quit()
+        try:
+            self.client.release(lease, healthy)
+        except DaemonError:
+            # Демон остановлен: браузер закрылся вместе с ним
+            pass
+
+
+def serve(settings: DaemonSettings, state_path: Path, port: int = 0, offline: bool = False):
+    """Запустить демон в текущем процессе и работать до /shutdown или SIGTERM"""
+    driver_path = resolve_chromedriver(ROOT_DIR / LOCKFILE_NAME, offline=offline).path
+
+    def factory(profile: str, page_load_strategy: str) -> WebDriver:
+        user_data_dir = Path(tempfile.mkdtemp(prefix="warm-chrome-"))
+        return create_driver(driver_path, user_data_dir, PROFILES[profile], page_load_strategy)
+
+    pool = WarmPool(factory, settings)
+    server = DaemonServer(pool, port)
+    stopped = threading.Event()
+
+    def health_loop():
+        while not stopped.wait(settings.health_interval):
+            pool.check_health()
+
+    signal.signal(signal.SIGTERM, lambda *args: threading.Thread(target=server.shutdown, daemon=True).start())
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    # Токен в файле с правами 0600: другие пользователи машины не получат чужие браузеры
+    fd = os.open(state_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as state:
+        json.dump({"url": server.url, "token": server.token, "pid": os.getpid()}, state)
+    print(f"Демон браузеров слушает {server.url}, состояние: {state_path}", flush=True)
+    threading.Thread(target=pool.fill, daemon=True).start()
+    threading.Thread(target=health_loop, daemon=True).start()
+    try:
+        server.serve_forever()
+    finally:
+        stopped.set()
+        server.server_close()
+        state_path.unlink(missing_ok=True)
+        pool.close()
+
+
+def main(argv=None):
+    """Демон тёплых браузеров: serve — запустить, status — состояние пула, stop — остановить"""
+    defaults = DaemonSettings()
+    parser = argparse.ArgumentParser(prog="python -m tests.shared.browser_daemon", description=main.__doc__)
+    parser.add_argument("command", choices=("serve", "status", "stop"))
+    parser.add_argument("--state", type=Path, default=ROOT_DIR / STATE_PATH, help="Файл с адресом и токеном демона")
+    parser.add_argument("--port", type=int, default=0, help="Порт на 127.0.0.1 (по умолчанию любой свободный)")
+    parser.add_argument("--size", type=int, default=defaults.size, help="Сколько браузеров держать всего")
+    parser.add_argument("--warm", type=int, default=defaults.warm, help="Сколько свободных браузеров держать готовыми")
+    parser.add_argument("--profile", choices=list(PROFILES), default=defaults.profile)
+    parser.add_argument("--page-load-strategy", default=defaults.page_load_strategy)
+    parser.add_argument("--max-tests", type=int, default=defaults.max_tests, help="Перезапуск после стольких тестов")
+    parser.add_argument("--max-rss-mb", type=int, default=defaults.max_rss // 1024 // 1024,
+                        help="Перезапуск, когда память Chrome больше стольких МБ")
+    parser.add_argument("--health-interval", type=float, default=defaults.health_interval)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        settings = DaemonSettings(
+            size=args.size, warm=min(args.warm, args.size), profile=args.profile,
+            page_load_strategy=args.page_load_strategy, max_tests=args.max_tests,
+            max_rss=args.max_rss_mb * 1024 * 1024, health_interval=args.health_interval,
+        )
+        serve(settings, args.state.resolve(), args.port, offline=os.getenv(ENV_OFFLINE, "") not in ("", "0"))
+        return 0
+    client = DaemonClient.from_state(args.state)
+    if client is None:
+        print(f"Демон браузеров не запущен ({args.state})", file=sys.stderr)
+        return 1
+    if args.command == "status":
+        print(json.dumps(client.status(), ensure_ascii=False, indent=2))
+    else:
+        client.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
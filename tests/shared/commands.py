@@ -0,0 +1,97 @@
+"""Учёт команд WebDriver: число по типам, гистограмма задержек и бюджет команд на тест"""
+import bisect
+import time
+from collections import Counter
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+# Верхние границы корзин гистограммы задержек, мс; последняя корзина — всё, что дольше
+LATENCY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+def bucket_labels() -> list:
+    edges = ("0",) + tuple(str(edge) for edge in LATENCY_BUCKETS)
+    return [f"{low}-{high} мс" for low, high in zip(edges, edges[1:])] + [f">{LATENCY_BUCKETS[-1]} мс"]
+
+
+class CommandStats:
+    """Команды одного теста или всего прогона; data — словарь, пригодный для user_properties"""
+
+    def __init__(self, data: dict = None):
+        data = data or {}
+        self.counts = Counter(data.get("counts", {}))
+        self.seconds = Counter(data.get("seconds", {}))
+        self.histogram = list(data.get("histogram", [0] * (len(LATENCY_BUCKETS) + 1)))
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def record(self, command: str, seconds: float):
+        self.counts[command] += 1
+        self.seconds[command] += seconds
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS, seconds * 1000)] += 1
+
+    def merge(self, other: "CommandStats"):
+        self.counts.update(other.counts)
+        self.seconds.update(other.seconds)
+        self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+
+    @property
+    def data(self) -> dict:
+        return {"counts": dict(self.counts), "seconds": dict(self.seconds), "histogram": self.histogram}
+
+    def lines(self, top: int = 10) -> list:
+        """Таблица команд по числу вызовов и гистограмма задержек"""
+        result = [f"Команд WebDriver: {self.total}, время в командах: {sum(self.seconds.values()):.2f} с"]
+        for command, count in self.counts.most_common(top):
+            result.append(
+                f"  {command:<28} x{count:<6} среднее {self.seconds[command] / count * 1000:7.1f} мс"
+            )
+        peak = max(self.histogram) or 1
+        for label, count in zip(bucket_labels(), self.histogram):
+            if count:
+                result.append(f"  {label:>12} {'#' * max(1, round(count / peak * 40))} {count}")
+        return result
+
+
+class CommandLog:
+    """Обёртка над driver.execute: каждая команда засчитывается текущему тесту и подписчикам"""
+
+    def __init__(self, driver: WebDriver):
+        self.stats = CommandStats()
+        self.listeners = []
+        execute = type(driver).execute.__get__(driver)
+
+        def logged(driver_command, params=None):
+            started = time.perf_counter()
+            try:
+                return execute(driver_command, params)
+            finally:
+                seconds = time.perf_counter() - started
+                self.stats.record(driver_command, seconds)
+                for listener in self.listeners:
+                    listener(driver_command, seconds)
+
+        driver.execute = logged
+
+    def subscribe(self, listener):
+        """Вызывать listener(команда, секунды) после каждой команды"""
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def start(self):
+        """Начать счёт команд нового теста"""
+        self.stats = CommandStats()
+
+    def stop(self) -> CommandStats:
+        stats, self.stats = self.stats, CommandStats()
+        return stats
+
+
+def command_log(driver: WebDriver) -> CommandLog:
+    """Журнал команд браузера; обёртка ставится один раз и живёт, пока жив браузер"""
+    log = getattr(driver, "command_log", None)
+    if log is None:
+        log = driver.command_log = CommandLog(driver)
+    return log
@@ -1,68 +1,912 @@
 """Общие фикстуры и хуки для всех сайтов"""
+import os
+import time
+import warnings
+from contextlib import ExitStack
+from pathlib import Path
+
 import allure
+import allure_commons
 import pytest
-from allure_commons.types import AttachmentType
+from allure_commons.types import AttachmentType, LabelType
 from selene import browser
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+
+from tests.shared.artifacts import IMAGE_FORMATS, ArtifactPipeline, ArtifactSettings, capture
+from tests.shared.browser import BrowserPool, create_driver, process_tree_rss, quit_driver, worker_id
+from tests.shared.browser_daemon import STATE_PATH, DaemonClient, RemoteBrowserPool
+from tests.shared.commands import CommandStats, command_log
+from tests.shared.crawler import CrawlCache, crawl, fetch_pages
+from tests.shared.driver_resolver import ENV_OFFLINE, LOCKFILE_NAME, DriverResolution, resolve_chromedriver
+from tests.shared.history import HistoryEntry, RunHistory, RunRecorder, schedule
+from tests.shared.incremental import (
+    CachedPass,
+    IncrementalStore,
+    bound_pages,
+    code_fingerprint,
+    fingerprint_of,
+    page_urls,
+)
+from tests.shared.link_checker import LinkChecker
+from tests.shared.network import block_urls, blocked_requests, network_events
+from tests.shared.profiles import DEFAULT_PROFILE, PROFILES, ProfileStats, at_least
+from tests.shared.readiness import PAGE_LOAD_STRATEGIES
+from tests.shared.replay import ReplayArchive, ReplayArchiveError, ReplayServer, record_site
+from tests.shared.sites import Site, SiteRegistry
+from tests.shared.step_profiler import StepProfiler
+from tests.shared.viewports import viewport_params
+from tests.shared.visual import VisualChecker, VisualStore
+
+BROWSER_MODES = ("reuse", "fresh")
+SITE_MODES = ("live", "replay", "record")
+DRIVER_KEY = pytest.StashKey[DriverResolution]()
+PROFILE_STATS_KEY = pytest.StashKey[ProfileStats]()
+# Открытые сценариями страницы: имя сценария -> (браузер, page object)
+SCENARIO_PAGES_KEY = pytest.StashKey[dict]()
+# Найденные обходом пути страниц: базовый URL -> список путей
+SITE_PATHS_KEY = pytest.StashKey[dict]()
+ARTIFACTS_KEY = pytest.StashKey[ArtifactPipeline]()
+# Профиль шагов Allure включается опцией --step-profile
+STEP_PROFILER_KEY = pytest.StashKey[StepProfiler]()
+# Декоратор ожиданий selene до включения профиля шагов
+WAIT_DECORATOR_KEY = pytest.StashKey[object]()
+STEP_PROFILE_PATH_KEY = pytest.StashKey[Path]()
+# История последних прогонов: nodeid -> HistoryEntry
+HISTORY_KEY = pytest.StashKey[dict]()
+RUN_RECORDER_KEY = pytest.StashKey[RunRecorder]()
+# Реестр сайтов из tests/sites/<slug>/site.py
+REGISTRY_KEY = pytest.StashKey[SiteRegistry]()
+# Скачанные страницы сайтов: базовый URL -> {path: CrawledPage}
+SITE_PAGES_KEY = pytest.StashKey[dict]()
+# События сети, забранные из браузера при падении: их же учитывает отчёт о заблокированных запросах
+FAILURE_EVENTS_KEY = pytest.StashKey[list]()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--browser-mode",
+        choices=BROWSER_MODES,
+        default=os.getenv("BROWSER_MODE", "reuse"),
+        help="reuse — один браузер на сессию/воркер со сбросом между тестами, "
+             "fresh — новый браузер на каждый тест (env: BROWSER_MODE)",
+    )
+    parser.addoption(
+        "--browser-daemon",
+        action="store_true",
+        default=os.getenv("BROWSER_DAEMON", "") not in ("", "0"),
+        help="В режиме reuse брать тёплые браузеры у локального демона (python -m tests.shared.browser_daemon "
+             "serve); если демон не запущен, браузеры запускаются как обычно (env: BROWSER_DAEMON=1)",
+    )
+    parser.addoption(
+        "--site-mode",
+        choices=SITE_MODES,
+        default=os.getenv("SITE_MODE", "live"),
+        help="live — живой сайт, replay — локальный сервер из записанного архива, "
+             "record — записать архив и прогнать тесты на нём (env: SITE_MODE)",
+    )
+    parser.addoption(
+        "--site",
+        action="append",
+        default=[],
+        metavar="SLUG",
+        help="Прогнать только этот сайт из tests/sites (можно несколько раз); пакеты остальных сайтов "
+             "не импортируются (env: SITES=slug1,slug2)",
+    )
+    parser.addoption(
+        "--no-blocklist",
+        action="store_true",
+        help="Не блокировать сторонние запросы из блоклиста сайта (например, чтобы сравнить время загрузки)",
+    )
+    parser.addoption(
+        "--browser-profile",
+        choices=list(PROFILES),
+        default=os.getenv("BROWSER_PROFILE", DEFAULT_PROFILE),
+        help="Профиль Chrome для прогона; тест может потребовать более полный "
+             "маркером browser_profile (env: BROWSER_PROFILE)",
+    )
+    parser.addoption(
+        "--page-load-strategy",
+        choices=PAGE_LOAD_STRATEGIES,
+        default=os.getenv("PAGE_LOAD_STRATEGY", "normal"),
+        help="normal — ждать событие load; eager/none — вернуться раньше и дождаться "
+             "условий готовности page object (env: PAGE_LOAD_STRATEGY)",
+    )
+    parser.addoption(
+        "--crawl-depth",
+        type=int,
+        default=int(os.getenv("CRAWL_DEPTH", "2")),
+        help="Глубина обхода сайта по ссылкам от главной для тестов по всем страницам (env: CRAWL_DEPTH)",
+    )
+    parser.addoption(
+        "--crawl-max-pages",
+        type=int,
+        default=int(os.getenv("CRAWL_MAX_PAGES", "30")),
+        help="Сколько страниц сайта можно запросить при обходе (env: CRAWL_MAX_PAGES)",
+    )
+    parser.addoption(
+        "--recrawl",
+        action="store_true",
+        help="Обойти сайт заново, не дожидаясь истечения кэша найденных страниц",
+    )
+    parser.addoption(
+        "--visual",
+        action="store_true",
+        default=os.getenv("VISUAL_SNAPSHOTS", "") not in ("", "0"),
+        help="Запустить визуальные тесты (маркер visual): сравнение снимков с эталонами (env: VISUAL_SNAPSHOTS=1)",
+    )
+    parser.addoption(
+        "--update-baselines",
+        action="store_true",
+        help="Перезаписать эталоны визуальных снимков текущими снимками",
+    )
+    parser.addoption(
+        "--screenshot-format",
+        choices=IMAGE_FORMATS,
+        default=os.getenv("SCREENSHOT_FORMAT", "jpeg"),
+        help="Формат скриншота при падении (env: SCREENSHOT_FORMAT)",
+    )
+    parser.addoption(
+        "--screenshot-quality",
+        type=int,
+        default=int(os.getenv("SCREENSHOT_QUALITY", "70")),
+        help="Качество JPEG/WebP скриншота при падении, 1-100 (env: SCREENSHOT_QUALITY)",
+    )
+    parser.addoption(
+        "--screenshot-scale",
+        type=float,
+        default=float(os.getenv("SCREENSHOT_SCALE", "1")),
+        help="Масштаб скриншота при падении, например 0.5 (env: SCREENSHOT_SCALE)",
+    )
+    parser.addoption(
+        "--artifact-budget",
+        type=int,
+        default=int(os.getenv("ARTIFACT_BUDGET_KB", "5120")),
+        help="Сколько КБ вложений можно прикрепить к одному упавшему тесту (env: ARTIFACT_BUDGET_KB)",
+    )
+    parser.addoption(
+        "--artifact-run-budget",
+        type=int,
+        default=int(os.getenv("ARTIFACT_RUN_BUDGET_MB", "200")),
+        help="Сколько МБ вложений упавших тестов можно прикрепить за прогон (env: ARTIFACT_RUN_BUDGET_MB)",
+    )
+    parser.addoption(
+        "--command-budget",
+        type=int,
+        default=int(os.getenv("COMMAND_BUDGET", "150")),
+        help="Сколько команд WebDriver может отправить тест; больше — тест отмечается в отчёте, "
+             "0 — не проверять (env: COMMAND_BUDGET; маркер command_budget(n) для отдельного теста)",
+    )
+    parser.addoption(
+        "--history",
+        metavar="PATH",
+        default=os.getenv("RUN_HISTORY") or None,
+        help="SQLite-файл истории прогонов (по умолчанию <rootdir>/.cache/run-history.sqlite; env: RUN_HISTORY)",
+    )
+    parser.addoption(
+        "--no-history",
+        action="store_true",
+        help="Не читать и не записывать историю прогонов: тесты идут в порядке сбора",
+    )
+    parser.addoption(
+        "--fail-fast-order",
+        action="store_true",
+        help="Сначала запустить тесты, падавшие в последних прогонах, затем остальные от длинных к коротким",
+    )
+    parser.addoption(
+        "--incremental",
+        action="store_true",
+        default=os.getenv("INCREMENTAL", "") not in ("", "0"),
+        help="Не запускать тесты, чьи страницы не изменились с их последнего успеха: они отмечаются "
+             "как кэшированный успех со ссылкой на тот прогон (env: INCREMENTAL=1)",
+    )
+    parser.addoption(
+        "--force-full",
+        action="store_true",
+        help="Запустить все тесты, даже с --incremental, и обновить отпечатки страниц",
+    )
+    parser.addoption(
+        "--step-profile",
+        metavar="DIR",
+        default=os.getenv("STEP_PROFILE_DIR") or None,
+        help="Замерить каждый allure.step (время, команды WebDriver, ожидания selene) "
+             "и сохранить профиль прогона в DIR (env: STEP_PROFILE_DIR)",
+    )
+    parser.addoption(
+        "--chromedriver-offline",
+        action="store_true",
+        default=os.getenv(ENV_OFFLINE, "") not in ("", "0"),
+        help="Не обращаться к сети при поиске ChromeDriver (env: CHROMEDRIVER_OFFLINE=1)",
+    )
+    parser.addoption(
+        "--chromedriver-lock",
+        default=None,
+        help=f"Путь к lockfile с найденным ChromeDriver (по умолчанию <rootdir>/{LOCKFILE_NAME})",
+    )
+    parser.addoption(
+        "--refresh-chromedriver",
+        action="store_true",
+        help="Игнорировать lockfile и заново найти ChromeDriver (например, после обновления Chrome)",
+    )
+
+
+def pytest_configure(config):
+    config.stash[PROFILE_STATS_KEY] = ProfileStats()
+    config.stash[SCENARIO_PAGES_KEY] = {}
+    config.stash[SITE_PATHS_KEY] = {}
+    config.stash[SITE_PAGES_KEY] = {}
+    registry = config.stash[REGISTRY_KEY] = SiteRegistry.discover()
+    for slug in selected_sites(config):
+        try:
+            registry.get(slug)
+        except KeyError as e:
+            raise pytest.UsageError(e.args[0])
+    config.stash[ARTIFACTS_KEY] = ArtifactPipeline(artifact_settings(config))
+    workerinput = getattr(config, "workerinput", None)
+    if config.getoption("--no-history"):
+        config.stash[HISTORY_KEY] = {}
+    elif workerinput is not None:
+        # Воркеры сортируют по снимку основного процесса, иначе xdist увидит разный порядок сбора
+        config.stash[HISTORY_KEY] = {
+            nodeid: HistoryEntry(*data) for nodeid, data in workerinput.get("run_history", {}).items()
+        }
+    else:
+        config.stash[HISTORY_KEY] = run_history(config).load()
+        # Отчёты xdist-воркеров тоже приходят в основной процесс, поэтому записывает только он
+        recorder = RunRecorder()
+        config.pluginmanager.register(recorder, "run-recorder")
+        config.stash[RUN_RECORDER_KEY] = recorder
+    if config.getoption("--step-profile"):
+        profiler = StepProfiler()
+        allure_commons.plugin_manager.register(profiler)
+        config.stash[STEP_PROFILER_KEY] = profiler
+        # Ожидания selene замеряются через приватный _wait_decorator (selene 2.0.0rc10):
+        # прежнее значение возвращаем в pytest_unconfigure
+        config.stash[WAIT_DECORATOR_KEY] = browser.config._wait_decorator
+        browser.config._wait_decorator = profiler.wait_decorator
+    if config.getoption("--site-mode") == "record" and getattr(config.option, "numprocesses", None):
+        raise pytest.UsageError("--site-mode=record пишет общий архив: запускайте его без -n")
+
+
+def pytest_unconfigure(config):
+    if ARTIFACTS_KEY in config.stash:
+        config.stash[ARTIFACTS_KEY].close()
+    if STEP_PROFILER_KEY in config.stash:
+        allure_commons.plugin_manager.unregister(config.stash[STEP_PROFILER_KEY])
+    if WAIT_DECORATOR_KEY in config.stash:
+        browser.config._wait_decorator = config.stash[WAIT_DECORATOR_KEY]
+
+
+def artifact_settings(config) -> ArtifactSettings:
+    """Настройки артефактов из опций; бюджет прогона делится между xdist-воркерами"""
+    quality = config.getoption("--screenshot-quality")
+    scale = config.getoption("--screenshot-scale")
+    if not 1 <= quality <= 100 or not 0 < scale <= 1:
+        raise pytest.UsageError("--screenshot-quality должно быть от 1 до 100, --screenshot-scale — от 0 до 1")
+    workerinput = getattr(config, "workerinput", None)
+    workers = workerinput.get("workercount", 1) if workerinput is not None else 1
+    return ArtifactSettings(
+        image_format=config.getoption("--screenshot-format"),
+        quality=quality,
+        scale=scale,
+        test_budget=config.getoption("--artifact-budget") * 1024,
+        run_budget=config.getoption("--artifact-run-budget") * 1024 * 1024 // workers,
+    )
+
+
+def selected_sites(config) -> list:
+    """Сайты из --site (или env SITES через запятую); пустой список — все сайты"""
+    return config.getoption("--site") or [slug for slug in os.getenv("SITES", "").split(",") if slug]
+
+
+def pytest_ignore_collect(collection_path, config):
+    """Пакеты невыбранных сайтов не импортируются: их conftest, страницы и тесты не загружаются"""
+    selected = selected_sites(config)
+    if not selected or REGISTRY_KEY not in config.stash:
+        return None
+    site = config.stash[REGISTRY_KEY].for_path(collection_path)
+    if site is not None and site.slug not in selected:
+        return True
+    return None
+
+
+def site_of(node) -> Site:
+    """Сайт, которому принадлежит тест"""
+    site = node.config.stash[REGISTRY_KEY].for_path(node.path)
+    if site is None:
+        raise pytest.UsageError(f"{node.path} не лежит в пакете сайта из tests/sites")
+    return site
+
+
+def run_history(config) -> RunHistory:
+    path = config.getoption("--history") or config.rootpath / ".cache" / "run-history.sqlite"
+    return RunHistory(Path(path))
+
+
+def scenario_name(item):
+    """Имя сценария из маркера scenario или None"""
+    marker = item.get_closest_marker("scenario")
+    return marker.args[0] if marker is not None else None
+
+
+def needs_browser(item) -> bool:
+    """Тесты с маркерами no_browser и static проверяются без браузера"""
+    return item.get_closest_marker("no_browser") is None and item.get_closest_marker("static") is None
+
+
+def fingerprint_items(config, items) -> dict:
+    """Отпечатки тестов, привязанных к страницам: код сайта и содержимое его страниц (условный GET)"""
+    registry = config.stash[REGISTRY_KEY]
+    bindings = {}
+    for item in items:
+        site = registry.for_path(item.path)
+        paths = bound_pages(item)
+        if site is not None and paths:
+            bindings[item.nodeid] = (site, page_urls(site.base_url, paths))
+    if not bindings:
+        return {}
+    pages = IncrementalStore(run_history(config)).check_pages(
+        (url for _, urls in bindings.values() for url in urls),
+        run_id=getattr(config, "workerinput", {}).get("testrunuid"),
+    )
+    shared_dir = Path(__file__).parent
+    codes = {site.slug: code_fingerprint([shared_dir, site.directory]) for site, _ in bindings.values()}
+    fingerprints = {}
+    for nodeid, (site, urls) in bindings.items():
+        fingerprint = fingerprint_of(codes[site.slug], {url: pages[url] for url in urls})
+        if fingerprint is not None:
+            fingerprints[nodeid] = fingerprint
+    return fingerprints
+
+
+def apply_incremental(config, items) -> list:
+    """Заменить тесты неизменившихся страниц кэшированными успехами; остальным записать отпечатки"""
+    fingerprints = fingerprint_items(config, items)
+    force_full = config.getoption("--force-full")
+    cached = {} if force_full else IncrementalStore(run_history(config)).cached_passes(fingerprints)
+    result = []
+    for item in items:
+        if item.nodeid in cached:
+            result.append(CachedPass.replace(item, *cached[item.nodeid]))
+            continue
+        if item.nodeid in fingerprints:
+            item.user_properties.append(("page_fingerprint", fingerprints[item.nodeid]))
+        result.append(item)
+    return result
+
+
+def pytest_collection_modifyitems(config, items):
+    """Поставить тесты одного сценария подряд, чтобы они делили один переход на страницу"""
+    # Инкрементальный режим сравнивает живой сайт с прошлым прогоном; replay и так неизменен
+    incremental = config.getoption("--incremental") or config.getoption("--force-full")
+    if incremental and not config.getoption("--no-history") and config.getoption("--site-mode") == "live":
+        items[:] = apply_incremental(config, items)
+    
+    groups = {}
+    for item in items:
+        groups.setdefault(scenario_name(item) or item.nodeid, []).append(item)
+    # По истории прогонов длинные группы идут первыми: параллельный прогон не ждёт одного долгого теста
+    by_nodeid = {item.nodeid: item for item in items}
+    order = schedule(
+        [[item.nodeid for item in group] for group in groups.values()],
+        config.stash[HISTORY_KEY],
+        fail_fast=config.getoption("--fail-fast-order"),
+    )
+    items[:] = [by_nodeid[nodeid] for group in order for nodeid in group]
+
+    # Родительский suite Allure — имя сайта из реестра, если тест не задал свой
+    registry = config.stash[REGISTRY_KEY]
+    for item in items:
+        site = registry.for_path(item.path)
+        if site is not None and not has_parent_suite(item):
+            item.add_marker(allure.parent_suite(site.name))
+
+    # Визуальные снимки включаются явно: им нужны эталоны и стабильное окружение
+    if not config.getoption("--visual"):
+        skip_visual = pytest.mark.skip(reason="визуальные снимки отключены, запустите с --visual")
+        for item in items:
+            if item.get_closest_marker("visual") is not None:
+                item.add_marker(skip_visual)
+
+    # При -n --dist loadgroup тесты сценария попадут на один воркер
+    if config.pluginmanager.hasplugin("xdist"):
+        for item in items:
+            scenario = scenario_name(item)
+            if scenario is not None:
+                item.add_marker(pytest.mark.xdist_group(f"scenario-{scenario}"))
+
+
+def has_parent_suite(item) -> bool:
+    return any(
+        marker.kwargs.get("label_type") == LabelType.PARENT_SUITE for marker in item.iter_markers("allure_label")
+    )
+
+
+def site_paths(config, site: Site) -> list:
+    """Страницы для тестов по всем страницам: найденные обходом сайта или записанные в архив"""
+    if config.getoption("--site-mode") == "replay":
+        try:
+            return ReplayArchive(site.replay_dir).pages()
+        except ReplayArchiveError:
+            # Ошибку покажет фикстура base_url
+            return list(site.pages)
+    return discover_site_paths(config, site.base_url, site.pages)
+
+
+def pytest_generate_tests(metafunc):
+    """Параметризовать тесты всеми страницами сайта (site_page) и всеми экранами (viewport)"""
+    site = metafunc.config.stash[REGISTRY_KEY].for_path(metafunc.definition.path)
+    if site is None:
+        return
+    if "site_page" in metafunc.fixturenames:
+        metafunc.parametrize("site_path", site_paths(metafunc.config, site))
+    if "viewport" in metafunc.fixturenames:
+        metafunc.parametrize("viewport", viewport_params(site.viewports))
+
+
+def discover_site_paths(config, base_url: str, seeds) -> list:
+    """Пути страниц сайта для параметризации тестов: обход по HTTP с кэшем в .cache/crawler.json"""
+    memo = config.stash[SITE_PATHS_KEY]
+    if base_url not in memo:
+        depth = config.getoption("--crawl-depth")
+        max_pages = config.getoption("--crawl-max-pages")
+        cache = CrawlCache(config.rootpath / ".cache" / "crawler.json")
+        # У всех xdist-воркеров одного прогона общий testrunuid
+        run_id = getattr(config, "workerinput", {}).get("testrunuid")
+        paths = cache.paths(
+            f"{base_url} depth={depth} max_pages={max_pages}",
+            lambda: sorted(page.path for page in crawl(base_url, seeds, depth, max_pages)),
+            refresh=config.getoption("--recrawl"),
+            run_id=run_id,
+        )
+        # Сайт недоступен — проверяем хотя бы известные страницы, тесты покажут ошибку
+        memo[base_url] = paths or list(seeds)
+    return memo[base_url]
+
+
+def resolve_driver_once(config) -> DriverResolution:
+    """Найти ChromeDriver при первом запросе браузера; путь, найденный контроллером xdist, берётся готовым"""
+    if DRIVER_KEY in config.stash:
+        return config.stash[DRIVER_KEY]
+
+    workerinput = getattr(config, "workerinput", {})
+    if "chromedriver_path" in workerinput:
+        resolution = DriverResolution(path=workerinput["chromedriver_path"], source="controller", seconds=0.0)
+    else:
+        # Воркеры ищут сами; одновременный поиск сериализуется блокировкой lockfile
+        lockfile = config.getoption("--chromedriver-lock") or config.rootpath / LOCKFILE_NAME
+        resolution = resolve_chromedriver(
+            Path(lockfile),
+            offline=config.getoption("--chromedriver-offline"),
+            refresh=config.getoption("--refresh-chromedriver"),
+        )
+    config.stash[DRIVER_KEY] = resolution
+    return resolution
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Передать в xdist-воркер путь к ChromeDriver, если он уже найден, и историю прогонов"""
+    # Заранее ищем только по --refresh-chromedriver, иначе каждый воркер скачал бы драйвер заново;
+    # в остальных случаях прогон без локального браузера драйвер не ищет вовсе
+    if DRIVER_KEY in node.config.stash or node.config.getoption("--refresh-chromedriver"):
+        node.workerinput["chromedriver_path"] = resolve_driver_once(node.config).path
+    node.workerinput["run_history"] = {
+        nodeid: entry.data for nodeid, entry in node.config.stash[HISTORY_KEY].items()
+    }
+
+
+def pytest_sessionfinish(session):
+    """Отправить статистику профилей из xdist-воркера в основной процесс и сохранить историю прогона"""
+    workeroutput = getattr(session.config, "workeroutput", None)
+    recorder = session.config.stash.get(RUN_RECORDER_KEY, None)
+    if recorder is not None:
+        workers = getattr(session.config.option, "numprocesses", None) or 1
+        results = {nodeid: tuple(result) for nodeid, result in recorder.results.items()}
+        history = run_history(session.config)
+        run_id = history.record(results, workers)
+        if run_id is not None and recorder.fingerprints:
+            outcomes = {nodeid: result[0] for nodeid, result in results.items()}
+            IncrementalStore(history).save_results(run_id, recorder.fingerprints, outcomes)
+    if workeroutput is not None:
+        workeroutput["profile_stats"] = session.config.stash[PROFILE_STATS_KEY].data
+        resolution = session.config.stash.get(DRIVER_KEY, None)
+        if resolution is not None:
+            workeroutput["chromedriver"] = (resolution.path, resolution.source, resolution.seconds)
+        pipeline = session.config.stash[ARTIFACTS_KEY]
+        workeroutput["artifacts"] = (pipeline.attached_bytes, pipeline.dropped)
+    profiler = session.config.stash.get(STEP_PROFILER_KEY, None)
+    if profiler is None:
+        return
+    if workeroutput is not None:
+        workeroutput["step_profile"] = profiler.data
+    elif profiler.records:
+        directory = Path(session.config.getoption("--step-profile"))
+        session.config.stash[STEP_PROFILE_PATH_KEY] = profiler.write(directory, time.strftime("%Y%m%d-%H%M%S"))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Собрать статистику профилей, присланную xdist-воркером"""
+    data = getattr(node, "workeroutput", {}).get("profile_stats")
+    if data:
+        node.config.stash[PROFILE_STATS_KEY].merge(data)
+    resolution = getattr(node, "workeroutput", {}).get("chromedriver")
+    if resolution and DRIVER_KEY not in node.config.stash:
+        node.config.stash[DRIVER_KEY] = DriverResolution(*resolution)
+    attached, dropped = getattr(node, "workeroutput", {}).get("artifacts", (0, 0))
+    pipeline = node.config.stash[ARTIFACTS_KEY]
+    pipeline.attached_bytes += attached
+    pipeline.dropped += dropped
+    steps = getattr(node, "workeroutput", {}).get("step_profile")
+    if steps:
+        node.config.stash[STEP_PROFILER_KEY].merge(steps)
+
+
+def report_blocked_requests(item, urls):
+    """Прикрепить к тесту список заблокированных запросов и сохранить их число для сводки"""
+    item.user_properties.append(("blocked_requests", len(urls)))
+    if urls:
+        allure.attach(
+            f"Заблокировано запросов: {len(urls)}\n\n" + "\n".join(urls),
+            name="Заблокированные сторонние запросы",
+            attachment_type=AttachmentType.TEXT,
+        )
+
+
+def report_commands(item, stats: CommandStats, budget: int):
+    """Прикрепить к тесту команды WebDriver и гистограмму задержек; сохранить их для сводки"""
+    over_budget = bool(budget) and stats.total > budget
+    item.user_properties.append(("webdriver_commands", dict(stats.data, budget=budget)))
+    if not stats.total:
+        return
+    name = f"Команды WebDriver: {stats.total}"
+    if over_budget:
+        name += f" (бюджет {budget} превышен)"
+        allure.dynamic.tag("command-budget")
+    allure.attach("\n".join(stats.lines(top=30)), name=name, attachment_type=AttachmentType.TEXT)
+
+
+def command_budget(item) -> int:
+    """Бюджет команд теста: маркер command_budget(n) или --command-budget"""
+    marker = item.get_closest_marker("command_budget")
+    return marker.args[0] if marker is not None else item.config.getoption("--command-budget")
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Показать, откуда взят ChromeDriver, сколько занял поиск и цену каждого профиля"""
+    resolution = config.stash.get(DRIVER_KEY, None)
+    if resolution is not None:
+        terminalreporter.write_line(
+            f"ChromeDriver: {resolution.path} ({resolution.source}, поиск {resolution.seconds * 1000:.0f} мс)"
+        )
+    # user_properties приходят и из xdist-воркеров, поэтому считаем по отчётам
+    blocked = [
+        value
+        for reports in terminalreporter.stats.values()
+        for report in reports
+        if getattr(report, "when", None) == "teardown"
+        for name, value in report.user_properties
+        if name == "blocked_requests"
+    ]
+    if blocked:
+        terminalreporter.write_line(
+            f"Заблокировано сторонних запросов: {sum(blocked)} в {len(blocked)} тестах "
+            f"(в среднем {sum(blocked) / len(blocked):.1f} на тест)"
+        )
+    pipeline = config.stash[ARTIFACTS_KEY]
+    if pipeline.attached_bytes or pipeline.dropped:
+        terminalreporter.write_line(
+            f"Артефакты падений: {pipeline.attached_bytes / 1024 / 1024:.1f} МБ, "
+            f"не прикреплено из-за бюджета: {pipeline.dropped}"
+        )
+    commands, over_budget = CommandStats(), []
+    for reports in terminalreporter.stats.values():
+        for report in reports:
+            if getattr(report, "when", None) != "teardown":
+                continue
+            for name, value in report.user_properties:
+                if name == "webdriver_commands":
+                    stats = CommandStats(value)
+                    commands.merge(stats)
+                    if value["budget"] and stats.total > value["budget"]:
+                        over_budget.append((stats.total, value["budget"], report.nodeid))
+    if commands.total:
+        terminalreporter.section("Команды WebDriver")
+        for line in commands.lines():
+            terminalreporter.write_line(line)
+        for total, budget, nodeid in sorted(over_budget, reverse=True):
+            terminalreporter.write_line(f"Превышен бюджет команд: {total} > {budget}  {nodeid}", yellow=True)
+    profile_lines = config.stash[PROFILE_STATS_KEY].lines()
+    if profile_lines:
+        terminalreporter.section("Профили браузера")
+        for line in profile_lines:
+            terminalreporter.write_line(line)
+    flaky = [(nodeid, entry) for nodeid, entry in config.stash[HISTORY_KEY].items() if entry.flaky]
+    if flaky:
+        terminalreporter.section("Нестабильные тесты (по истории прогонов)")
+        for nodeid, entry in sorted(flaky, key=lambda item: item[1].failures, reverse=True):
+            terminalreporter.write_line(
+                f"упал {entry.failures} из {entry.runs}, повторов {entry.retries}  {nodeid}"
+            )
+    profiler = config.stash.get(STEP_PROFILER_KEY, None)
+    if profiler is not None and profiler.records:
+        terminalreporter.section("Самые долгие шаги")
+        for line in profiler.lines():
+            terminalreporter.write_line(line)
+        terminalreporter.write_line(f"Профиль шагов: {config.stash[STEP_PROFILE_PATH_KEY]}")
+
+
+@pytest.fixture(scope="session")
+def site_mode(pytestconfig) -> str:
+    """Откуда брать сайт: live, replay или record"""
+    return pytestconfig.getoption("--site-mode")
+
+
+@pytest.fixture
+def site(request) -> Site:
+    """Описание сайта теста из реестра (tests/sites/<slug>/site.py)"""
+    return site_of(request.node)
+
+
+@pytest.fixture(scope="session")
+def replay_servers(pytestconfig, site_mode):
+    """Replay-серверы сайтов: запускаются при первом тесте сайта (в record — после записи) и живут до конца сессии"""
+    servers = {}
+    with ExitStack() as stack:
+        def start(site: Site) -> str:
+            if site.slug not in servers:
+                if site_mode == "record":
+                    record_site(site.base_url, site_paths(pytestconfig, site), site.replay_dir)
+                try:
+                    archive = ReplayArchive(site.replay_dir)
+                except ReplayArchiveError as e:
+                    pytest.fail(str(e))
+                if site_mode == "record" and archive.failed:
+                    warnings.warn(pytest.PytestWarning(
+                        f"{site.name}: не записано ответов — {len(archive.failed)}: "
+                        + "; ".join(f"{key} ({error})" for key, error in archive.failed.items())
+                    ))
+                servers[site.slug] = stack.enter_context(ReplayServer(archive)).url
+            return servers[site.slug]
+        yield start
+
+
+@pytest.fixture
+def base_url(site, site_mode, replay_servers) -> str:
+    """Базовый URL сайта: живой сайт или локальный replay-сервер"""
+    if site_mode == "live":
+        return site.base_url
+    return replay_servers(site)
+
+
+@pytest.fixture
+def blocked_urls(site):
+    """Шаблоны URL, которые браузер не загружает: блоклист сайта"""
+    return site.blocked_urls
+
+
+@pytest.fixture(scope="session")
+def link_checker(pytestconfig, site_mode):
+    """HTTP-проверка ссылок; в replay/record ссылки ведут на незаписанные страницы, поэтому None"""
+    if site_mode != "live":
+        return None
+    return LinkChecker(cache_path=pytestconfig.rootpath / ".cache" / "link_checker.json")
+
+
+@pytest.fixture
+def visual_baselines_dir(site):
+    """Эталоны визуальных снимков сайта"""
+    return site.visual_dir
+
+
+@pytest.fixture
+def visual_checker(pytestconfig, visual_baselines_dir):
+    """Сравнение снимков с эталонами сайта"""
+    return VisualChecker(VisualStore(visual_baselines_dir), update=pytestconfig.getoption("--update-baselines"))
+
+
+@pytest.fixture
+def site_pages(pytestconfig, site, base_url):
+    """HTML всех страниц сайта: скачиваются параллельно один раз за сессию"""
+    memo = pytestconfig.stash[SITE_PAGES_KEY]
+    if base_url not in memo:
+        memo[base_url] = fetch_pages(base_url, site_paths(pytestconfig, site))
+    return memo[base_url]
+
+
+@pytest.fixture
+def site_page(site_path, site_pages):
+    """Страница сайта, скачанная по HTTP, для проверок без браузера"""
+    page = site_pages.get(site_path)
+    if page is None:
+        pytest.fail(f"Не удалось скачать страницу {site_path}")
+    return page
+
+
+@pytest.fixture
+def page_response(request, site, base_url, site_pages):
+    """Ответ страницы из маркера static(path) (по умолчанию первой страницы сайта) для проверок без браузера"""
+    marker = request.node.get_closest_marker("static")
+    path = marker.args[0] if marker is not None and marker.args else site.pages[0]
+    page = site_pages.get(path) or fetch_pages(base_url, [path])[path]
+    if page is None:
+        pytest.fail(f"Не удалось скачать страницу {path}")
+    return page
+
+
+@pytest.fixture
+def shared_visit(request):
+    """Открыть страницу один раз на сценарий: остальные тесты сценария переиспользуют этот переход"""
+    scenario = scenario_name(request.node)
+    scenario_pages = request.config.stash[SCENARIO_PAGES_KEY]
+    
+    def visit(open_page):
+        cached = scenario_pages.get(scenario)
+        if cached is not None:
+            driver, page = cached
+            if driver is browser.config.driver and not page.changed:
+                with allure.step(f"Страница уже открыта в сценарии '{scenario}'"):
+                    return page
+        page = open_page()
+        if scenario is not None:
+            scenario_pages[scenario] = (browser.config.driver, page)
+        return page
+    
+    return visit
+
+
+@pytest.fixture(scope="session")
+def chromedriver_path(pytestconfig) -> str:
+    """Путь к ChromeDriver: ищется при первом запуске браузера, дальше берётся из кэша"""
+    return resolve_driver_once(pytestconfig).path
+
+
+@pytest.fixture(scope="session")
+def driver_factory(pytestconfig, chromedriver_path, tmp_path_factory):
+    """Фабрика браузеров: у каждого своя директория профиля Chrome внутри basetemp воркера"""
+    stats = pytestconfig.stash[PROFILE_STATS_KEY]
+
+    def factory(profile: str):
+        started = time.perf_counter()
+        driver = create_driver(
+            chromedriver_path,
+            tmp_path_factory.mktemp(f"chrome-{worker_id()}"),
+            PROFILES[profile],
+            pytestconfig.getoption("--page-load-strategy"),
+        )
+        stats.record_launch(profile, time.perf_counter() - started)
+        return driver
+    return factory
+
+
+@pytest.fixture(scope="session")
+def browser_pool(request, pytestconfig):
+    """Пул браузера: один Chrome на сессию (или на xdist-воркер) либо браузеры локального демона"""
+    pool = None
+    if pytestconfig.getoption("--browser-daemon"):
+        client = DaemonClient.from_state(pytestconfig.rootpath / STATE_PATH)
+        if client is not None:
+            pool = RemoteBrowserPool(client, pytestconfig.getoption("--page-load-strategy"))
+        else:
+            warnings.warn(pytest.PytestWarning(
+                "Демон браузеров не запущен, браузеры запускаются локально: python -m tests.shared.browser_daemon serve"
+            ))
+    if pool is None:
+        # Фабрику запрашиваем только здесь: с демоном ChromeDriver в pytest не ищется
+        pool = BrowserPool(request.getfixturevalue("driver_factory"))
+    yield pool
+    pool.close()
 
 
 @pytest.fixture(scope="function", autouse=True)
-def setup_browser():
+def setup_browser(request):
     """Настройка браузера перед каждым тестом"""
-    # Инициализация ChromeDriver через webdriver-manager (для Selenium 4.x)
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service)
+    if not needs_browser(request.node):
+        yield
+        return
+    # Фикстуры браузера запрашиваем только здесь, чтобы тесты без браузера не искали ChromeDriver
+    browser_pool = request.getfixturevalue("browser_pool")
+    blocked_urls = request.getfixturevalue("blocked_urls")
+    
+    fresh = (
+        request.config.getoption("--browser-mode") == "fresh"
+        or request.node.get_closest_marker("fresh_browser") is not None
+    )
+    # Тест может потребовать профиль полнее выбранного для прогона, но не легче
+    profile = request.config.getoption("--browser-profile")
+    marker = request.node.get_closest_marker("browser_profile")
+    if marker is not None:
+        profile = at_least(profile, marker.args[0])
+    # Тест того же сценария, что и предыдущий, получает браузер без сброса — с уже открытой страницей
+    scenario = scenario_name(request.node)
+    scenario_pages = request.config.stash[SCENARIO_PAGES_KEY]
+    cached = scenario_pages.get(scenario)
+    # Изменённую страницу (эмуляция экрана, размер окна, клик, переход) делить нельзя: окно и CDP-эмуляция
+    # сбрасываются только в reset_driver, иначе их состояние перешло бы в следующий тест
+    keep_page = (
+        not fresh and cached is not None and not cached[1].changed and cached[0] is browser_pool.current(profile)
+    )
+    if not keep_page:
+        scenario_pages.clear()
+    if fresh:
+        driver = request.getfixturevalue("driver_factory")(profile)
+    else:
+        driver = browser_pool.acquire(profile, reset=not keep_page)
     
-    # Настройка размера окна
-    driver.set_window_size(1920, 1080)
+    blocking = bool(blocked_urls) and not request.config.getoption("--no-blocklist")
+    if blocking:
+        block_urls(driver, blocked_urls)
+    
+    commands = command_log(driver)
+    profiler = request.config.stash.get(STEP_PROFILER_KEY, None)
+    if profiler is not None:
+        commands.subscribe(profiler.on_command)
     
     # Настройка selene browser (selene 2.x)
     browser.config.driver = driver
     # В selene 2.x timeout настраивается через browser.config.timeout
     browser.config.timeout = 10
     
+    # Считаем только команды самого теста, без сброса браузера и служебных запросов фикстуры
+    commands.start()
     yield
+    report_commands(request.node, commands.stop(), command_budget(request.node))
+    
+    # performance-лог забираем после каждого теста, чтобы он не копился в браузере из пула
+    events = request.node.stash.get(FAILURE_EVENTS_KEY, []) + network_events(driver)
+    if blocking:
+        report_blocked_requests(request.node, blocked_requests(events))
+    
+    rss = process_tree_rss(driver)
+    if rss is not None:
+        request.config.stash[PROFILE_STATS_KEY].record_memory(profile, rss)
     
-    # Закрытие браузера после теста
-    browser.quit()
+    # Тест без общей страницы сценария мог менять браузер как угодно — следующий тест получит сброс
+    if "shared_visit" not in request.fixturenames:
+        scenario_pages.clear()
+    
+    # Свой браузер закрываем сразу, браузер пула сбросится перед следующим тестом
+    if fresh:
+        quit_driver(driver)
+    else:
+        browser_pool.finish_test(profile)
+
+
+def pytest_report_teststatus(report):
+    """Кэшированный успех инкрементального режима показываем отдельно от настоящих прогонов"""
+    if report.when == "call" and report.passed and any(name == "cached_pass" for name, _ in report.user_properties):
+        return "cached", "c", "CACHED"
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    """Отнести следующие шаги профиля к начинающемуся тесту"""
+    profiler = item.config.stash.get(STEP_PROFILER_KEY, None)
+    if profiler is not None:
+        profiler.start_test(item.nodeid)
 
 
 @pytest.hookimpl(hookwrapper=True)
 def pytest_runtest_makereport(item, call):
-    """Хук для прикрепления скриншотов и HTML при падении теста"""
+    """Хук для прикрепления скриншота, HTML, консоли, сети и DOM при падении теста"""
     outcome = yield
     report = outcome.get_result()
+    pipeline = item.config.stash[ARTIFACTS_KEY]
     
-    # Прикрепляем артефакты только при падении на этапе вызова теста
-    if report.when == "call" and report.failed:
-        try:
-            # Скриншот
-            allure.attach(
-                browser.driver.get_screenshot_as_png(),
-                name="Скриншот при падении",
-                attachment_type=AttachmentType.PNG,
-            )
-        except Exception as e:
-            print(f"Не удалось прикрепить скриншот: {e}")
-        
-        try:
-            # HTML страницы
-            allure.attach(
-                browser.driver.page_source,
-                name="HTML страницы",
-                attachment_type=AttachmentType.HTML,
-            )
-        except Exception as e:
-            print(f"Не удалось прикрепить HTML: {e}")
-        
-        try:
-            # URL страницы
+    # Снимаем артефакты только при падении на этапе вызова теста
+    # (у тестов без браузера прикреплять нечего, а обращение к browser.driver запустило бы Chrome).
+    # Здесь только быстрые вызовы браузера: сжатие идёт в фоне, пока выполняется teardown
+    if report.when == "call" and report.failed and needs_browser(item):
+        driver = browser.config.driver
+        events = network_events(driver)
+        item.stash[FAILURE_EVENTS_KEY] = events
+        pipeline.submit(item.nodeid, capture(driver, events))
+    
+    # После teardown тест в Allure ещё открыт: прикрепляем то, что успело сжаться
+    if report.when == "teardown":
+        for artifact in pipeline.collect(item.nodeid):
             allure.attach(
-                browser.driver.current_url,
-                name="URL страницы",
-                attachment_type=AttachmentType.TEXT,
+                artifact.body,
+                name=artifact.name,
+                attachment_type=artifact.attachment_type,
+                extension=artifact.extension,
             )
-        except Exception as e:
-            print(f"Не удалось прикрепить URL: {e}")
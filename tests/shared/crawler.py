@@ -0,0 +1,202 @@
+"""Обход сайта по HTTP без браузера: поиск same-origin страниц и кэш найденных путей"""
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+import aiohttp
+
+from tests.shared.static_analysis import HtmlFacts, parse_html
+
+try:
+    import fcntl
+except ImportError:  # Windows: блокировку кэша между воркерами пропускаем
+    fcntl = None
+
+# Ссылки на файлы, а не страницы: их не скачиваем, даже если они на том же домене
+SKIPPED_EXTENSIONS = (
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".ico", ".pdf", ".zip", ".rar",
+    ".doc", ".docx", ".xls", ".xlsx", ".mp3", ".mp4", ".css", ".js", ".xml", ".json",
+)
+
+
+@dataclass
+class CrawledPage:
+    """Ответ сервера на запрос страницы"""
+    url: str
+    status: int
+    headers: dict
+    html: str
+
+    @property
+    def path(self) -> str:
+        return page_path(self.url)
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("Content-Type", "")
+
+    @cached_property
+    def facts(self) -> HtmlFacts:
+        return parse_html(self.html)
+
+    def links(self) -> list:
+        """Абсолютные URL ссылок страницы без фрагментов"""
+        return [urldefrag(urljoin(self.url, href.strip()))[0] for href in self.facts.hrefs]
+
+
+def page_path(url: str) -> str:
+    """Путь страницы с query: так страницы называются в параметрах тестов и в архиве replay"""
+    parts = urlsplit(url)
+    return (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+
+def site_host(url: str) -> str:
+    """Хост сайта без www.: www.elvirra.ru и elvirra.ru — один сайт"""
+    return urlsplit(url).netloc.lower().removeprefix("www.")
+
+
+def _is_page_link(url: str, origin: str) -> bool:
+    parts = urlsplit(url)
+    return (
+        parts.scheme in ("http", "https")
+        and site_host(url) == origin
+        and not parts.path.lower().endswith(SKIPPED_EXTENSIONS)
+    )
+
+
+async def _get(session, url: str) -> CrawledPage:
+    async with session.get(url, allow_redirects=True) as response:
+        headers = {"Content-Type": response.headers.get("Content-Type", "")}
+        if "html" not in headers["Content-Type"]:
+            return CrawledPage(str(response.url), response.status, headers, "")
+        return CrawledPage(str(response.url), response.status, headers, await response.text(errors="replace"))
+
+
+class _Fetcher:
+    """Сессия с лимитом параллельных запросов; таймаут считается с момента, когда запросу достался слот"""
+
+    def __init__(self, concurrency: int, timeout: float):
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(concurrency)
+        # Без общего total у сессии: ожидание в очереди не должно превращаться в таймаут
+        self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency))
+
+    async def fetch(self, url: str) -> Optional[CrawledPage]:
+        async with self._slots:
+            try:
+                return await asyncio.wait_for(_get(self._session, url), self.timeout)
+            except (asyncio.TimeoutError, aiohttp.ClientError):
+                return None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._session.close()
+
+
+async def _crawl(base_url, seeds, max_depth, max_pages, concurrency, timeout) -> list:
+    origin = site_host(base_url)
+    seen = set()
+    level = []
+    for path in seeds:
+        url = urljoin(base_url, path)
+        if url not in seen:
+            seen.add(url)
+            level.append(url)
+    pages = {}
+    async with _Fetcher(concurrency, timeout) as fetcher:
+        for depth in range(max_depth + 1):
+            if not level:
+                break
+            # Страницы одного уровня скачиваются параллельно, уровни — по очереди
+            fetched = await asyncio.gather(*(fetcher.fetch(url) for url in level))
+            level = []
+            for page in fetched:
+                if page is None or page.status != 200 or not page.html:
+                    continue
+                # После редиректа на другой домен страница уже не наша
+                if site_host(page.url) != origin:
+                    continue
+                pages.setdefault(page.path, page)
+                if depth == max_depth:
+                    continue
+                for url in page.links():
+                    if len(seen) >= max_pages:
+                        break
+                    if url not in seen and _is_page_link(url, origin):
+                        seen.add(url)
+                        level.append(url)
+    return list(pages.values())
+
+
+def crawl(base_url: str, seeds=("/",), max_depth: int = 2, max_pages: int = 30,
+          concurrency: int = 8, timeout: float = 15) -> list:
+    """Найти страницы сайта обходом в ширину от seeds: не глубже max_depth и не больше max_pages запросов"""
+    return asyncio.run(_crawl(base_url, seeds, max_depth, max_pages, concurrency, timeout))
+
+
+async def _fetch_all(base_url, paths, concurrency, timeout) -> list:
+    async with _Fetcher(concurrency, timeout) as fetcher:
+        return await asyncio.gather(*(fetcher.fetch(urljoin(base_url, path)) for path in paths))
+
+
+def fetch_pages(base_url: str, paths, concurrency: int = 8, timeout: float = 15) -> dict:
+    """Параллельно скачать известные страницы: путь -> CrawledPage (None, если запрос не удался)"""
+    paths = list(paths)
+    return dict(zip(paths, asyncio.run(_fetch_all(base_url, paths, concurrency, timeout))))
+
+
+class CrawlCache:
+    """Кэш найденных путей на диске: повторные прогоны и xdist-воркеры не обходят сайт заново"""
+
+    def __init__(self, cache_path: Path, ttl: float = 24 * 3600):
+        self.cache_path = cache_path
+        self.ttl = ttl
+
+    def paths(self, key: str, discover, refresh: bool = False, run_id: Optional[str] = None) -> list:
+        """Пути из кэша или результат discover(); обход под файловой блокировкой, один на прогон"""
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_path.with_name(self.cache_path.name + ".lock"), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            cache = self._load()
+            entry = cache.get(key)
+            # Воркеры одного прогона должны собрать одинаковые тесты, поэтому --recrawl
+            # выполняет обход один раз, а остальные воркеры берут его результат
+            same_run = entry is not None and run_id is not None and entry.get("run_id") == run_id
+            fresh = entry is not None and not refresh and time.time() - entry["crawled_at"] < self.ttl
+            if same_run or fresh:
+                return entry["paths"]
+
+            paths = discover()
+            if paths:
+                cache[key] = {"paths": paths, "crawled_at": time.time(), "run_id": run_id}
+                self._save(cache)
+                return paths
+            # Сайт недоступен: берём прежние пути, если они были. Воркеры прогона должны собрать
+            # одинаковые тесты, поэтому неудача запоминается для этого прогона, но как устаревшая —
+            # следующий прогон обойдёт сайт заново
+            paths = entry["paths"] if entry is not None else []
+            if run_id is not None:
+                crawled_at = entry["crawled_at"] if entry is not None else 0
+                cache[key] = {"paths": paths, "crawled_at": crawled_at, "run_id": run_id}
+                self._save(cache)
+            return paths
+
+    def _load(self) -> dict:
+        try:
+            return json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, cache: dict):
+        tmp_path = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(cache, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp_path.replace(self.cache_path)
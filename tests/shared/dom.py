@@ -0,0 +1,32 @@
+"""Пакетные запросы к DOM: много селекторов за один round trip к chromedriver"""
+from selene import browser
+
+# JS-функция, которую встраивают и другие скрипты (например, снимок страницы)
+QUERY_FUNCTION = """
+function querySelectors(selectors, withVisibility) {
+    const isVisible = (element) => {
+        if (element.checkVisibility) {
+            return element.checkVisibility({checkOpacity: true, checkVisibilityCSS: true});
+        }
+        const style = window.getComputedStyle(element);
+        return element.getClientRects().length > 0 && style.visibility !== 'hidden' && style.opacity !== '0';
+    };
+    const result = {};
+    for (const [name, selector] of Object.entries(selectors)) {
+        const elements = document.querySelectorAll(selector);
+        const entry = {count: elements.length};
+        if (withVisibility) {
+            entry.visible = Array.from(elements).filter(isVisible).length;
+        }
+        result[name] = entry;
+    }
+    return result;
+}
+"""
+
+QUERY_SCRIPT = QUERY_FUNCTION + "return querySelectors(arguments[0], arguments[1]);"
+
+
+def query_selectors(selectors: dict, visibility: bool = False) -> dict:
+    """Число совпадений (и, по желанию, видимых элементов) для каждого именованного селектора"""
+    return browser.driver.execute_script(QUERY_SCRIPT, selectors, visibility)
@@ -0,0 +1,96 @@
+"""Поиск ChromeDriver один раз на прогон, с lockfile и офлайн-режимом"""
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: поиск из параллельных процессов не сериализуем
+    fcntl = None
+
+# Явный путь к драйверу, имеет наивысший приоритет
+ENV_DRIVER_PATH = "CHROMEDRIVER_PATH"
+# Запрет любых сетевых запросов при поиске драйвера
+ENV_OFFLINE = "CHROMEDRIVER_OFFLINE"
+LOCKFILE_NAME = ".chromedriver.lock"
+# Корень репозитория (rootdir pytest): CLI-запуски находят lockfile и .cache из любого каталога
+ROOT_DIR = Path(__file__).resolve().parents[2]
+
+
+class DriverResolutionError(RuntimeError):
+    """ChromeDriver не удалось найти"""
+
+
+@dataclass
+class DriverResolution:
+    """Результат поиска ChromeDriver"""
+    path: str
+    source: str
+    seconds: float
+
+
+def read_lockfile(lockfile: Path) -> Optional[str]:
+    """Вернуть путь из lockfile, если драйвер по нему всё ещё существует"""
+    try:
+        data = json.loads(lockfile.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    path = data.get("path")
+    if path and os.access(path, os.X_OK):
+        return path
+    return None
+
+
+def write_lockfile(lockfile: Path, path: str):
+    """Сохранить найденный путь, чтобы следующие прогоны не ходили в сеть"""
+    data = {"path": path, "resolved_at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+    lockfile.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+def resolve_chromedriver(lockfile: Path, offline: bool = False, refresh: bool = False) -> DriverResolution:
+    """Найти ChromeDriver: env → lockfile → PATH (офлайн) → webdriver-manager"""
+    started = time.perf_counter()
+    if os.getenv(ENV_DRIVER_PATH):
+        path, source = _resolve(lockfile, offline, refresh)
+    else:
+        # Параллельные процессы (xdist-воркеры, сайты) ищут по очереди: первый скачивает
+        # драйвер и пишет lockfile, остальные читают его
+        with open(lockfile.with_name(lockfile.name + ".flock"), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            path, source = _resolve(lockfile, offline, refresh)
+    return DriverResolution(path=path, source=source, seconds=time.perf_counter() - started)
+
+
+def _resolve(lockfile: Path, offline: bool, refresh: bool):
+    env_path = os.getenv(ENV_DRIVER_PATH)
+    if env_path:
+        if not os.access(env_path, os.X_OK):
+            raise DriverResolutionError(f"{ENV_DRIVER_PATH}={env_path}: файл не найден или не исполняемый")
+        return env_path, "env"
+
+    if not refresh:
+        locked = read_lockfile(lockfile)
+        if locked:
+            return locked, "lockfile"
+
+    if offline:
+        system_path = shutil.which("chromedriver")
+        if system_path:
+            return system_path, "PATH"
+        raise DriverResolutionError(
+            f"Офлайн-режим: ChromeDriver не найден. Укажите {ENV_DRIVER_PATH}, "
+            f"положите путь в {lockfile} или добавьте chromedriver в PATH"
+        )
+
+    # Импортируем здесь, чтобы офлайн-прогоны не зависели от webdriver-manager
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    path = ChromeDriverManager().install()
+    write_lockfile(lockfile, path)
+    return path, "webdriver-manager"
@@ -0,0 +1,166 @@
+"""Модель формы: поля, подписи, обязательность и доступность за один round trip"""
+from dataclasses import dataclass
+from typing import Optional
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+FIELDS_SELECTOR = "input:not([type='hidden']), select, textarea"
+
+# Все поля формы с подписями и состоянием и адрес страницы; ссылки на элементы возвращаются вместе с данными,
+# чтобы сопоставлять селекторы полям без повторного поиска
+FORM_SCRIPT = """
+const root = arguments[0] ? document.querySelector(arguments[0]) : document;
+if (!root) {
+    return {url: location.href, fields: []};
+}
+const clean = (text) => (text || '').replace(/\\s+/g, ' ').trim();
+const isVisible = (element) => {
+    if (element.checkVisibility) {
+        return element.checkVisibility({checkOpacity: true, checkVisibilityCSS: true});
+    }
+    const style = window.getComputedStyle(element);
+    return element.getClientRects().length > 0 && style.visibility !== 'hidden' && style.opacity !== '0';
+};
+const labelOf = (element) => {
+    const texts = Array.from(element.labels || []).map((label) => label.textContent);
+    const labelledBy = element.getAttribute('aria-labelledby');
+    if (labelledBy) {
+        for (const id of labelledBy.split(/\\s+/)) {
+            const label = document.getElementById(id);
+            if (label) {
+                texts.push(label.textContent);
+            }
+        }
+    }
+    return clean(texts.join(' '));
+};
+const fields = Array.from(root.querySelectorAll(arguments[1])).map((element) => {
+    const label = labelOf(element);
+    const parent = element.parentElement;
+    return {
+        element: element,
+        tag: element.tagName.toLowerCase(),
+        type: element.getAttribute('type') || '',
+        name: element.getAttribute('name') || '',
+        id: element.id,
+        label: label,
+        aria_label: clean(element.getAttribute('aria-label')),
+        placeholder: clean(element.getAttribute('placeholder')),
+        required: element.required || element.getAttribute('aria-required') === 'true',
+        asterisk: label.includes('*') || (parent !== null && parent.textContent.includes('*')),
+        tabindex: element.getAttribute('tabindex'),
+        disabled: element.disabled,
+        visible: isVisible(element),
+    };
+});
+return {url: location.href, fields: fields};
+"""
+
+# Адрес страницы и то, что запомненные элементы всё ещё в документе (форму не перерисовали)
+CHECK_SCRIPT = "return [location.href, arguments[0].every((element) => element.isConnected)];"
+
+# Индекс первого поля формы, подходящего под селектор
+MATCH_SCRIPT = "return arguments[1].findIndex((element) => element.matches(arguments[0]));"
+
+
+@dataclass(frozen=True)
+class FormField:
+    """Поле формы в момент чтения модели"""
+    element: WebElement
+    tag: str
+    type: str
+    name: str
+    id: str
+    label: str
+    aria_label: str
+    placeholder: str
+    required: bool
+    asterisk: bool
+    tabindex: Optional[str]
+    disabled: bool
+    visible: bool
+
+    @property
+    def title(self) -> str:
+        """Как поле назвать в отчёте"""
+        return self.label or self.placeholder or self.name or self.id or f"{self.tag}[{self.type}]"
+
+    @property
+    def hint(self) -> str:
+        """Подсказка, которую видит пользователь: label, placeholder или aria-label"""
+        return self.label or self.placeholder or self.aria_label
+
+    @property
+    def marked_required(self) -> bool:
+        """Обязательность видна: атрибут required или '*' в подписи"""
+        return self.required or self.asterisk
+
+    @property
+    def focusable(self) -> bool:
+        return self.tabindex != "-1" and not self.disabled
+
+
+class FormModel:
+    """Поля формы, прочитанные одним скриптом; сбрасывается после изменений, переходов и при stale element"""
+
+    def __init__(self, driver: WebDriver, root: str = "", fields: str = FIELDS_SELECTOR):
+        self.driver = driver
+        self.root = root
+        self.fields_selector = fields
+        self._fields = None
+        self._matches = {}
+        self._outside = {}
+        self._url = None
+
+    def fields(self) -> list:
+        if self._fields is not None and not self._is_current():
+            self.invalidate()
+        if self._fields is None:
+            data = self.driver.execute_script(FORM_SCRIPT, self.root, self.fields_selector)
+            self._fields = [FormField(**entry) for entry in data["fields"]]
+            self._matches = {}
+            self._url = data["url"]
+        return self._fields
+
+    def _is_current(self) -> bool:
+        """Кэш относится к открытой странице: адрес тот же, поля на месте; один round trip"""
+        elements = [field.element for field in self._fields]
+        elements += [field.element for field in self._outside.values() if field is not None]
+        try:
+            url, connected = self.driver.execute_script(CHECK_SCRIPT, elements)
+        except (StaleElementReferenceException, NoSuchElementException):
+            # Элемент с прежней страницы или из другого окна
+            return False
+        return url == self._url and connected
+
+    def field(self, selector: str) -> Optional[FormField]:
+        """Поле по CSS-селектору: сопоставление запоминается, повторная проверка лишь сверяет кэш со страницей"""
+        for attempt in range(2):
+            fields = self.fields()
+            if selector in self._matches or not fields:
+                break
+            try:
+                elements = [field.element for field in fields]
+                self._matches[selector] = self.driver.execute_script(MATCH_SCRIPT, selector, elements)
+                break
+            except StaleElementReferenceException:
+                # Форму перерисовали: старые ссылки на элементы больше не действуют
+                self.invalidate()
+                if attempt:
+                    raise
+        index = self._matches.get(selector, -1)
+        return fields[index] if index >= 0 else self._find_outside(selector)
+
+    def _find_outside(self, selector: str) -> Optional[FormField]:
+        """Поле вне модели (другая форма, кнопка, нестандартный элемент): первое совпадение на всей странице"""
+        if selector not in self._outside:
+            data = self.driver.execute_script(FORM_SCRIPT, "", selector)["fields"]
+            self._outside[selector] = FormField(**data[0]) if data else None
+        return self._outside[selector]
+
+    def invalidate(self):
+        self._fields = None
+        self._matches = {}
+        self._outside = {}
@@ -0,0 +1,238 @@
+"""Геометрия вёрстки: прямоугольники видимых элементов, наслоения и расстояния между ними"""
+import csv
+import io
+import math
+from dataclasses import dataclass
+from itertools import combinations
+from xml.sax.saxutils import escape
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+# Прямоугольники всех видимых интерактивных и текстовых элементов за один execute_script.
+# pre/post — номера входа и выхода при обходе DOM: по ним Python проверяет вложенность без лишних запросов.
+RECTS_SCRIPT = """
+const ignore = arguments[0];
+const INTERACTIVE = 'a[href], button, input:not([type="hidden"]), select, textarea, [role="button"]';
+const CONTROLS = 'button, input, select, textarea, [role="button"]';
+const SKIPPED = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE', 'HEAD']);
+const scrollX = window.scrollX, scrollY = window.scrollY;
+const isVisible = (element) => {
+    if (element.checkVisibility) {
+        return element.checkVisibility({checkOpacity: true, checkVisibilityCSS: true});
+    }
+    const style = window.getComputedStyle(element);
+    return style.visibility !== 'hidden' && style.opacity !== '0' && element.getClientRects().length > 0;
+};
+// Перенесённый на несколько строк текст описывается прямоугольником каждой строки:
+// общий прямоугольник занял бы всю ширину строк и «наслоился» бы на соседние ссылки
+const ownTextRects = (element) => {
+    const range = document.createRange();
+    const rects = [];
+    for (const node of element.childNodes) {
+        if (node.nodeType !== Node.TEXT_NODE || !node.textContent.trim()) {
+            continue;
+        }
+        range.selectNodeContents(node);
+        rects.push(...range.getClientRects());
+    }
+    return rects;
+};
+const label = (element) => {
+    let name = element.tagName.toLowerCase();
+    if (element.id) {
+        name += '#' + element.id;
+    } else if (typeof element.className === 'string' && element.className.trim()) {
+        name += '.' + element.className.trim().split(/\\s+/)[0];
+    }
+    // textContent не требует перерасчёта раскладки, в отличие от innerText
+    const text = (element.value || element.getAttribute('aria-label') || element.textContent || '')
+        .replace(/\\s+/g, ' ').trim();
+    return text ? name + ' "' + text.slice(0, 30) + '"' : name;
+};
+
+const boxes = [];
+const open = new Map();
+let counter = 0;
+const stack = [[document.body, false]];
+while (stack.length) {
+    const [element, leaving] = stack.pop();
+    if (leaving) {
+        if (open.has(element)) {
+            open.get(element).forEach((box) => { box[5] = counter; });
+            open.delete(element);
+        }
+        counter++;
+        continue;
+    }
+    if (!element || SKIPPED.has(element.tagName) || (ignore && element.matches(ignore))) {
+        continue;
+    }
+    const pre = counter++;
+    stack.push([element, true]);
+    for (let i = element.children.length - 1; i >= 0; i--) {
+        stack.push([element.children[i], false]);
+    }
+    const interactive = element.matches(INTERACTIVE);
+    // У текстового элемента берём только его собственный текст: блок целиком шире, чем видимые буквы.
+    // Строчная ссылка с переносом тоже даёт по прямоугольнику на строку
+    const rects = Array.from(interactive ? element.getClientRects() : ownTextRects(element))
+        .filter((rect) => rect.width >= 1 && rect.height >= 1);
+    if (!rects.length || !isVisible(element)) {
+        continue;
+    }
+    const kind = element.matches(CONTROLS) ? 'control' : interactive ? 'link' : 'text';
+    const name = label(element);
+    const own = rects.map((rect) => [
+        rect.left + scrollX, rect.top + scrollY, rect.width, rect.height, pre, null, kind, name,
+    ]);
+    open.set(element, own);
+    boxes.push(...own);
+}
+const root = document.documentElement;
+return {
+    width: Math.max(root.scrollWidth, document.body.scrollWidth),
+    height: Math.max(root.scrollHeight, document.body.scrollHeight),
+    boxes: boxes,
+};
+"""
+
+
+@dataclass(frozen=True)
+class Box:
+    """Прямоугольник элемента в координатах документа"""
+    left: float
+    top: float
+    width: float
+    height: float
+    pre: int
+    post: int
+    kind: str
+    label: str
+
+    @property
+    def right(self) -> float:
+        return self.left + self.width
+
+    @property
+    def bottom(self) -> float:
+        return self.top + self.height
+
+    def is_nested(self, other: "Box") -> bool:
+        """Один элемент внутри другого или строки одного элемента: такое перекрытие задумано вёрсткой"""
+        return (
+            self.pre == other.pre
+            or (self.pre < other.pre and other.post < self.post)
+            or (other.pre < self.pre and self.post < other.post)
+        )
+
+
+@dataclass(frozen=True)
+class Layout:
+    """Размер документа и прямоугольники его элементов"""
+    width: float
+    height: float
+    boxes: tuple
+
+
+@dataclass(frozen=True)
+class Violation:
+    """Нарушение вёрстки между двумя элементами"""
+    rule: str
+    first: Box
+    second: Box
+    value: float
+
+
+def collect_layout(driver: WebDriver, ignore: str = "") -> Layout:
+    """Снять прямоугольники элементов страницы; ignore — CSS-селектор пропускаемых поддеревьев"""
+    data = driver.execute_script(RECTS_SCRIPT, ignore)
+    return Layout(data["width"], data["height"], tuple(Box(*entry) for entry in data["boxes"]))
+
+
+def candidate_pairs(boxes, margin: float = 0, cell: float = 128) -> set:
+    """Пары прямоугольников, которые могут быть ближе margin: сетка вместо сравнения всех со всеми"""
+    grid = {}
+    for index, box in enumerate(boxes):
+        for column in range(int((box.left - margin) // cell), int((box.right + margin) // cell) + 1):
+            for row in range(int((box.top - margin) // cell), int((box.bottom + margin) // cell) + 1):
+                grid.setdefault((column, row), []).append(index)
+    pairs = set()
+    for bucket in grid.values():
+        pairs.update(combinations(bucket, 2))
+    return pairs
+
+
+def _intersection(a: Box, b: Box):
+    return min(a.right, b.right) - max(a.left, b.left), min(a.bottom, b.bottom) - max(a.top, b.top)
+
+
+def find_overlaps(boxes, tolerance: float = 2) -> list:
+    """Наслоения элементов, не вложенных друг в друга, больше tolerance пикселей по обеим осям"""
+    violations = []
+    for i, j in sorted(candidate_pairs(boxes)):
+        a, b = boxes[i], boxes[j]
+        width, height = _intersection(a, b)
+        if width > tolerance and height > tolerance and not a.is_nested(b):
+            violations.append(Violation("overlap", a, b, round(width * height)))
+    return violations
+
+
+def find_spacing_violations(boxes, min_gap: float, kinds=("control",), tolerance: float = 2) -> list:
+    """Пары элементов kinds, расстояние между которыми меньше min_gap (наслоения не учитываются)"""
+    selected = [box for box in boxes if box.kind in kinds]
+    violations = []
+    for i, j in sorted(candidate_pairs(selected, margin=min_gap)):
+        a, b = selected[i], selected[j]
+        width, height = _intersection(a, b)
+        if (width > tolerance and height > tolerance) or a.is_nested(b):
+            continue
+        gap = math.hypot(max(-width, 0), max(-height, 0))
+        if gap < min_gap:
+            violations.append(Violation("spacing", a, b, round(gap, 1)))
+    return violations
+
+
+def violations_csv(violations) -> str:
+    """Таблица нарушений для Allure"""
+    table = io.StringIO()
+    writer = csv.writer(table)
+    writer.writerow(["rule", "value", "first", "first_rect", "second", "second_rect"])
+    for violation in violations:
+        writer.writerow([
+            violation.rule,
+            violation.value,
+            violation.first.label,
+            _rect(violation.first),
+            violation.second.label,
+            _rect(violation.second),
+        ])
+    return table.getvalue()
+
+
+def _rect(box: Box) -> str:
+    return f"{box.left:.0f},{box.top:.0f} {box.width:.0f}x{box.height:.0f}"
+
+
+def layout_svg(layout: Layout, violations, max_width: int = 1200) -> str:
+    """Схема страницы: все элементы серым, нарушения красным с подписями в подсказках"""
+    scale = min(1, max_width / layout.width) if layout.width else 1
+
+    def rect(box: Box, style: str, title: str = "") -> str:
+        tooltip = f"<title>{escape(title)}</title>" if title else ""
+        return (
+            f'<rect x="{box.left * scale:.1f}" y="{box.top * scale:.1f}" '
+            f'width="{box.width * scale:.1f}" height="{box.height * scale:.1f}" {style}>{tooltip}</rect>'
+        )
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{layout.width * scale:.0f}" '
+        f'height="{layout.height * scale:.0f}">',
+        '<rect width="100%" height="100%" fill="white"/>',
+    ]
+    parts += [rect(box, 'fill="none" stroke="#bbb" stroke-width="0.5"', box.label) for box in layout.boxes]
+    for violation in violations:
+        title = f"{violation.rule} ({violation.value}): {violation.first.label} / {violation.second.label}"
+        for box in (violation.first, violation.second):
+            parts.append(rect(box, 'fill="red" fill-opacity="0.2" stroke="red" stroke-width="1"', title))
+    parts.append("</svg>")
+    return "\n".join(parts)
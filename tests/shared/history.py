@@ -0,0 +1,150 @@
+"""История прогонов в SQLite: длительности и исходы тестов для расписания и поиска нестабильных"""
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL,
+    workers INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    nodeid TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration REAL NOT NULL,
+    retries INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS results_run ON results(run_id);
+"""
+
+
+@dataclass
+class HistoryEntry:
+    """Тест за последние прогоны: средняя длительность, число запусков и падений"""
+    duration: float = 0.0
+    runs: int = 0
+    failures: int = 0
+    retries: int = 0
+    # Номер последнего прогона с падением: чем больше, тем свежее
+    last_failed: Optional[int] = None
+
+    @property
+    def flaky(self) -> bool:
+        """Тест то падал, то проходил, или проходил только с повтором"""
+        return 0 < self.failures < self.runs or self.retries > 0
+
+    @property
+    def data(self) -> list:
+        return [self.duration, self.runs, self.failures, self.retries, self.last_failed]
+
+
+class RunRecorder:
+    """Плагин pytest: исход, длительность всех фаз и повторы каждого теста текущего прогона"""
+
+    def __init__(self):
+        self.results = {}
+        # Отпечатки страниц тестов инкрементального режима: nodeid -> отпечаток
+        self.fingerprints = {}
+
+    def pytest_runtest_logreport(self, report):
+        properties = dict(report.user_properties)
+        # Кэшированный успех не запускался: его длительность исказила бы расписание
+        if "cached_pass" in properties:
+            return
+        if "page_fingerprint" in properties:
+            self.fingerprints[report.nodeid] = properties["page_fingerprint"]
+        result = self.results.setdefault(report.nodeid, ["passed", 0.0, 0])
+        result[1] += report.duration
+        if report.outcome == "rerun":
+            result[2] += 1
+        elif report.failed:
+            result[0] = "failed"
+        elif report.skipped and result[0] != "failed":
+            result[0] = "skipped"
+
+
+class RunHistory:
+    """Файл SQLite с результатами последних прогонов; пишет только основной процесс"""
+
+    def __init__(self, path: Path, keep_runs: int = 50):
+        self.path = path
+        self.keep_runs = keep_runs
+
+    def connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def record(self, results: dict, workers: int = 1, started: float = None) -> Optional[int]:
+        """Сохранить прогон: {nodeid: (исход, длительность, повторы)}; вернуть его номер, старые удалить"""
+        if not results:
+            return None
+        with closing(self.connect()) as connection, connection:
+            run_id = connection.execute(
+                "INSERT INTO runs (started, workers) VALUES (?, ?)", (started or time.time(), workers)
+            ).lastrowid
+            connection.executemany(
+                "INSERT INTO results (run_id, nodeid, outcome, duration, retries) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, nodeid, outcome, duration, retries) for nodeid, (outcome, duration, retries) in results.items()],
+            )
+            connection.execute(
+                "DELETE FROM runs WHERE id <= (SELECT id FROM runs ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (self.keep_runs,),
+            )
+        return run_id
+
+    def load(self, window: int = 10) -> dict:
+        """История тестов за последние window прогонов: {nodeid: HistoryEntry}"""
+        if not self.path.is_file():
+            return {}
+        with closing(self.connect()) as connection:
+            rows = connection.execute(
+                """
+                SELECT nodeid, outcome, duration, retries, run_id FROM results
+                WHERE run_id IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?)
+                ORDER BY run_id
+                """,
+                (window,),
+            ).fetchall()
+        tests, durations = {}, {}
+        for nodeid, outcome, duration, retries, run_id in rows:
+            test = tests.setdefault(nodeid, HistoryEntry())
+            test.retries += retries
+            if outcome == "skipped":
+                continue
+            test.runs += 1
+            durations.setdefault(nodeid, []).append(duration)
+            if outcome == "failed":
+                test.failures += 1
+                test.last_failed = run_id
+        for nodeid, values in durations.items():
+            tests[nodeid].duration = sum(values) / len(values)
+        return tests
+
+
+def schedule(groups: list, history: dict, fail_fast: bool = False) -> list:
+    """Порядок групп nodeid (тесты сценария идут подряд): сначала длинные, с fail_fast — недавно падавшие"""
+    known = [entry.duration for entry in history.values() if entry.runs]
+    # Новый тест без истории считаем средним по длительности
+    default = sum(known) / len(known) if known else 0.0
+
+    def expected(nodeid: str) -> float:
+        entry = history.get(nodeid)
+        return entry.duration if entry is not None and entry.runs else default
+
+    def key(group):
+        duration = sum(expected(nodeid) for nodeid in group)
+        if not fail_fast:
+            return (-duration,)
+        failed = [history[nodeid].last_failed for nodeid in group
+                  if nodeid in history and history[nodeid].last_failed is not None]
+        return (not failed, -max(failed, default=0), -duration)
+
+    return sorted(groups, key=key)
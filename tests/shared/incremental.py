@@ -0,0 +1,226 @@
+"""Инкрементальные прогоны: отпечатки страниц и кэшированные успехи тестов неизменившихся страниц"""
+import asyncio
+import hashlib
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urljoin
+
+import aiohttp
+import allure
+import pytest
+
+from tests.shared.history import RunHistory
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    sha256 TEXT NOT NULL,
+    checked_run TEXT
+);
+CREATE TABLE IF NOT EXISTS passes (
+    nodeid TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    run_id INTEGER NOT NULL
+);
+"""
+
+
+def code_fingerprint(directories) -> str:
+    """Хэш исходников тестов и page object: изменённый код не должен получать кэшированный успех"""
+    digest = hashlib.sha256()
+    for directory in directories:
+        for path in sorted(Path(directory).rglob("*.py")):
+            digest.update(str(path.relative_to(directory)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def fingerprint_of(code: str, pages: dict) -> Optional[str]:
+    """Отпечаток теста: код и содержимое всех его страниц; None, если какую-то страницу не скачали"""
+    if any(sha is None for sha in pages.values()):
+        return None
+    digest = hashlib.sha256(code.encode())
+    for url in sorted(pages):
+        digest.update(f"\n{url} {pages[url]}".encode())
+    return digest.hexdigest()
+
+
+async def _get(session, url: str, validators: tuple):
+    etag, last_modified, sha = validators
+    headers = {}
+    if sha is not None:
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    async with session.get(url, headers=headers, allow_redirects=True) as response:
+        # 304: сервер подтвердил, что страница не менялась, тело не передаётся
+        if response.status == 304:
+            return etag, last_modified, sha
+        if response.status != 200:
+            return None
+        body = await response.read()
+        return (
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            hashlib.sha256(body).hexdigest(),
+        )
+
+
+async def _check(session, url: str, validators: tuple, slots, timeout: float):
+    # Таймаут считаем после получения слота: ожидание в очереди не должно превращаться в ошибку
+    async with slots:
+        try:
+            return url, await asyncio.wait_for(_get(session, url, validators), timeout)
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            return url, None
+
+
+async def _check_all(urls: dict, concurrency: int, timeout: float) -> list:
+    if not urls:
+        return []
+    slots = asyncio.Semaphore(concurrency)
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+        return await asyncio.gather(*(
+            _check(session, url, validators, slots, timeout) for url, validators in urls.items()
+        ))
+
+
+class IncrementalStore:
+    """Отпечатки страниц и успехи тестов в файле истории прогонов (ссылки на прогоны из runs)"""
+
+    def __init__(self, history: RunHistory):
+        self.history = history
+
+    def _connect(self):
+        connection = self.history.connect()
+        connection.executescript(SCHEMA)
+        return connection
+
+    def check_pages(self, urls, run_id: Optional[str] = None, concurrency: int = 8, timeout: float = 15) -> dict:
+        """Условный GET каждой страницы: url -> sha256 содержимого (None, если запрос не удался)"""
+        urls = sorted(set(urls))
+        if not urls:
+            return {}
+        with closing(self._connect()) as connection:
+            known = self._known_pages(connection)
+        result = {url: known[url][2] for url in urls if self._checked_in_run(known.get(url), run_id)}
+        # Сеть — вне транзакции: другие воркеры не ждут блокировку SQLite, пока идут запросы
+        checked = asyncio.run(_check_all(
+            {url: known.get(url, (None, None, None, None))[:3] for url in urls if url not in result},
+            concurrency, timeout,
+        ))
+        with closing(self._connect()) as connection, connection:
+            # Воркеры xdist должны собрать одинаковые тесты: в пределах прогона побеждает
+            # первый записанный результат, остальные воркеры берут его по общему testrunuid
+            connection.execute("BEGIN IMMEDIATE")
+            known = self._known_pages(connection)
+            rows = []
+            for url, validators in checked:
+                if self._checked_in_run(known.get(url), run_id):
+                    result[url] = known[url][2]
+                    continue
+                result[url] = validators[2] if validators is not None else None
+                if validators is not None:
+                    rows.append((url, *validators, run_id))
+            connection.executemany(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, sha256, checked_run) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return result
+
+    @staticmethod
+    def _known_pages(connection) -> dict:
+        return {
+            row[0]: row[1:]
+            for row in connection.execute("SELECT url, etag, last_modified, sha256, checked_run FROM pages")
+        }
+
+    @staticmethod
+    def _checked_in_run(row, run_id: Optional[str]) -> bool:
+        return run_id is not None and row is not None and row[3] == run_id
+
+    def cached_passes(self, fingerprints: dict) -> dict:
+        """Тесты, прошедшие с тем же отпечатком: nodeid -> (номер прогона, время начала)"""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT passes.nodeid, passes.fingerprint, runs.id, runs.started "
+                "FROM passes JOIN runs ON runs.id = passes.run_id"
+            ).fetchall()
+        return {
+            nodeid: (run_id, started)
+            for nodeid, fingerprint, run_id, started in rows
+            if fingerprints.get(nodeid) == fingerprint
+        }
+
+    def save_results(self, run_id: int, fingerprints: dict, outcomes: dict):
+        """Запомнить отпечатки тестов, прошедших в прогоне run_id; упавшие теряют кэшированный успех"""
+        passed = [(nodeid, fingerprint, run_id) for nodeid, fingerprint in fingerprints.items()
+                  if outcomes.get(nodeid) == "passed"]
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                "DELETE FROM passes WHERE nodeid = ?",
+                [(nodeid,) for nodeid in fingerprints if outcomes.get(nodeid) != "passed"],
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO passes (nodeid, fingerprint, run_id) VALUES (?, ?, ?)", passed,
+            )
+
+
+def bound_pages(item) -> tuple:
+    """Пути страниц, от которых зависит тест: параметр site_path, маркер static(path) или pages(...)"""
+    callspec = getattr(item, "callspec", None)
+    if callspec is not None and "site_path" in callspec.params:
+        return (callspec.params["site_path"],)
+    static = item.get_closest_marker("static")
+    if static is not None and static.args:
+        return static.args
+    pages = item.get_closest_marker("pages")
+    return pages.args if pages is not None else ()
+
+
+def page_urls(base_url: str, paths) -> list:
+    return [urljoin(base_url, path) for path in paths]
+
+
+class CachedPass(pytest.Item):
+    """Тест неизменившихся страниц: не запускается, а ссылается на прогон, где он прошёл"""
+
+    def __init__(self, *, original: pytest.Function, run_id: int, started: float, **kwargs):
+        super().__init__(**kwargs)
+        self.run_id = run_id
+        self.started = started
+        # Allure берёт заголовок, описание и параметры теста из этих атрибутов
+        self.obj = original.obj
+        self.function = original.function
+        self.originalname = original.originalname
+        self.funcargs = {}
+        if hasattr(original, "callspec"):
+            self.callspec = original.callspec
+        self.own_markers = list(original.own_markers)
+        self.keywords.update(original.keywords)
+        self.user_properties.append(("cached_pass", run_id))
+
+    @classmethod
+    def replace(cls, item: pytest.Function, run_id: int, started: float) -> "CachedPass":
+        return cls.from_parent(item.parent, name=item.name, original=item, run_id=run_id, started=started)
+
+    @property
+    def reference(self) -> str:
+        return f"прогон #{self.run_id} от {datetime.fromtimestamp(self.started):%Y-%m-%d %H:%M}"
+
+    def runtest(self):
+        allure.dynamic.tag("cached-pass")
+        allure.attach(
+            f"Страницы теста не изменились с прошлого успешного прогона: {self.reference}.\n"
+            f"Полный прогон: pytest --force-full",
+            name="Кэшированный успех",
+            attachment_type=allure.attachment_type.TEXT,
+        )
+
+    def reportinfo(self):
+        return self.path, None, f"{self.name} (кэш: {self.reference})"
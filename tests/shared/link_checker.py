@@ -0,0 +1,126 @@
+"""Асинхронная HTTP-проверка ссылок страницы с пулом соединений и кэшем на диске"""
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urldefrag, urlsplit
+
+import aiohttp
+
+# Серверы, которые не поддерживают HEAD, отвечают одним из этих статусов — тогда повторяем GET
+HEAD_UNSUPPORTED = (403, 405, 501)
+
+
+@dataclass
+class LinkResult:
+    """Результат проверки одной ссылки"""
+    url: str
+    status: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status is not None and self.status < 400
+
+
+def normalize_links(hrefs) -> list:
+    """Оставить уникальные http(s)-ссылки без фрагментов (mailto:, tel:, javascript: отбрасываются)"""
+    links = set()
+    for href in hrefs:
+        url = urldefrag((href or "").strip())[0]
+        if urlsplit(url).scheme in ("http", "https"):
+            links.add(url)
+    return sorted(links)
+
+
+class LinkChecker:
+    """Проверяет ссылки конкурентно: общий пул соединений, лимит на хост, таймаут и кэш с TTL"""
+
+    def __init__(
+        self,
+        cache_path: Optional[Path] = None,
+        ttl: float = 3600,
+        timeout: float = 10,
+        concurrency: int = 20,
+        per_host: int = 4,
+    ):
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.per_host = per_host
+
+    def check(self, urls) -> list:
+        """Проверить ссылки; успешные результаты моложе TTL берутся из кэша"""
+        cache = self._load_cache()
+        now = time.time()
+        wanted = set(urls)
+        cached = {
+            url: LinkResult(url, status=entry["status"])
+            for url, entry in cache.items()
+            if url in wanted and now - entry["checked_at"] < self.ttl
+        }
+        fresh = asyncio.run(self._check_all([url for url in urls if url not in cached]))
+
+        # Устаревшие записи удаляем, иначе кэш растёт с каждой новой ссылкой
+        cache = {url: entry for url, entry in cache.items() if now - entry["checked_at"] < self.ttl}
+        for result in fresh:
+            # Кэшируем только рабочие ссылки: сломанные перепроверяются в каждом прогоне
+            if result.ok:
+                cache[result.url] = {"status": result.status, "checked_at": now}
+        self._save_cache(cache)
+
+        results = {**cached, **{result.url: result for result in fresh}}
+        return [results[url] for url in urls]
+
+    async def _check_all(self, urls) -> list:
+        if not urls:
+            return []
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host)
+        # Таймаут считаем с момента, когда запросу досталось соединение: общий total у сессии
+        # включал бы и ожидание в очереди limit_per_host, и здоровые ссылки падали бы по таймауту
+        slots = asyncio.Semaphore(self.concurrency)
+        hosts = {urlsplit(url).netloc: asyncio.Semaphore(self.per_host) for url in urls}
+        async with aiohttp.ClientSession(connector=connector) as session:
+            return await asyncio.gather(*(
+                self._check_one(session, url, slots, hosts[urlsplit(url).netloc]) for url in urls
+            ))
+
+    async def _check_one(self, session, url: str, slots, host_slots) -> LinkResult:
+        try:
+            async with host_slots, slots:
+                status = await asyncio.wait_for(self._request(session, url), self.timeout)
+            return LinkResult(url, status=status)
+        except asyncio.TimeoutError:
+            return LinkResult(url, error=f"таймаут {self.timeout} с")
+        except aiohttp.ClientError as e:
+            return LinkResult(url, error=f"{type(e).__name__}: {e}")
+
+    @staticmethod
+    async def _request(session, url: str) -> int:
+        async with session.head(url, allow_redirects=True) as response:
+            status = response.status
+        if status in HEAD_UNSUPPORTED:
+            async with session.get(url, allow_redirects=True) as response:
+                status = response.status
+        return status
+
+    def _load_cache(self) -> dict:
+        if self.cache_path is None:
+            return {}
+        try:
+            return json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self, cache: dict):
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Пишем через временный файл: параллельные воркеры не должны видеть кэш наполовину записанным
+        tmp_path = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(cache, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp_path.replace(self.cache_path)
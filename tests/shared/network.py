@@ -0,0 +1,38 @@
+"""Блокировка сторонних запросов на уровне браузера через CDP"""
+import json
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+def block_urls(driver: WebDriver, patterns):
+    """Запретить браузеру запросы по шаблонам URL (поддерживается '*')"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+
+
+def network_events(driver: WebDriver) -> list:
+    """Забрать накопленные CDP-события Network.* из performance-лога (лог при этом очищается)"""
+    try:
+        entries = driver.get_log("performance")
+    except WebDriverException:
+        return []
+    events = []
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        if message.get("method", "").startswith("Network."):
+            events.append(message)
+    return events
+
+
+def blocked_requests(events) -> list:
+    """URL запросов, которые браузер не отправил из-за блоклиста"""
+    urls = {}
+    blocked = []
+    for event in events:
+        params = event.get("params", {})
+        if event["method"] == "Network.requestWillBeSent":
+            urls[params["requestId"]] = params["request"]["url"]
+        elif event["method"] == "Network.loadingFailed" and params.get("blockedReason"):
+            blocked.append(urls.get(params["requestId"], params["requestId"]))
+    return blocked
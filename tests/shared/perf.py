@@ -0,0 +1,65 @@
+"""Метрики загрузки страницы (Navigation/Paint Timing, LCP, CLS) и проверка бюджетов"""
+from selene import browser
+
+# buffered-наблюдатели сразу получают уже случившиеся записи, takeRecords забирает их синхронно
+TIMING_SCRIPT = """
+const observe = (type) => {
+    const supported = PerformanceObserver.supportedEntryTypes || [];
+    if (!supported.includes(type)) {
+        return null;
+    }
+    const observer = new PerformanceObserver(() => {});
+    observer.observe({type: type, buffered: true});
+    const entries = observer.takeRecords();
+    observer.disconnect();
+    return entries;
+};
+const navigation = performance.getEntriesByType('navigation')[0];
+const paint = {};
+for (const entry of performance.getEntriesByType('paint')) {
+    paint[entry.name] = entry.startTime;
+}
+const lcpEntries = observe('largest-contentful-paint');
+const shifts = observe('layout-shift');
+return {
+    navigation: navigation ? navigation.toJSON() : null,
+    paint: paint,
+    lcp: lcpEntries && lcpEntries.length ? lcpEntries[lcpEntries.length - 1].startTime : null,
+    cls: shifts ? shifts.filter((entry) => !entry.hadRecentInput).reduce((sum, entry) => sum + entry.value, 0) : null,
+};
+"""
+
+
+def collect_timing() -> dict:
+    """Снять сырые данные о загрузке текущей страницы"""
+    return browser.driver.execute_script(TIMING_SCRIPT)
+
+
+def _ms(value):
+    # Нулевые отметки означают, что событие ещё не наступило (например, при page load strategy eager)
+    return round(value) if value else None
+
+
+def summarize(timing: dict) -> dict:
+    """Ключевые метрики страницы в миллисекундах (None — недоступно)"""
+    navigation = timing.get("navigation") or {}
+    paint = timing.get("paint") or {}
+    return {
+        "ttfb_ms": _ms(navigation.get("responseStart")),
+        "dom_content_loaded_ms": _ms(navigation.get("domContentLoadedEventEnd")),
+        "load_ms": _ms(navigation.get("loadEventEnd")),
+        "transfer_bytes": navigation.get("transferSize"),
+        "fcp_ms": _ms(paint.get("first-contentful-paint")),
+        "lcp_ms": _ms(timing.get("lcp")),
+        "cls": round(timing["cls"], 4) if timing.get("cls") is not None else None,
+    }
+
+
+def budget_violations(metrics: dict, budget: dict) -> list:
+    """Метрики, превысившие бюджет; недоступные метрики не проверяются"""
+    violations = []
+    for name, limit in budget.items():
+        value = metrics.get(name)
+        if value is not None and value > limit:
+            violations.append(f"{name}: {value} > {limit}")
+    return violations
@@ -0,0 +1,94 @@
+"""Профили запуска Chrome и статистика запуска/памяти по каждому профилю"""
+from dataclasses import dataclass, field
+
+# Общие флаги облегчённых профилей: без GPU, расширений и фоновой сетевой активности
+LEAN_ARGUMENTS = (
+    "--headless=new",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+    "--disable-dev-shm-usage",
+)
+
+
+@dataclass(frozen=True)
+class BrowserProfile:
+    """Набор флагов и настроек Chrome под одним именем"""
+    name: str
+    arguments: tuple = ()
+    prefs: dict = field(default_factory=dict)
+
+    def apply(self, options):
+        """Добавить флаги и настройки профиля в ChromeOptions"""
+        for argument in self.arguments:
+            options.add_argument(argument)
+        if self.prefs:
+            options.add_experimental_option("prefs", self.prefs)
+
+
+# Порядок важен: от самого лёгкого профиля к самому полному
+PROFILES = {
+    "headless-no-images": BrowserProfile(
+        name="headless-no-images",
+        arguments=LEAN_ARGUMENTS + ("--blink-settings=imagesEnabled=false",),
+        prefs={"profile.managed_default_content_settings.images": 2},
+    ),
+    "headless": BrowserProfile(name="headless", arguments=LEAN_ARGUMENTS),
+    "full": BrowserProfile(name="full"),
+}
+DEFAULT_PROFILE = "full"
+
+
+def at_least(run_profile: str, required: str) -> str:
+    """Выбрать профиль для теста: профиль прогона, но не легче требуемого тестом"""
+    order = list(PROFILES)
+    if required not in PROFILES:
+        raise ValueError(f"Неизвестный профиль браузера: {required}. Доступны: {', '.join(order)}")
+    return max(run_profile, required, key=order.index)
+
+
+class ProfileStats:
+    """Время запуска и пиковая память браузера по профилям"""
+
+    def __init__(self):
+        self.data = {}
+
+    def _entry(self, profile: str) -> dict:
+        return self.data.setdefault(profile, {"launches": 0, "startup_seconds": 0.0, "peak_rss": 0})
+
+    def record_launch(self, profile: str, seconds: float):
+        entry = self._entry(profile)
+        entry["launches"] += 1
+        entry["startup_seconds"] += seconds
+
+    def record_memory(self, profile: str, rss_bytes: int):
+        entry = self._entry(profile)
+        entry["peak_rss"] = max(entry["peak_rss"], rss_bytes)
+
+    def merge(self, data: dict):
+        """Добавить статистику, собранную другим процессом (xdist-воркером)"""
+        for profile, other in data.items():
+            entry = self._entry(profile)
+            entry["launches"] += other["launches"]
+            entry["startup_seconds"] += other["startup_seconds"]
+            entry["peak_rss"] = max(entry["peak_rss"], other["peak_rss"])
+
+    def lines(self) -> list:
+        """Строки для итоговой сводки прогона"""
+        result = []
+        for profile in PROFILES:
+            entry = self.data.get(profile)
+            if not entry or not entry["launches"]:
+                continue
+            startup = entry["startup_seconds"] / entry["launches"]
+            memory = f"{entry['peak_rss'] / 2 ** 20:.0f} МБ" if entry["peak_rss"] else "н/д"
+            result.append(
+                f"{profile:<20} запусков: {entry['launches']:<3} "
+                f"средний запуск: {startup:.2f} с  пик памяти: {memory}"
+            )
+        return result
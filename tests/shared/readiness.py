@@ -0,0 +1,89 @@
+"""Декларативные условия готовности страницы вместо ожидания полного события load"""
+import json
+from dataclasses import dataclass
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support.wait import WebDriverWait
+
+# Счётчик незавершённых XHR/fetch; ставится в каждый документ до выполнения скриптов страницы
+REQUEST_TRACKER_SCRIPT = """
+(() => {
+    if (window.__pendingRequests !== undefined) {
+        return;
+    }
+    window.__pendingRequests = 0;
+    const done = () => { window.__pendingRequests = Math.max(0, window.__pendingRequests - 1); };
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function (...args) {
+        window.__pendingRequests++;
+        this.addEventListener('loadend', done, {once: true});
+        return send.apply(this, args);
+    };
+    if (window.fetch) {
+        const fetch = window.fetch;
+        window.fetch = function (...args) {
+            window.__pendingRequests++;
+            return fetch.apply(this, args).finally(done);
+        };
+    }
+})();
+"""
+
+PAGE_LOAD_STRATEGIES = ("normal", "eager", "none")
+
+
+@dataclass(frozen=True)
+class Condition:
+    """Условие готовности: JS-выражение, которое должно стать истинным"""
+    description: str
+    expression: str
+
+
+def document_ready(state: str = "interactive") -> Condition:
+    """document.readyState достиг состояния interactive (DOM разобран) или complete"""
+    states = ["interactive", "complete"] if state == "interactive" else ["complete"]
+    return Condition(f"document.readyState: {state}", f"{json.dumps(states)}.includes(document.readyState)")
+
+
+def selector_present(selector: str) -> Condition:
+    """В DOM есть хотя бы один элемент по селектору"""
+    return Condition(f"есть элемент {selector}", f"document.querySelector({json.dumps(selector)}) !== null")
+
+
+def no_pending_requests() -> Condition:
+    """Нет незавершённых XHR/fetch (если счётчик не установлен, условие считается выполненным)"""
+    return Condition("нет активных XHR/fetch", "!(window.__pendingRequests > 0)")
+
+
+def install_request_tracker(driver: WebDriver):
+    """Подключить счётчик запросов ко всем будущим документам браузера"""
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": REQUEST_TRACKER_SCRIPT})
+
+
+def _check_script(conditions) -> str:
+    # Выражения встраиваются в текст скрипта, а не через eval: на страницах с CSP eval запрещён
+    checks = ",\n".join(
+        f"(() => {{ try {{ return Boolean({c.expression}); }} catch (e) {{ return false; }} }})()"
+        for c in conditions
+    )
+    return f"return [{checks}];"
+
+
+def wait_until_ready(driver: WebDriver, conditions, timeout: float, poll: float = 0.1):
+    """Ждать, пока все условия выполнятся; проверка всех условий — один запрос к браузеру"""
+    if not conditions:
+        return
+    script = _check_script(conditions)
+    results = []
+
+    def all_met(current_driver):
+        results[:] = current_driver.execute_script(script)
+        return all(results)
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=poll).until(all_met)
+    except TimeoutException:
+        unmet = [c.description for c, met in zip(conditions, results) if not met]
+        unmet = unmet or [c.description for c in conditions]
+        raise TimeoutException(f"Страница не готова за {timeout} с: " + ", ".join(unmet)) from None
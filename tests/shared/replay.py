@@ -0,0 +1,187 @@
+"""Запись HTTP-ответов сайта в архив и локальный replay-сервер вместо живого сайта"""
+import hashlib
+import json
+import re
+import threading
+from html.parser import HTMLParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+import requests
+
+from tests.shared.crawler import site_host
+
+INDEX_NAME = "index.json"
+BODIES_DIR = "bodies"
+# Заголовки, которые сохраняем: остальные (cookies, даты, кэш) делают ответы недетерминированными
+KEPT_HEADERS = ("Content-Type",)
+TEXT_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+CSS_URL = re.compile(r"""url\(\s*['"]?([^'")]+)['"]?\s*\)""")
+
+
+class ReplayArchiveError(RuntimeError):
+    """Архив ответов отсутствует или повреждён"""
+
+
+class _ResourceParser(HTMLParser):
+    """Собирает ссылки на подресурсы страницы: стили, скрипты, картинки, иконки"""
+
+    def __init__(self):
+        super().__init__()
+        self.urls = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in ("script", "img", "source", "iframe") and attrs.get("src"):
+            self.urls.append(attrs["src"])
+        if tag in ("img", "source") and attrs.get("srcset"):
+            self.urls.extend(part.split()[0] for part in attrs["srcset"].split(",") if part.strip())
+        if tag == "link" and attrs.get("href"):
+            rel = (attrs.get("rel") or "").lower()
+            if any(kind in rel for kind in ("stylesheet", "icon", "preload", "manifest")):
+                self.urls.append(attrs["href"])
+
+
+def _key(url: str) -> str:
+    """Ключ ответа в архиве: путь и query без origin и фрагмента"""
+    parts = urlsplit(urldefrag(url)[0])
+    return (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+
+def _subresources(url: str, content_type: str, body: bytes) -> list:
+    """Абсолютные URL подресурсов из HTML или CSS"""
+    text = body.decode("utf-8", errors="replace")
+    if "html" in content_type:
+        parser = _ResourceParser()
+        parser.feed(text)
+        found = parser.urls
+    elif "css" in content_type:
+        found = CSS_URL.findall(text)
+    else:
+        return []
+    return [urljoin(url, ref.strip()) for ref in found if not ref.strip().startswith("data:")]
+
+
+def record_site(base_url: str, paths, archive_dir: Path, timeout: float = 30) -> int:
+    """Скачать страницы и их same-origin подресурсы в архив; вернуть число сохранённых ответов"""
+    origin = site_host(base_url)
+    bodies = archive_dir / BODIES_DIR
+    bodies.mkdir(parents=True, exist_ok=True)
+
+    index = {}
+    failed = {}
+    queue = [urljoin(base_url, path) for path in paths]
+    with requests.Session() as session:
+        while queue:
+            url = queue.pop(0)
+            key = _key(url)
+            if key in index or key in failed or site_host(url) != origin:
+                continue
+
+            try:
+                response = session.get(url, timeout=timeout)
+            except requests.RequestException as e:
+                # Один недоступный ресурс не должен срывать запись всего сайта
+                failed[key] = f"{type(e).__name__}: {e}"
+                continue
+            body_name = hashlib.sha256(response.content).hexdigest()
+            (bodies / body_name).write_bytes(response.content)
+            headers = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+            index[key] = {"status": response.status_code, "headers": headers, "body": body_name}
+
+            queue.extend(_subresources(response.url, headers.get("Content-Type", ""), response.content))
+
+    meta = {"base_url": base_url, "responses": index, "failed": failed}
+    (archive_dir / INDEX_NAME).write_text(json.dumps(meta, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    return len(index)
+
+
+class ReplayArchive:
+    """Записанные ответы сайта: ключ (путь + query) -> статус, заголовки, тело"""
+
+    def __init__(self, archive_dir: Path):
+        index_path = archive_dir / INDEX_NAME
+        if not index_path.is_file():
+            raise ReplayArchiveError(
+                f"Архив {archive_dir} не найден. Запишите его: pytest --site-mode=record"
+            )
+        meta = json.loads(index_path.read_text(encoding="utf-8"))
+        self.archive_dir = archive_dir
+        self.base_url = meta["base_url"]
+        self.responses = meta["responses"]
+        # Пути, которые не удалось скачать при записи: путь -> ошибка
+        self.failed = meta.get("failed", {})
+        # Абсолютные ссылки на записанный сайт переписываем в относительные, чтобы браузер остался на localhost;
+        # символ после хоста попадает в группу: ссылка на сам сайт без пути становится "/"
+        host = re.escape(site_host(self.base_url))
+        self._origin = re.compile(rf"(?:https?:)?//(?:www\.)?{host}(?=([/\"'\s)?#]|$))".encode())
+
+    def pages(self) -> list:
+        """Пути записанных HTML-страниц (без подресурсов)"""
+        return sorted(
+            key for key, entry in self.responses.items()
+            if entry["status"] == 200 and "html" in entry["headers"].get("Content-Type", "")
+        )
+
+    def get(self, key: str):
+        """Вернуть (статус, заголовки, тело) или None, если ответ не записан"""
+        entry = self.responses.get(key)
+        if entry is None:
+            return None
+        body = (self.archive_dir / BODIES_DIR / entry["body"]).read_bytes()
+        if entry["headers"].get("Content-Type", "").startswith(TEXT_TYPES):
+            body = self._origin.sub(lambda match: b"" if match.group(1) == b"/" else b"/", body)
+        return entry["status"], entry["headers"], body
+
+
+class ReplayServer:
+    """Локальный HTTP-сервер, отдающий ответы из архива"""
+
+    def __init__(self, archive: ReplayArchive):
+        self.archive = archive
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        archive = self.archive
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self._respond(send_body=True)
+
+            def do_HEAD(self):
+                self._respond(send_body=False)
+
+            def _respond(self, send_body: bool):
+                found = archive.get(self.path)
+                if found is None:
+                    self.send_error(404, "Not recorded")
+                    return
+                status, headers, body = found
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Не засоряем вывод pytest логом каждого запроса
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
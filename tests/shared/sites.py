@@ -0,0 +1,179 @@
+"""Реестр сайтов: адрес, страницы, локаторы и блоклист каждого сайта как данные; параллельный прогон сайтов"""
+import argparse
+import dataclasses
+import importlib
+import os
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from tests.shared.driver_resolver import (
+    ENV_DRIVER_PATH,
+    ENV_OFFLINE,
+    LOCKFILE_NAME,
+    ROOT_DIR,
+    DriverResolutionError,
+    resolve_chromedriver,
+)
+
+# Каталог пакетов сайтов: tests/sites/<slug>/site.py
+SITES_DIR = Path(__file__).parent.parent / "sites"
+SITES_PACKAGE = "tests.sites"
+
+
+@dataclass(frozen=True)
+class SiteLimits:
+    """Ресурсы прогона сайта в параллельном запуске: число xdist-воркеров и лимит времени"""
+    workers: int = 1
+    timeout: float = 30 * 60
+
+
+@dataclass(frozen=True)
+class Site:
+    """Описание сайта для реестра; slug и directory заполняет реестр по каталогу пакета"""
+    name: str
+    base_url: str
+    # С этих страниц начинается обход сайта
+    pages: tuple = ("/",)
+    locators: dict = field(default_factory=dict)
+    blocked_urls: tuple = ()
+    viewports: tuple = ()
+    # Бюджеты производительности по путям страниц: {path: {metric: limit}}
+    budgets: dict = field(default_factory=dict)
+    limits: SiteLimits = SiteLimits()
+    slug: str = ""
+    directory: Optional[Path] = None
+
+    @property
+    def replay_dir(self) -> Path:
+        """Архив записанных ответов для --site-mode=replay"""
+        return self.directory / "data" / "replay"
+
+    @property
+    def visual_dir(self) -> Path:
+        """Эталоны визуальных снимков: data/visual/<страница>/<экран>.png"""
+        return self.directory / "data" / "visual"
+
+    def locator(self, name: str) -> str:
+        return self.locators[name]
+
+
+class SiteRegistry:
+    """Сайты из tests/sites: читаются только модули site.py, страницы и тесты сайта не импортируются"""
+
+    def __init__(self, sites):
+        self.sites = {site.slug: site for site in sites}
+
+    @classmethod
+    def discover(cls, root: Path = SITES_DIR, package: str = SITES_PACKAGE) -> "SiteRegistry":
+        sites = []
+        for directory in sorted(path for path in root.iterdir() if (path / "site.py").is_file()):
+            module = importlib.import_module(f"{package}.{directory.name}.site")
+            sites.append(dataclasses.replace(module.SITE, slug=directory.name, directory=directory))
+        return cls(sites)
+
+    def __iter__(self):
+        return iter(self.sites.values())
+
+    def get(self, slug: str) -> Site:
+        if slug not in self.sites:
+            raise KeyError(f"Сайт {slug} не найден, известные сайты: {', '.join(self.sites) or 'нет'}")
+        return self.sites[slug]
+
+    def for_path(self, path: Path) -> Optional[Site]:
+        """Сайт, которому принадлежит файл или каталог тестов"""
+        return next((site for site in self if Path(path).is_relative_to(site.directory)), None)
+
+
+def site_command(site: Site, pytest_args=(), history_dir: Optional[Path] = None) -> list:
+    """Команда pytest для одного сайта: только его пакет и его лимит воркеров"""
+    command = [sys.executable, "-m", "pytest", str(site.directory), "--site", site.slug]
+    if site.limits.workers > 1:
+        command += ["-n", str(site.limits.workers)]
+    if history_dir is not None:
+        # Свой файл истории: процессы сайтов не ждут блокировок SQLite друг друга
+        command += ["--history", str(history_dir / f"run-history-{site.slug}.sqlite")]
+    return command + list(pytest_args)
+
+
+@dataclass
+class SiteRun:
+    """Итог прогона одного сайта"""
+    site: Site
+    returncode: Optional[int]
+    seconds: float
+    log: Path
+
+    @property
+    def status(self) -> str:
+        if self.returncode is None:
+            return f"прерван по лимиту {self.site.limits.timeout:g} с"
+        return "успешно" if self.returncode == 0 else f"код выхода {self.returncode}"
+
+
+def kill_group(process: subprocess.Popen):
+    """Убить процесс вместе со всеми его потомками из той же группы"""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    process.wait()
+
+
+def run_site(site: Site, pytest_args, log_dir: Path, env: dict) -> SiteRun:
+    log = log_dir / f"{site.slug}.log"
+    started = time.perf_counter()
+    with open(log, "w", encoding="utf-8") as output:
+        # Своя группа процессов: по лимиту времени останавливаем и xdist-воркеры, chromedriver и Chrome
+        process = subprocess.Popen(
+            site_command(site, pytest_args, log_dir), stdout=output, stderr=subprocess.STDOUT, env=env,
+            start_new_session=True,
+        )
+        try:
+            returncode = process.wait(timeout=site.limits.timeout)
+        except subprocess.TimeoutExpired:
+            kill_group(process)
+            returncode = None
+    return SiteRun(site, returncode, time.perf_counter() - started, log)
+
+
+def main(argv=None):
+    """Прогнать несколько сайтов параллельно: по процессу pytest на сайт, не больше --jobs одновременно"""
+    parser = argparse.ArgumentParser(prog="python -m tests.shared.sites", description=main.__doc__)
+    parser.add_argument("--site", action="append", help="Сайт из tests/sites (по умолчанию все)")
+    parser.add_argument("--jobs", type=int, default=2, help="Сколько сайтов прогонять одновременно")
+    parser.add_argument("--log-dir", type=Path, default=ROOT_DIR / ".cache" / "sites", help="Логи pytest по сайтам")
+    parser.add_argument("pytest_args", nargs=argparse.REMAINDER, help="Аргументы pytest после --")
+    args = parser.parse_args(argv)
+
+    registry = SiteRegistry.discover()
+    try:
+        sites = [registry.get(slug) for slug in args.site] if args.site else list(registry)
+    except KeyError as e:
+        parser.error(e.args[0])
+    pytest_args = args.pytest_args[1:] if args.pytest_args[:1] == ["--"] else args.pytest_args
+    args.log_dir.mkdir(parents=True, exist_ok=True)
+
+    env = dict(os.environ)
+    # ChromeDriver ищем один раз: процессы сайтов не скачивают его одновременно
+    if ENV_DRIVER_PATH not in env:
+        try:
+            offline = env.get(ENV_OFFLINE, "") not in ("", "0")
+            env[ENV_DRIVER_PATH] = resolve_chromedriver(ROOT_DIR / LOCKFILE_NAME, offline=offline).path
+        except (DriverResolutionError, OSError, ValueError) as e:
+            print(f"ChromeDriver не найден заранее, его будет искать каждый сайт: {e}", file=sys.stderr)
+
+    with ThreadPoolExecutor(max_workers=max(args.jobs, 1)) as pool:
+        runs = list(pool.map(lambda site: run_site(site, pytest_args, args.log_dir, env), sites))
+    for run in runs:
+        print(f"{run.site.name:<30} {run.status:<24} {run.seconds:7.1f} с  {run.log}")
+    return 0 if all(run.returncode == 0 for run in runs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
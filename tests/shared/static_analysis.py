@@ -0,0 +1,91 @@
+"""Статический анализ страницы: факты из HTML и заголовков ответа без запуска браузера"""
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Optional
+
+CHARSET = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.IGNORECASE)
+# Те же определения, что и в снимке страницы из браузера (SNAPSHOT_SCRIPT)
+BUTTON_INPUT_TYPES = ("submit", "button")
+FIELD_TAGS = ("input", "select", "textarea")
+INTERACTIVE_TAGS = ("a", "button", "input", "select", "textarea")
+
+
+@dataclass
+class HtmlFacts:
+    """Факты о странице, которые можно получить из HTML без браузера"""
+    title: Optional[str] = None
+    hrefs: list = field(default_factory=list)
+    meta_charset: Optional[str] = None
+    meta_content_type: Optional[str] = None
+    favicon_links: list = field(default_factory=list)
+    links: int = 0
+    buttons: int = 0
+    inputs: int = 0
+    interactive: int = 0
+
+
+class _FactsParser(HTMLParser):
+    """Один проход по HTML: title, ссылки, meta-теги кодировки, иконки и число элементов"""
+
+    def __init__(self):
+        super().__init__()
+        self.facts = HtmlFacts()
+        self._title = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        facts = self.facts
+        if tag in INTERACTIVE_TAGS:
+            facts.interactive += 1
+        if tag in FIELD_TAGS:
+            facts.inputs += 1
+        if tag == "button" or tag == "input" and (attrs.get("type") or "").lower() in BUTTON_INPUT_TYPES:
+            facts.buttons += 1
+
+        if tag == "a" and attrs.get("href") is not None:
+            facts.links += 1
+            facts.hrefs.append(attrs["href"])
+        elif tag == "link" and attrs.get("href"):
+            if "icon" in (attrs.get("rel") or "").lower().split():
+                facts.favicon_links.append(attrs["href"])
+        elif tag == "meta":
+            if attrs.get("charset") and facts.meta_charset is None:
+                facts.meta_charset = attrs["charset"]
+            if (attrs.get("http-equiv") or "").lower() == "content-type" and facts.meta_content_type is None:
+                facts.meta_content_type = attrs.get("content")
+        elif tag == "title" and facts.title is None:
+            self._title = []
+
+    def handle_data(self, data):
+        if self._title is not None:
+            self._title.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "title" and self._title is not None:
+            self.facts.title = "".join(self._title).strip()
+            self._title = None
+
+
+def parse_html(html: str) -> HtmlFacts:
+    """Разобрать HTML в факты для статических проверок"""
+    parser = _FactsParser()
+    parser.feed(html)
+    parser.close()
+    return parser.facts
+
+
+def charset_of(content_type: Optional[str]) -> Optional[str]:
+    """Кодировка из значения Content-Type (заголовка или meta http-equiv)"""
+    match = CHARSET.search(content_type or "")
+    return match.group(1) if match else None
+
+
+def declared_charsets(content_type: str, facts: HtmlFacts) -> dict:
+    """Все объявления кодировки страницы: источник -> кодировка"""
+    declared = {
+        "Content-Type": charset_of(content_type),
+        "meta charset": facts.meta_charset,
+        "meta http-equiv": charset_of(facts.meta_content_type),
+    }
+    return {source: charset for source, charset in declared.items() if charset}
@@ -0,0 +1,177 @@
+"""Профиль шагов Allure: время, команды WebDriver и ожидания selene по каждому шагу"""
+import csv
+import json
+import sys
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import allure_commons
+
+# Разделитель шагов в пути: в свёрнутых стеках flame graph это ';'
+PATH_SEPARATOR = " > "
+
+
+@dataclass
+class StepRecord:
+    """Один выполненный шаг; время и команды включают вложенные шаги"""
+    test: str
+    path: tuple
+    seconds: float
+    self_seconds: float
+    commands: int
+    wait_seconds: float
+    failed: bool = False
+
+    @property
+    def title(self) -> str:
+        return self.path[-1]
+
+
+class _Frame:
+    def __init__(self, title: str, commands: int, wait_seconds: float):
+        self.title = title
+        self.started = time.perf_counter()
+        self.commands = commands
+        self.wait_seconds = wait_seconds
+        self.children_seconds = 0.0
+
+
+class StepProfiler:
+    """Плагин allure_commons: замеряет каждый allure.step, пока зарегистрирован"""
+
+    def __init__(self):
+        self.records = []
+        self.test = ""
+        # Счётчики растут монотонно, шаг берёт разницу между входом и выходом
+        self.commands = 0
+        self.wait_seconds = 0.0
+        self._stack = []
+
+    @allure_commons.hookimpl
+    def start_step(self, uuid, title, params):
+        self._stack.append(_Frame(title, self.commands, self.wait_seconds))
+
+    @allure_commons.hookimpl
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        if not self._stack:
+            return
+        frame = self._stack.pop()
+        seconds = time.perf_counter() - frame.started
+        if self._stack:
+            self._stack[-1].children_seconds += seconds
+        self.records.append(StepRecord(
+            test=self.test,
+            path=tuple(f.title for f in self._stack) + (frame.title,),
+            seconds=seconds,
+            self_seconds=max(seconds - frame.children_seconds, 0.0),
+            commands=self.commands - frame.commands,
+            wait_seconds=self.wait_seconds - frame.wait_seconds,
+            failed=exc_type is not None,
+        ))
+
+    def start_test(self, nodeid: str):
+        self.test = nodeid
+        self._stack.clear()
+
+    def on_command(self, command: str, seconds: float):
+        """Подписчик журнала команд WebDriver (см. commands.CommandLog)"""
+        self.commands += 1
+
+    def wait_decorator(self, wait):
+        """Декоратор ожиданий selene: время до последней попытки — это время ожидания условия"""
+        def decorator(logic):
+            def timed(fn):
+                started = time.perf_counter()
+                last_attempt = [started]
+
+                def attempt(entity):
+                    last_attempt[0] = time.perf_counter()
+                    return fn(entity)
+
+                # selene называет условие в сообщении о таймауте по __qualname__ или str(fn)
+                attempt.__qualname__ = getattr(fn, "__qualname__", str(fn))
+                try:
+                    return logic(attempt)
+                finally:
+                    self.wait_seconds += last_attempt[0] - started
+            return timed
+        return decorator
+
+    def merge(self, data: list):
+        """Добавить шаги, замеренные другим процессом (xdist-воркером)"""
+        self.records += [StepRecord(**dict(entry, path=tuple(entry["path"]))) for entry in data]
+
+    @property
+    def data(self) -> list:
+        return [asdict(record) for record in self.records]
+
+    def write(self, directory: Path, run_id: str) -> Path:
+        """Сохранить профиль прогона: steps-<run_id>.json и такой же CSV"""
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"steps-{run_id}.json"
+        path.write_text(json.dumps(self.data, ensure_ascii=False, indent=1), encoding="utf-8")
+        with open(path.with_suffix(".csv"), "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["test", "step", "depth", "seconds", "self_seconds", "commands", "wait_seconds", "failed"])
+            for record in self.records:
+                writer.writerow([
+                    record.test,
+                    PATH_SEPARATOR.join(record.path),
+                    len(record.path),
+                    f"{record.seconds:.4f}",
+                    f"{record.self_seconds:.4f}",
+                    record.commands,
+                    f"{record.wait_seconds:.4f}",
+                    int(record.failed),
+                ])
+        return path
+
+    def lines(self, top: int = 10) -> list:
+        """Самые затратные шаги прогона по суммарному времени"""
+        totals = defaultdict(lambda: [0, 0.0, 0.0, 0, 0.0])
+        for record in self.records:
+            entry = totals[record.title]
+            entry[0] += 1
+            entry[1] += record.seconds
+            entry[2] = max(entry[2], record.seconds)
+            entry[3] += record.commands
+            entry[4] += record.wait_seconds
+        slowest = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        return [
+            f"{total:7.2f} с  x{count:<4} макс {longest:5.2f} с  команд {commands:<5} "
+            f"ожидание {waited:5.2f} с  {title}"
+            for title, (count, total, longest, commands, waited) in slowest
+        ]
+
+
+def folded_stacks(records) -> dict:
+    """Свёрнутые стеки для flame graph: 'тест;шаг;вложенный шаг' -> собственное время, мс"""
+    stacks = defaultdict(float)
+    for record in records:
+        frames = [record.test, *record.path]
+        stacks[";".join(frame.replace(";", ",") for frame in frames)] += record.self_seconds * 1000
+    return stacks
+
+
+def load_profiles(paths) -> list:
+    """Шаги из сохранённых профилей (файлов или каталогов с steps-*.json)"""
+    records = []
+    for path in map(Path, paths):
+        files = sorted(path.glob("steps-*.json")) if path.is_dir() else [path]
+        for file in files:
+            profiler = StepProfiler()
+            profiler.merge(json.loads(file.read_text(encoding="utf-8")))
+            records += profiler.records
+    return records
+
+
+def main(argv=None):
+    """Свернуть профили нескольких прогонов в один flame graph (формат flamegraph.pl и speedscope)"""
+    for stack, milliseconds in sorted(folded_stacks(load_profiles(argv or sys.argv[1:] or ["."])).items()):
+        print(f"{stack} {round(milliseconds)}")
+
+
+if __name__ == "__main__":
+    main()
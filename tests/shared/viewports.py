@@ -0,0 +1,50 @@
+"""Эмуляция экранов устройств через CDP в уже запущенном браузере"""
+from dataclasses import dataclass
+
+import allure
+import pytest
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+@dataclass(frozen=True)
+class Viewport:
+    """Экран устройства: размер области просмотра, плотность пикселей и мобильный режим"""
+    name: str
+    width: int
+    height: int
+    device_scale_factor: float = 1
+    mobile: bool = False
+
+    def __str__(self):
+        return f"{self.name} {self.width}x{self.height}@{self.device_scale_factor:g}x"
+
+
+def emulate_viewport(driver: WebDriver, viewport: Viewport):
+    """Включить эмуляцию экрана без перезапуска Chrome и без изменения размера окна"""
+    driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+        "width": viewport.width,
+        "height": viewport.height,
+        "deviceScaleFactor": viewport.device_scale_factor,
+        "mobile": viewport.mobile,
+    })
+    # Мобильная вёрстка часто зависит от (pointer: coarse) и touch-событий
+    driver.execute_cdp_cmd("Emulation.setTouchEmulationEnabled", {"enabled": viewport.mobile})
+
+
+def clear_viewport(driver: WebDriver):
+    """Вернуть размеры окна браузера вместо эмулированного экрана"""
+    try:
+        driver.execute_cdp_cmd("Emulation.clearDeviceMetricsOverride", {})
+        driver.execute_cdp_cmd("Emulation.setTouchEmulationEnabled", {"enabled": False})
+    except (AttributeError, WebDriverException):
+        # Браузер без CDP эмуляцию и не включал
+        pass
+
+
+def viewport_params(viewports) -> list:
+    """Параметры для фикстуры viewport: id теста и группа в Allure по имени экрана"""
+    return [
+        pytest.param(viewport, id=viewport.name, marks=allure.feature(f"Экран: {viewport}"))
+        for viewport in viewports
+    ]
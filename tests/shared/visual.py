@@ -0,0 +1,174 @@
+"""Визуальные снимки: эталоны по сайту/странице/экрану и перцептивное сравнение на NumPy"""
+import io
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import allure
+from selenium.webdriver.remote.webdriver import WebDriver
+
+# Без анимаций, переходов и мигающего курсора одинаковая страница даёт одинаковые пиксели
+FREEZE_SCRIPT = """
+if (!document.getElementById('__visual_freeze')) {
+    const style = document.createElement('style');
+    style.id = '__visual_freeze';
+    style.textContent = '*, *::before, *::after { animation: none !important; '
+        + 'transition: none !important; caret-color: transparent !important; }';
+    document.head.appendChild(style);
+}
+window.scrollTo(0, 0);
+const ratio = window.devicePixelRatio || 1;
+// Для снимка компонента координаты масок отсчитываются от его левого верхнего угла
+const root = arguments[1] ? document.querySelector(arguments[1]) : null;
+const origin = root ? root.getBoundingClientRect() : {left: 0, top: 0};
+const rects = [];
+for (const selector of arguments[0]) {
+    for (const element of document.querySelectorAll(selector)) {
+        const r = element.getBoundingClientRect();
+        if (r.width > 0 && r.height > 0) {
+            rects.push([(r.left - origin.left) * ratio, (r.top - origin.top) * ratio, r.width * ratio, r.height * ratio]);
+        }
+    }
+}
+return rects;
+"""
+
+# Максимальная разница в пространстве YIQ (как в pixelmatch): порог задаётся долей от неё
+MAX_YIQ_DELTA = 35215.0
+
+
+@dataclass
+class VisualResult:
+    """Итог сравнения снимка с эталоном"""
+    matched: bool
+    diff_ratio: float = 0.0
+    diff_png: Optional[bytes] = None
+    reason: str = ""
+
+
+def freeze_page(driver: WebDriver, mask_selectors=(), root: Optional[str] = None) -> list:
+    """Остановить анимации и вернуть прямоугольники масок в пикселях снимка (страницы или элемента root)"""
+    return driver.execute_script(FREEZE_SCRIPT, list(mask_selectors), root)
+
+
+def _decode(png: bytes):
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(io.BytesIO(png)) as image:
+        return np.asarray(image.convert("RGB"), dtype=np.float32)
+
+
+def _encode(pixels) -> bytes:
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _yiq_delta(first, second):
+    # Перцептивная разница: яркость важнее цветовых компонент
+    diff = first - second
+    r, g, b = diff[..., 0], diff[..., 1], diff[..., 2]
+    y = r * 0.29889531 + g * 0.58662247 + b * 0.11448223
+    i = r * 0.59597799 - g * 0.27417610 - b * 0.32180189
+    q = r * 0.21147017 - g * 0.52261711 + b * 0.31114694
+    return 0.5053 * y * y + 0.299 * i * i + 0.1957 * q * q
+
+
+def compare_images(baseline_png: bytes, actual_png: bytes, masks=(), threshold: float = 0.1,
+                   max_diff_ratio: float = 0.001) -> VisualResult:
+    """Сравнить PNG: пиксель отличается, если разница больше threshold; маски не сравниваются"""
+    # Совпадение байтов — самый частый случай, его проверяем без декодирования
+    if baseline_png == actual_png:
+        return VisualResult(matched=True)
+
+    import numpy as np
+
+    baseline, actual = _decode(baseline_png), _decode(actual_png)
+    if baseline.shape != actual.shape:
+        return VisualResult(
+            matched=False,
+            diff_ratio=1.0,
+            diff_png=actual_png,
+            reason=f"размер {actual.shape[1]}x{actual.shape[0]} вместо {baseline.shape[1]}x{baseline.shape[0]}",
+        )
+
+    height, width = baseline.shape[:2]
+    compared = np.ones((height, width), dtype=bool)
+    for left, top, mask_width, mask_height in masks:
+        x0, y0 = max(int(left), 0), max(int(top), 0)
+        x1, y1 = min(int(left + mask_width + 0.5), width), min(int(top + mask_height + 0.5), height)
+        compared[y0:y1, x0:x1] = False
+
+    different = (_yiq_delta(baseline, actual) > threshold * threshold * MAX_YIQ_DELTA) & compared
+    diff_ratio = float(different.sum()) / max(int(compared.sum()), 1)
+
+    # Картинка разницы: бледный эталон, отличия красным, маски синим
+    gray = baseline.mean(axis=2, keepdims=True)
+    diff_image = np.repeat(255 - (255 - gray) * 0.3, 3, axis=2)
+    diff_image[~compared] = diff_image[~compared] * 0.6 + np.array([0, 0, 255]) * 0.4
+    diff_image[different] = (255, 0, 0)
+
+    return VisualResult(
+        matched=diff_ratio <= max_diff_ratio,
+        diff_ratio=diff_ratio,
+        diff_png=_encode(diff_image.astype(np.uint8)),
+        reason=f"отличается {diff_ratio:.3%} пикселей (допустимо {max_diff_ratio:.3%})",
+    )
+
+
+class VisualStore:
+    """Эталоны в каталоге сайта: <root>/<страница>/<экран>.png"""
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def path(self, page: str, viewport: str) -> Path:
+        return self.root / page / f"{viewport}.png"
+
+    def load(self, page: str, viewport: str) -> Optional[bytes]:
+        path = self.path(page, viewport)
+        return path.read_bytes() if path.is_file() else None
+
+    def save(self, page: str, viewport: str, png: bytes):
+        path = self.path(page, viewport)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(png)
+
+
+class VisualChecker:
+    """Сравнение снимков с эталонами; update=True перезаписывает эталоны текущими снимками без проверки"""
+
+    def __init__(self, store: VisualStore, update: bool = False, threshold: float = 0.1,
+                 max_diff_ratio: float = 0.001):
+        self.store = store
+        self.update = update
+        self.threshold = threshold
+        self.max_diff_ratio = max_diff_ratio
+
+    def check(self, page: str, viewport: str, actual_png: bytes, masks=()):
+        """Сравнить снимок с эталоном и упасть с вложениями эталон/снимок/разница при расхождении"""
+        baseline_png = self.store.load(page, viewport)
+        if baseline_png is None or self.update:
+            self.store.save(page, viewport, actual_png)
+            allure.attach(actual_png, name=f"Новый эталон {page}/{viewport}", attachment_type=allure.attachment_type.PNG)
+            # Без эталона сравнивать не с чем: первый прогон (например, в CI) не должен тихо проходить
+            if baseline_png is None and not self.update:
+                raise AssertionError(
+                    f"Эталон {page}/{viewport} создан, снимок не проверен: просмотрите и закоммитьте "
+                    f"{self.store.path(page, viewport)}. Создать все эталоны сразу: pytest --visual --update-baselines"
+                )
+            return
+
+        result = compare_images(baseline_png, actual_png, masks, self.threshold, self.max_diff_ratio)
+        if result.matched:
+            return
+        allure.attach(baseline_png, name="Эталон", attachment_type=allure.attachment_type.PNG)
+        allure.attach(actual_png, name="Снимок", attachment_type=allure.attachment_type.PNG)
+        allure.attach(result.diff_png, name="Разница", attachment_type=allure.attachment_type.PNG)
+        raise AssertionError(
+            f"Снимок {page}/{viewport} не совпадает с эталоном: {result.reason}. "
+            f"Если изменение ожидаемое, обновите эталоны: pytest --visual --update-baselines"
+        )
@@ -1,12 +1,48 @@
 """Компонент формы (переиспользуемый)"""
+import csv
+import io
+
 import allure
-from selenium.webdriver.common.by import By
-from selene import browser, be, have
+from selene import browser, be
+from tests.shared.forms import FIELDS_SELECTOR, FormModel
 
 
 class FormComponent:
     """Компонент формы для проверки полей и валидаций"""
     
+    # Типы полей, которым нужна подсказка о формате заполнения ('' — input без type)
+    TEXT_TYPES = ("", "text", "email", "tel")
+    
+    def __init__(self, root: str = "", fields: str = FIELDS_SELECTOR):
+        """root — CSS-селектор формы; по умолчанию все поля страницы"""
+        self.root = root
+        self.fields_selector = fields
+        self._model = None
+    
+    @property
+    def model(self) -> FormModel:
+        """Поля формы читаются одним запросом при первой проверке и кэшируются до изменения формы"""
+        if self._model is None or self._model.driver is not browser.driver:
+            self._model = FormModel(browser.driver, self.root, self.fields_selector)
+        return self._model
+    
+    def invalidate(self):
+        """Сбросить модель формы: после ввода, очистки и отправки"""
+        self.model.invalidate()
+        return self
+    
+    def _field(self, field_selector: str):
+        field = self.model.field(field_selector)
+        assert field is not None, f"Поле {field_selector} не найдено в форме {self.root or 'страницы'}"
+        return field
+    
+    def visible_text_fields(self) -> list:
+        """Видимые текстовые поля формы из модели, без обращений к браузеру"""
+        return [
+            field for field in self.model.fields()
+            if field.visible and (field.tag == "textarea" or (field.tag == "input" and field.type in self.TEXT_TYPES))
+        ]
+    
     @allure.step("Проверить, что поле '{field_selector}' видимо")
     def should_have_field(self, field_selector: str):
         """Проверить наличие поля"""
@@ -15,42 +51,17 @@ class FormComponent:
     
     @allure.step("Проверить, что обязательное поле помечено '*'")
     def should_have_required_marker(self, field_selector: str):
-        """Проверить, что у обязательного поля есть маркер '*'"""
-        # Проверяем атрибут required или наличие * в label
-        field = browser.element(field_selector)
-        
-        # Проверяем либо атрибут required
-        has_required_attr = field.locate().get_attribute("required") is not None
-        
-        # Либо ищем * в связанном label
-        has_asterisk = False
-        try:
-            field_id = field.locate().get_attribute("id")
-            if field_id:
-                label = browser.element(f'label[for="{field_id}"]')
-                if "*" in label.locate().text:
-                    has_asterisk = True
-        except:
-            pass
-        
-        # Или просто проверяем родительский элемент на наличие *
-        try:
-            parent_text = field.locate().find_element(By.XPATH, "..").text
-            if "*" in parent_text:
-                has_asterisk = True
-        except:
-            pass
-        
-        assert has_required_attr or has_asterisk, f"Обязательное поле {field_selector} не помечено '*'"
+        """Проверить, что у обязательного поля есть атрибут required или '*' в подписи"""
+        field = self._field(field_selector)
+        assert field.marked_required, f"Обязательное поле {field_selector} не помечено '*'"
         return self
     
     @allure.step("Проверить наличие placeholder у поля '{field_selector}'")
     def should_have_placeholder(self, field_selector: str):
         """Проверить, что у поля есть placeholder"""
-        field = browser.element(field_selector)
-        placeholder = field.locate().get_attribute("placeholder")
+        placeholder = self._field(field_selector).placeholder
         
-        assert placeholder and len(placeholder) > 0, f"У поля {field_selector} отсутствует placeholder"
+        assert placeholder, f"У поля {field_selector} отсутствует placeholder"
         allure.attach(
             placeholder,
             name=f"Placeholder поля {field_selector}",
@@ -58,16 +69,27 @@ class FormComponent:
         )
         return self
     
+    @allure.step("Проверить, что у всех полей формы есть подсказки")
+    def should_have_hints(self):
+        """Проверить, что у каждого видимого текстового поля есть label, placeholder или aria-label"""
+        self.attach_fields()
+        missing = [field.title for field in self.visible_text_fields() if not field.hint]
+        assert not missing, f"Поля без подсказок: {', '.join(missing)}"
+        return self
+    
     @allure.step("Ввести текст '{text}' в поле '{field_selector}'")
     def fill_field(self, field_selector: str, text: str):
         """Заполнить поле текстом"""
+        # Действия идут через selene: поле ищется заново и с ожиданием, форма могла измениться
         browser.element(field_selector).should(be.visible).type(text)
+        self.invalidate()
         return self
     
     @allure.step("Очистить поле '{field_selector}'")
     def clear_field(self, field_selector: str):
         """Очистить поле"""
         browser.element(field_selector).clear()
+        self.invalidate()
         return self
     
     @allure.step("Проверить сообщение об ошибке валидации")
@@ -86,19 +108,26 @@ class FormComponent:
     def submit(self, submit_button_selector: str = "button[type='submit'], input[type='submit']"):
         """Отправить форму"""
         browser.element(submit_button_selector).should(be.clickable).click()
+        self.invalidate()
         return self
     
     @allure.step("Проверить, что поле доступно с клавиатуры (focusable)")
     def should_be_keyboard_accessible(self, field_selector: str):
-        """Проверить, что поле можно сфокусировать с клавиатуры"""
-        field = browser.element(field_selector).locate()
-        
-        # Проверяем, что элемент может получить фокус
-        # (не имеет tabindex="-1" и не disabled)
-        tabindex = field.get_attribute("tabindex")
-        is_disabled = field.get_attribute("disabled")
-        
-        assert tabindex != "-1", f"Поле {field_selector} имеет tabindex=-1 (недоступно с клавиатуры)"
-        assert not is_disabled, f"Поле {field_selector} disabled"
+        """Проверить, что поле можно сфокусировать с клавиатуры (нет tabindex=-1 и disabled)"""
+        field = self._field(field_selector)
         
+        assert field.tabindex != "-1", f"Поле {field_selector} имеет tabindex=-1 (недоступно с клавиатуры)"
+        assert not field.disabled, f"Поле {field_selector} disabled"
+        return self
+    
+    def attach_fields(self):
+        """Прикрепить к шагу таблицу полей формы с подсказками и состоянием"""
+        table = io.StringIO()
+        writer = csv.writer(table)
+        writer.writerow(["field", "type", "label", "placeholder", "required", "asterisk", "tabindex",
+                         "disabled", "visible"])
+        for field in self.model.fields():
+            writer.writerow([field.title, field.type or field.tag, field.label, field.placeholder, field.required,
+                             field.asterisk, field.tabindex, field.disabled, field.visible])
+        allure.attach(table.getvalue(), name="Поля формы", attachment_type=allure.attachment_type.CSV)
         return self
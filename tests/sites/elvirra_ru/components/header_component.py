@@ -1,40 +1,50 @@
 """Компонент шапки сайта"""
 import allure
 from selene import browser, be, have
+from selenium.webdriver.common.by import By
+from tests.shared.dom import query_selectors
+from tests.shared.viewports import Viewport
+from tests.shared.visual import VisualChecker, freeze_page
+from tests.sites.elvirra_ru.site import SITE
 
 
 class HeaderComponent:
     """Компонент шапки сайта (переиспользуемый)"""
     
-    # Локаторы
-    HEADER = "header, .header, #header, .site-header, .top"
-    LOGO = "a[href='/'], a[href='https://elvirra.ru/'], .logo, .brand, img[alt*='лог']"
-    NAV_LINKS = "nav a, .menu a, .navbar a, a[href]"
+    # Локаторы из описания сайта (data/locators.py)
+    HEADER = SITE.locator("header")
+    LOGO = SITE.locator("header_logo")
+    NAV_LINKS = SITE.locator("nav_links")
+    # Динамические области шапки, которые визуальное сравнение пропускает
+    VISUAL_MASKS = ()
     
     @allure.step("Проверить видимость шапки")
     def should_be_visible(self):
         """Проверить, что шапка видима"""
-        assert len(browser.all(self.HEADER)) > 0 or len(browser.all("a[href]")) > 0
+        found = query_selectors({"header": self.HEADER, "links": "a[href]"})
+        assert found["header"]["count"] > 0 or found["links"]["count"] > 0, "Шапка сайта не найдена"
         return self
     
     @allure.step("Проверить, что логотип в шапке кликабелен")
     def should_have_clickable_logo(self):
         """Проверить кликабельность логотипа"""
-        assert len(browser.all(self.LOGO)) > 0
+        found = query_selectors({"logo": self.LOGO})
+        assert found["logo"]["count"] > 0, "Логотип в шапке не найден"
         return self
     
     @allure.step("Кликнуть по логотипу в шапке")
     def click_logo(self):
-        """Кликнуть по логотипу"""
-        if len(browser.all(self.LOGO)) > 0:
-            browser.all(self.LOGO).first.click()
+        """Кликнуть по первому логотипу, если он есть: поиск и клик без повторного запроса"""
+        logos = browser.driver.find_elements(By.CSS_SELECTOR, self.LOGO)
+        if logos:
+            logos[0].click()
         return self
     
     @allure.step("Проверить наличие навигационных ссылок в шапке")
     def should_have_navigation_links(self):
         """Проверить наличие ссылок навигации"""
-        links = browser.all(self.NAV_LINKS)
-        assert len(links) > 0, "На странице не найдено навигационных ссылок"
+        found = query_selectors({"links": self.NAV_LINKS})
+        assert found["links"]["count"] > 0, "На странице не найдено навигационных ссылок"
         return self
     
     @allure.step("Кликнуть по ссылке в навигации: {link_text}")
@@ -42,3 +52,11 @@ class HeaderComponent:
         """Кликнуть по ссылке с указанным текстом"""
         browser.element(self.NAV_LINKS).by(have.text(link_text)).click()
         return self
+    
+    @allure.step("Сравнить снимок шапки с эталоном")
+    def should_match_snapshot(self, visual: VisualChecker, viewport: Viewport = None):
+        """Сравнить снимок первой найденной шапки с эталоном для этого экрана"""
+        header = browser.element(self.HEADER).should(be.visible)
+        masks = freeze_page(browser.driver, self.VISUAL_MASKS, root=self.HEADER)
+        visual.check("header", viewport.name if viewport else "default", header.locate().screenshot_as_png, masks)
+        return self
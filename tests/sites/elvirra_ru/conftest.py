@@ -1,9 +1,9 @@
-"""Конфигурация для тестов elvirra.ru"""
+"""Конфигурация для тестов elvirra.ru: адрес, страницы и блоклист сайта — в site.py, общие фикстуры — в tests/shared"""
 import pytest
-from tests.sites.elvirra_ru.data.urls import BASE_URL
+from tests.sites.elvirra_ru.pages.home_page import HomePage
 
 
-@pytest.fixture(scope="session")
-def base_url():
-    """Базовый URL для сайта elvirra.ru"""
-    return BASE_URL
+@pytest.fixture
+def home_visit(base_url, shared_visit):
+    """Главная страница, открытая один раз на сценарий (маркер scenario)"""
+    return shared_visit(lambda: HomePage(base_url).open_home())
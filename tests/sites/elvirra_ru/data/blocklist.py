@@ -0,0 +1,13 @@
+"""Сторонние запросы, которые браузер не отправляет при тестах elvirra.ru"""
+
+# Аналитика, реклама и капча не влияют на проверки, но замедляют каждую загрузку страницы
+BLOCKED_URLS = (
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*mc.yandex.ru*",
+    "*recaptcha*",
+    "*connect.facebook.net*",
+    "*vk.com/rtrg*",
+    "*top-fwz1.mail.ru*",
+)
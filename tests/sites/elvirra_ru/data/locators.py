@@ -0,0 +1,13 @@
+"""Локаторы elvirra.ru: общие для страниц и компонентов сайта"""
+
+LOCATORS = {
+    "header": "header, .header, #header, .site-header, .top",
+    "footer": "footer, .footer, #footer, .site-footer, .bottom",
+    "main_content": "main, #content, .content, .main, body",
+    "logo": "a[href='/'], a[href='https://elvirra.ru/'], img[alt*='logo'], .logo, .brand",
+    "nav_menu": "nav, .nav, .menu, .navbar, .main-menu",
+    # На части шаблонов нет semantic-header, считаем хедером меню/верхнюю панель
+    "header_fallback": "a[href], .menu, .top, .header",
+    "header_logo": "a[href='/'], a[href='https://elvirra.ru/'], .logo, .brand, img[alt*='лог']",
+    "nav_links": "nav a, .menu a, .navbar a, a[href]",
+}
@@ -6,3 +6,12 @@ BASE_URL = "https://elvirra.ru"
 HOME = "/"
 CONTACTS = "/contacts"
 ABOUT = "/about"
+
+# Бюджеты производительности: тест падает, если метрика загрузки страницы больше лимита.
+# Времена в миллисекундах от начала навигации, cls — безразмерный Cumulative Layout Shift.
+DEFAULT_BUDGET = {"ttfb_ms": 1500, "load_ms": 10000, "lcp_ms": 4000, "cls": 0.25}
+PAGE_BUDGETS = {
+    HOME: DEFAULT_BUDGET,
+    CONTACTS: DEFAULT_BUDGET,
+    ABOUT: DEFAULT_BUDGET,
+}
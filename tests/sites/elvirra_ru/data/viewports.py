@@ -0,0 +1,9 @@
+"""Экраны, на которых проверяется вёрстка elvirra.ru"""
+from tests.shared.viewports import Viewport
+
+# Новый экран — одна строка: тесты с фикстурой viewport прогонятся и на нём
+VIEWPORTS = (
+    Viewport("desktop", 1920, 1080),
+    Viewport("tablet", 768, 1024, device_scale_factor=2, mobile=True),
+    Viewport("mobile", 375, 667, device_scale_factor=2, mobile=True),
+)
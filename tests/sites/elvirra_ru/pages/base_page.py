@@ -1,19 +1,133 @@
 """Базовый класс для всех Page Object"""
+import json
+
 import allure
 from selene import browser, be, have
+from tests.shared.dom import QUERY_FUNCTION
+from tests.shared.geometry import (
+    collect_layout,
+    find_overlaps,
+    find_spacing_violations,
+    layout_svg,
+    violations_csv,
+)
+from tests.shared.perf import budget_violations, collect_timing, summarize
+from tests.shared.readiness import document_ready, no_pending_requests, wait_until_ready
+from tests.shared.viewports import Viewport, emulate_viewport
+from tests.shared.visual import VisualChecker, freeze_page
+
+
+# Собирает все факты о DOM, нужные проверкам, за один execute_script
+SNAPSHOT_SCRIPT = QUERY_FUNCTION + """
+const count = (selector) => document.querySelectorAll(selector).length;
+const counts = {};
+for (const [name, entry] of Object.entries(querySelectors(arguments[0], false))) {
+    counts[name] = entry.count;
+}
+const charsetMeta = document.querySelector('meta[charset]');
+const contentTypeMeta = document.querySelector('meta[http-equiv="Content-Type" i]');
+const html = document.documentElement ? document.documentElement.outerHTML.toLowerCase() : '';
+return {
+    counts: counts,
+    title: document.title,
+    body_text: document.body ? document.body.innerText : '',
+    meta_charset: charsetMeta ? charsetMeta.getAttribute('charset') : null,
+    meta_content_type: contentTypeMeta ? contentTypeMeta.getAttribute('content') : null,
+    links: count('a[href]'),
+    buttons: count("button, input[type='submit'], input[type='button']"),
+    inputs: count('input, select, textarea'),
+    interactive: count('a, button, input, select, textarea'),
+    favicon_links: Array.from(document.querySelectorAll('link[rel~="icon" i]')).map((link) => link.href),
+    mentions_favicon: html.includes('favicon'),
+};
+"""
 
 
 class BasePage:
     """Базовый класс страницы с общими методами"""
     
+    # Именованные селекторы, число совпадений по которым попадает в снимок страницы
+    SNAPSHOT_SELECTORS = {}
+    # Бюджеты производительности по путям страниц: {path: {metric: limit}}
+    BUDGETS = {}
+    # Когда страницу можно проверять; важно при page load strategy eager/none
+    READY_WHEN = (document_ready("interactive"), no_pending_requests())
+    # Поддеревья, которые геометрические проверки пропускают (например, задуманно наложенные баннеры)
+    LAYOUT_IGNORE = ""
+    # Наслоение меньше этого числа пикселей по любой оси считаем погрешностью округления
+    OVERLAP_TOLERANCE = 2
+    # Минимальное расстояние между полями и кнопками, px
+    MIN_CONTROL_GAP = 4
+    # Динамические области (слайдеры, счётчики, виджеты), которые визуальное сравнение пропускает
+    VISUAL_MASKS = ()
+    
     def __init__(self, base_url: str):
         self.base_url = base_url
+        self._snapshot = None
+        self._layout = None
+        # Страница менялась после открытия (клик, ввод, размер окна, переход) — её нельзя делить между тестами
+        self.changed = False
+        self._opened = False
+    
+    def snapshot(self) -> dict:
+        """Снимок DOM после загрузки: собирается одним запросом и кэшируется до изменения страницы"""
+        if self._snapshot is None:
+            self._snapshot = browser.driver.execute_script(SNAPSHOT_SCRIPT, self.SNAPSHOT_SELECTORS)
+        return self._snapshot
+    
+    def layout(self):
+        """Прямоугольники видимых элементов: собираются одним запросом и кэшируются как снимок"""
+        if self._layout is None:
+            self._layout = collect_layout(browser.driver, self.LAYOUT_IGNORE)
+        return self._layout
+    
+    def invalidate_snapshot(self):
+        """Сбросить снимок: после навигации, клика, ввода или изменения размера окна"""
+        self._snapshot = None
+        self._layout = None
+        return self
     
     @allure.step("Открыть страницу: {path}")
     def open(self, path: str = "/"):
         """Открыть страницу по указанному пути"""
         full_url = f"{self.base_url}{path}"
         browser.driver.get(full_url)
+        wait_until_ready(browser.driver, self.READY_WHEN, browser.config.timeout)
+        # Повторный open того же объекта — переход внутри теста: страница сценария уже другая
+        self.changed = self._opened
+        self._opened = True
+        self.invalidate_snapshot()
+        self.check_performance(path)
+        return self
+    
+    def check_performance(self, path: str):
+        """Прикрепить метрики загрузки к шагу и проверить бюджет страницы"""
+        timing = collect_timing()
+        metrics = summarize(timing)
+        budget = self.BUDGETS.get(path, {})
+        allure.attach(
+            json.dumps({"metrics": metrics, "budget": budget, "raw": timing}, ensure_ascii=False, indent=2),
+            name="Метрики загрузки страницы",
+            attachment_type=allure.attachment_type.JSON
+        )
+        violations = budget_violations(metrics, budget)
+        assert not violations, f"Превышен бюджет производительности {path}: " + "; ".join(violations)
+        return self
+    
+    @allure.step("Изменить размер окна: {width}x{height}")
+    def resize(self, width: int, height: int):
+        """Изменить размер окна браузера"""
+        browser.driver.set_window_size(width, height)
+        self.changed = True
+        self.invalidate_snapshot()
+        return self
+    
+    @allure.step("Эмулировать экран: {viewport}")
+    def emulate(self, viewport: Viewport):
+        """Переключить область просмотра на экран устройства в том же браузере"""
+        emulate_viewport(browser.driver, viewport)
+        self.changed = True
+        self.invalidate_snapshot()
         return self
     
     @allure.step("Проверить, что URL содержит: {expected_part}")
@@ -44,22 +158,93 @@ class BasePage:
     def click(self, selector: str):
         """Кликнуть по элементу"""
         browser.element(selector).should(be.clickable).click()
+        self.changed = True
+        self.invalidate_snapshot()
         return self
     
     @allure.step("Ввести текст '{text}' в поле: {selector}")
     def type_text(self, selector: str, text: str):
         """Ввести текст в поле"""
         browser.element(selector).should(be.visible).type(text)
+        self.changed = True
+        self.invalidate_snapshot()
+        return self
+    
+    @allure.step("Проверить, что элементы не наслаиваются друг на друга")
+    def should_have_no_overlapping_elements(self):
+        """Проверить, что видимые интерактивные и текстовые элементы не перекрывают друг друга"""
+        layout = self.layout()
+        violations = find_overlaps(layout.boxes, self.OVERLAP_TOLERANCE)
+        self._attach_layout_report("Наслоение элементов", layout, violations)
+        assert not violations, f"Наслаивающихся пар элементов: {len(violations)} (см. вложения)"
+        return self
+    
+    @allure.step("Проверить расстояние между полями и кнопками")
+    def should_have_spacing_between_controls(self, min_gap: float = None):
+        """Проверить, что поля и кнопки не стоят вплотную друг к другу"""
+        min_gap = self.MIN_CONTROL_GAP if min_gap is None else min_gap
+        layout = self.layout()
+        violations = find_spacing_violations(layout.boxes, min_gap, tolerance=self.OVERLAP_TOLERANCE)
+        self._attach_layout_report(f"Расстояние между элементами меньше {min_gap} px", layout, violations)
+        assert not violations, f"Пар полей и кнопок ближе {min_gap} px: {len(violations)} (см. вложения)"
+        return self
+    
+    def _attach_layout_report(self, name: str, layout, violations):
+        allure.attach(
+            f"Проверено элементов: {len(layout.boxes)}\nНарушений: {len(violations)}",
+            name=name,
+            attachment_type=allure.attachment_type.TEXT
+        )
+        if violations:
+            allure.attach(violations_csv(violations), name=f"{name}: пары", attachment_type=allure.attachment_type.CSV)
+            allure.attach(
+                layout_svg(layout, violations),
+                name=f"{name}: схема страницы",
+                attachment_type=allure.attachment_type.SVG
+            )
+    
+    @allure.step("Сравнить снимок страницы '{name}' с эталоном")
+    def should_match_snapshot(self, visual: VisualChecker, name: str, viewport: Viewport = None):
+        """Сравнить видимую часть страницы с эталоном для этого экрана"""
+        masks = freeze_page(browser.driver, self.VISUAL_MASKS)
+        screenshot = browser.driver.get_screenshot_as_png()
+        visual.check(name, viewport.name if viewport else "default", screenshot, masks)
         return self
     
     @allure.step("Проверить наличие favicon")
     def should_have_favicon(self):
         """Проверить наличие favicon на странице"""
-        page_source = browser.driver.page_source.lower()
-        has_favicon = "rel=\"icon\"" in page_source or "favicon" in page_source
+        snapshot = self.snapshot()
+        has_favicon = len(snapshot["favicon_links"]) > 0 or snapshot["mentions_favicon"]
         assert has_favicon, "Favicon не найден на странице"
         return self
     
+    @allure.step("Проверить, что страница в кодировке UTF-8")
+    def should_have_utf8_encoding(self):
+        """Проверить кодировку по meta charset или meta http-equiv Content-Type"""
+        snapshot = self.snapshot()
+        charset = snapshot["meta_charset"]
+        content_type = snapshot["meta_content_type"]
+        if not charset and content_type and "utf-8" in content_type.lower():
+            charset = "UTF-8"
+        
+        if charset is None and content_type is None:
+            allure.attach(
+                "Meta-тег с кодировкой не найден, предполагаем UTF-8 по умолчанию",
+                name="Информация о кодировке",
+                attachment_type=allure.attachment_type.TEXT
+            )
+            return self
+        
+        allure.attach(
+            f"Найденная кодировка: {charset}",
+            name="Кодировка страницы",
+            attachment_type=allure.attachment_type.TEXT
+        )
+        if charset:
+            assert "utf-8" in charset.lower(), f"Кодировка не UTF-8: {charset}"
+        return self
+    
     @allure.step("Проверить отсутствие JS ошибок в консоли")
     def should_have_no_js_errors(self):
         """Проверить отсутствие критических JS ошибок в консоли браузера"""
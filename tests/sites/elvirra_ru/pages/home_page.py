@@ -1,23 +1,41 @@
 """Page Object для главной страницы elvirra.ru"""
 import allure
-from selene import browser, be, have
+from tests.shared.readiness import document_ready, no_pending_requests, selector_present
 from tests.sites.elvirra_ru.pages.base_page import BasePage
-from tests.sites.elvirra_ru.data.urls import BASE_URL, HOME
+from tests.sites.elvirra_ru.data.urls import HOME
+from tests.sites.elvirra_ru.site import SITE
 
 
 class HomePage(BasePage):
     """Главная страница сайта"""
     
-    def __init__(self):
-        super().__init__(BASE_URL)
+    def __init__(self, base_url: str):
+        super().__init__(base_url)
         self.path = HOME
     
-    # Локаторы
-    HEADER = "header, .header, #header, .site-header, .top"
-    FOOTER = "footer, .footer, #footer, .site-footer, .bottom"
-    MAIN_CONTENT = "main, #content, .content, .main, body"
-    LOGO = "a[href='/'], a[href='https://elvirra.ru/'], img[alt*='logo'], .logo, .brand"
-    NAV_MENU = "nav, .nav, .menu, .navbar, .main-menu"
+    # Локаторы из описания сайта (data/locators.py)
+    HEADER = SITE.locator("header")
+    FOOTER = SITE.locator("footer")
+    MAIN_CONTENT = SITE.locator("main_content")
+    LOGO = SITE.locator("logo")
+    NAV_MENU = SITE.locator("nav_menu")
+    HEADER_FALLBACK = SITE.locator("header_fallback")
+    
+    BUDGETS = SITE.budgets
+    # Проверкам главной нужен разобранный DOM с верхним блоком, картинки и трекеры не нужны
+    READY_WHEN = (
+        document_ready("interactive"),
+        selector_present(HEADER_FALLBACK),
+        no_pending_requests(),
+    )
+    
+    SNAPSHOT_SELECTORS = {
+        "header": HEADER,
+        "header_fallback": HEADER_FALLBACK,
+        "footer": FOOTER,
+        "logo": LOGO,
+        "nav": NAV_MENU,
+    }
     
     @allure.step("Открыть главную страницу")
     def open_home(self):
@@ -28,36 +46,38 @@ class HomePage(BasePage):
     @allure.step("Проверить, что шапка сайта видима")
     def should_have_header(self):
         """Проверить наличие шапки сайта"""
-        if len(browser.all(self.HEADER)) == 0:
-            # На части шаблонов нет semantic-header, считаем хедером меню/верхнюю панель.
-            assert len(browser.all("a[href], .menu, .top, .header")) > 0, "Верхний блок не найден"
+        counts = self.snapshot()["counts"]
+        if counts["header"] == 0:
+            assert counts["header_fallback"] > 0, "Верхний блок не найден"
         return self
     
     @allure.step("Проверить, что подвал сайта видим")
     def should_have_footer(self):
         """Проверить наличие подвала сайта"""
-        if len(browser.all(self.FOOTER)) == 0:
-            page_text = browser.element("body").locate().text.lower()
+        snapshot = self.snapshot()
+        if snapshot["counts"]["footer"] == 0:
+            page_text = snapshot["body_text"].lower()
             assert "elvirra" in page_text or "©" in page_text, "Подвал/копирайт не найден"
         return self
     
     @allure.step("Проверить, что основной контент видим")
     def should_have_main_content(self):
         """Проверить наличие основного контента"""
-        assert len(browser.element("body").locate().text.strip()) > 0, "Основной контент не найден"
+        assert len(self.snapshot()["body_text"].strip()) > 0, "Основной контент не найден"
         return self
     
     @allure.step("Проверить, что логотип видим и кликабелен")
     def should_have_clickable_logo(self):
         """Проверить наличие и кликабельность логотипа"""
-        assert len(browser.all(self.LOGO)) > 0, "Логотип или ссылка на главную не найдены"
+        assert self.snapshot()["counts"]["logo"] > 0, "Логотип или ссылка на главную не найдены"
         return self
     
     @allure.step("Проверить, что навигационное меню видимо")
     def should_have_navigation(self):
         """Проверить наличие навигационного меню"""
-        has_nav = len(browser.all(self.NAV_MENU)) > 0
-        has_links = len(browser.all("a[href]")) > 0
+        snapshot = self.snapshot()
+        has_nav = snapshot["counts"]["nav"] > 0
+        has_links = snapshot["links"] > 0
         assert has_nav or has_links, "Навигационные элементы не найдены"
         return self
     
@@ -70,30 +90,15 @@ class HomePage(BasePage):
     @allure.step("Проверить, что на странице есть заголовок")
     def should_have_page_title(self):
         """Проверить, что у страницы есть непустой title"""
-        title = browser.driver.title
+        title = self.snapshot()["title"]
         assert title and len(title) > 0, "Title страницы пустой"
         allure.attach(title, name="Title страницы", attachment_type=allure.attachment_type.TEXT)
         return self
     
-    @allure.step("Найти и проверить все ссылки на странице")
-    def should_have_working_links(self):
-        """Проверить, что основные ссылки присутствуют и кликабельны"""
-        links = browser.all("a[href]")
-        links_count = len(links)
-        
-        assert links_count > 0, "На странице не найдено ни одной ссылки"
-        allure.attach(
-            f"Найдено ссылок: {links_count}",
-            name="Количество ссылок",
-            attachment_type=allure.attachment_type.TEXT
-        )
-        return self
-    
     @allure.step("Проверить, что все кнопки на странице кликабельны")
     def should_have_clickable_buttons(self):
         """Проверить наличие и кликабельность кнопок"""
-        buttons = browser.all("button, input[type='submit'], input[type='button']")
-        buttons_count = len(buttons)
+        buttons_count = self.snapshot()["buttons"]
         
         allure.attach(
             f"Найдено кнопок: {buttons_count}",
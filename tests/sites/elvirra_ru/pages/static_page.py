@@ -0,0 +1,121 @@
+"""Page Object для проверок страницы по HTML, без браузера"""
+import csv
+import io
+from urllib.parse import urljoin, urlsplit
+
+import allure
+import requests
+from tests.shared.crawler import CrawledPage, site_host
+from tests.shared.link_checker import LinkChecker, normalize_links
+from tests.shared.static_analysis import declared_charsets
+
+
+class StaticPage:
+    """Страница сайта, скачанная по HTTP: проверки по HTML и заголовкам ответа"""
+
+    def __init__(self, page: CrawledPage):
+        self.page = page
+
+    @allure.step("Проверить, что страница отвечает 200")
+    def should_be_available(self):
+        """Проверить статус ответа страницы"""
+        assert self.page.status == 200, f"{self.page.path} отвечает {self.page.status}"
+        return self
+
+    @allure.step("Проверить наличие заголовка страницы")
+    def should_have_title(self):
+        """Проверить, что title страницы не пустой"""
+        title = self.page.facts.title
+        assert title, f"У страницы {self.page.path} пустой или отсутствующий title"
+        allure.attach(title, name="Заголовок страницы", attachment_type=allure.attachment_type.TEXT)
+        return self
+
+    @allure.step("Проверить наличие ссылки на главную страницу")
+    def should_have_home_link(self):
+        """Проверить, что на странице есть ссылка на корень сайта"""
+        host = site_host(self.page.url)
+        home_links = [
+            url for url in self.page.links()
+            if site_host(url) == host and urlsplit(url).path in ("", "/") and not urlsplit(url).query
+        ]
+        assert home_links, f"На странице {self.page.path} нет ссылки на главную"
+        return self
+
+    @allure.step("Проверить наличие favicon")
+    def should_have_favicon(self):
+        """Проверить favicon: <link rel="icon"> или ответ сервера на /favicon.ico"""
+        icons = [urljoin(self.page.url, href) for href in self.page.facts.favicon_links]
+        if not icons:
+            # Без <link rel="icon"> браузер запрашивает /favicon.ico
+            response = requests.get(urljoin(self.page.url, "/favicon.ico"), timeout=10)
+            if response.ok and response.content:
+                icons = [response.url]
+        assert icons, f"Favicon не найден на странице {self.page.path}"
+        allure.attach("\n".join(icons), name="Favicon", attachment_type=allure.attachment_type.TEXT)
+        return self
+
+    @allure.step("Проверить, что страница в кодировке UTF-8")
+    def should_have_utf8_encoding(self):
+        """Проверить кодировку по заголовку Content-Type и meta-тегам"""
+        declared = declared_charsets(self.page.content_type, self.page.facts)
+        if not declared:
+            allure.attach(
+                "Кодировка не объявлена ни в заголовке, ни в meta-тегах, предполагаем UTF-8 по умолчанию",
+                name="Информация о кодировке",
+                attachment_type=allure.attachment_type.TEXT
+            )
+            return self
+
+        allure.attach(
+            "\n".join(f"{source}: {charset}" for source, charset in declared.items()),
+            name="Кодировка страницы",
+            attachment_type=allure.attachment_type.TEXT
+        )
+        not_utf8 = [
+            f"{source}: {charset}" for source, charset in declared.items()
+            if charset.lower() not in ("utf-8", "utf8")
+        ]
+        assert not not_utf8, f"Кодировка {self.page.path} не UTF-8: " + "; ".join(not_utf8)
+        return self
+
+    @allure.step("Проверить, что на странице есть интерактивные элементы")
+    def should_have_interactive_elements(self):
+        """Проверить, что есть ссылки, кнопки или поля, до которых можно добраться с клавиатуры"""
+        facts = self.page.facts
+        assert facts.interactive > 0, f"На странице {self.page.path} не найдено интерактивных элементов"
+        allure.attach(
+            f"Найдено интерактивных элементов: {facts.interactive}\n"
+            f"Ссылок: {facts.links}, кнопок: {facts.buttons}, полей: {facts.inputs}",
+            name="Количество интерактивных элементов",
+            attachment_type=allure.attachment_type.TEXT
+        )
+        return self
+
+    @allure.step("Найти и проверить все ссылки на странице")
+    def should_have_working_links(self, link_checker: LinkChecker = None):
+        """Проверить, что ссылки есть и (если передан link_checker) открываются без ошибок"""
+        links_count = self.page.facts.links
+
+        assert links_count > 0, "На странице не найдено ни одной ссылки"
+        allure.attach(
+            f"Найдено ссылок: {links_count}",
+            name="Количество ссылок",
+            attachment_type=allure.attachment_type.TEXT
+        )
+        if link_checker is None:
+            return self
+
+        urls = normalize_links(self.page.links())
+        broken = [result for result in link_checker.check(urls) if not result.ok]
+        if broken:
+            table = io.StringIO()
+            writer = csv.writer(table)
+            writer.writerow(["url", "status", "error"])
+            writer.writerows([result.url, result.status or "", result.error or ""] for result in broken)
+            allure.attach(
+                table.getvalue(),
+                name="Битые ссылки",
+                attachment_type=allure.attachment_type.CSV
+            )
+        assert not broken, f"Битых ссылок: {len(broken)} из {len(urls)}"
+        return self
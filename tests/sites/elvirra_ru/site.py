@@ -0,0 +1,17 @@
+"""Описание elvirra.ru для реестра сайтов: читается без импорта страниц и тестов сайта"""
+from tests.shared.sites import Site, SiteLimits
+from tests.sites.elvirra_ru.data.blocklist import BLOCKED_URLS
+from tests.sites.elvirra_ru.data.locators import LOCATORS
+from tests.sites.elvirra_ru.data.urls import ABOUT, BASE_URL, CONTACTS, HOME, PAGE_BUDGETS
+from tests.sites.elvirra_ru.data.viewports import VIEWPORTS
+
+SITE = Site(
+    name="elvirra.ru",
+    base_url=BASE_URL,
+    pages=(HOME, CONTACTS, ABOUT),
+    locators=LOCATORS,
+    blocked_urls=BLOCKED_URLS,
+    viewports=VIEWPORTS,
+    budgets=PAGE_BUDGETS,
+    limits=SiteLimits(workers=2, timeout=30 * 60),
+)
@@ -1,25 +1,28 @@
 """Тесты из раздела 'Чек-лист: Общее'"""
 import allure
 import pytest
+from tests.sites.elvirra_ru.data.urls import HOME
 from tests.sites.elvirra_ru.pages.home_page import HomePage
+from tests.sites.elvirra_ru.pages.static_page import StaticPage
 from tests.sites.elvirra_ru.components.header_component import HeaderComponent
 
 
-@allure.parent_suite("elvirra.ru")
 @allure.suite("Чек-лист: Общее")
 @pytest.mark.general
+@pytest.mark.browser_profile("headless-no-images")
 @pytest.mark.smoke
+@pytest.mark.pages(HOME)
 class TestGeneral:
     """Тесты общей функциональности сайта"""
     
+    @pytest.mark.scenario("home")
     @allure.sub_suite("Сайт корректно открывается и доступен.")
     @allure.title("Проверка доступности сайта")
     @allure.description("Проверяем, что сайт открывается и основные элементы видимы")
-    def test_site_is_accessible(self):
+    def test_site_is_accessible(self, home_visit):
         """Сайт должен открываться и быть доступным"""
-        home = HomePage()
+        home = home_visit
         
-        home.open_home()
         home.should_have_header()
         home.should_have_main_content()
         home.should_have_footer()
@@ -27,9 +30,9 @@ class TestGeneral:
     @allure.sub_suite("Повторное открытие сайта выполняется без сбоев.")
     @allure.title("Проверка повторного открытия сайта")
     @allure.description("Проверяем, что сайт можно открыть повторно без ошибок")
-    def test_site_reopens_without_errors(self):
+    def test_site_reopens_without_errors(self, base_url):
         """Сайт должен открываться повторно без сбоев"""
-        home = HomePage()
+        home = HomePage(base_url)
         
         # Первое открытие
         home.open_home()
@@ -43,31 +46,32 @@ class TestGeneral:
     @allure.sub_suite("Все кнопки на сайте реагируют на нажатие.")
     @allure.title("Проверка кликабельности кнопок")
     @allure.description("Проверяем, что кнопки на странице кликабельны")
-    def test_buttons_are_clickable(self):
+    def test_buttons_are_clickable(self, base_url):
         """Все кнопки должны быть кликабельны"""
-        home = HomePage()
+        home = HomePage(base_url)
         
         home.open_home()
         home.should_have_clickable_buttons()
     
+    @pytest.mark.static(HOME)
     @allure.sub_suite("Все ссылки переходят на соответствующие страницы.")
     @allure.title("Проверка наличия ссылок")
-    @allure.description("Проверяем, что на странице есть рабочие ссылки")
-    def test_links_are_present(self):
+    @allure.description("Проверяем по HTML главной, что на странице есть рабочие ссылки")
+    def test_links_are_present(self, page_response, link_checker):
         """Ссылки должны присутствовать на странице"""
-        home = HomePage()
+        home = StaticPage(page_response)
         
-        home.open_home()
-        home.should_have_working_links()
+        home.should_be_available()
+        home.should_have_working_links(link_checker)
     
+    @pytest.mark.scenario("home")
     @allure.sub_suite("Основные элементы сайта функционируют без нарушений.")
     @allure.title("Проверка основных элементов сайта")
     @allure.description("Проверяем работоспособность основных элементов: шапка, контент, подвал")
-    def test_main_elements_work(self):
+    def test_main_elements_work(self, home_visit):
         """Основные элементы сайта должны функционировать"""
-        home = HomePage()
+        home = home_visit
         
-        home.open_home()
         home.should_have_header()
         home.should_have_main_content()
         home.should_have_footer()
@@ -76,9 +80,9 @@ class TestGeneral:
     @allure.sub_suite("Навигационное меню работает корректно.")
     @allure.title("Проверка навигационного меню")
     @allure.description("Проверяем наличие и видимость навигационного меню")
-    def test_navigation_menu_works(self):
+    def test_navigation_menu_works(self, base_url):
         """Навигационное меню должно работать корректно"""
-        home = HomePage()
+        home = HomePage(base_url)
         header = HeaderComponent()
         
         home.open_home()
@@ -88,9 +92,9 @@ class TestGeneral:
     @allure.sub_suite("На всех страницах присутствует ссылка на домашнюю страницу.")
     @allure.title("Проверка ссылки на главную страницу (логотип)")
     @allure.description("Проверяем, что логотип кликабелен и ведёт на главную")
-    def test_home_link_present(self):
+    def test_home_link_present(self, base_url):
         """На странице должна быть ссылка на главную (логотип)"""
-        home = HomePage()
+        home = HomePage(base_url)
         
         home.open_home()
         home.should_have_clickable_logo()
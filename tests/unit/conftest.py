@@ -0,0 +1,17 @@
+"""Общие фикстуры тестов фреймворка"""
+import pytest
+from tests.unit.stub_server import StubServer
+
+
+@pytest.fixture
+def stub_server():
+    """Запустить заглушку: stub_server(routes, delay=0); все серверы теста останавливаются после него"""
+    servers = []
+
+    def start(routes, delay: float = 0) -> StubServer:
+        servers.append(StubServer(routes, delay).start())
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.stop()
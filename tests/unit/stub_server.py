@@ -0,0 +1,101 @@
+"""Локальный HTTP-сервер-заглушка для тестов фреймворка: маршруты и задержка задаются тестом"""
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+@dataclass
+class StubRequest:
+    """Запрос, пришедший на сервер-заглушку"""
+    method: str
+    path: str
+    headers: dict
+    body: bytes
+
+
+@dataclass
+class StubResponse:
+    """Ответ заглушки; drop=True обрывает соединение без ответа"""
+    status: int = 200
+    body: bytes = b""
+    headers: dict = field(default_factory=dict)
+    delay: Optional[float] = None
+    drop: bool = False
+
+
+NOT_FOUND = StubResponse(404)
+
+
+class StubServer:
+    """Сервер на 127.0.0.1: routes — {путь: ответ или функция(запрос)} либо функция(запрос) -> ответ"""
+
+    def __init__(self, routes, delay: float = 0):
+        self.routes = routes
+        self.delay = delay
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def respond(self, request: StubRequest) -> StubResponse:
+        route = self.routes(request) if callable(self.routes) else self.routes.get(request.path, NOT_FOUND)
+        return route(request) if callable(route) else route
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self._respond()
+
+            def do_HEAD(self):
+                self._respond()
+
+            def do_POST(self):
+                self._respond()
+
+            def _respond(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                request = StubRequest(self.command, self.path, dict(self.headers), body)
+                with server._lock:
+                    server.requests.append(request)
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                try:
+                    response = server.respond(request)
+                    time.sleep(server.delay if response.delay is None else response.delay)
+                    if response.drop:
+                        self.close_connection = True
+                        return
+                    self.send_response(response.status)
+                    for name, value in response.headers.items():
+                        self.send_header(name, value)
+                    if response.status != 304:
+                        self.send_header("Content-Length", str(len(response.body)))
+                    self.end_headers()
+                    if self.command != "HEAD" and response.status != 304:
+                        self.wfile.write(response.body)
+                finally:
+                    with server._lock:
+                        server.active -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "StubServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
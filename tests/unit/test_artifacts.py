@@ -0,0 +1,91 @@
+"""Тесты сжатия артефактов падения и бюджетов размера"""
+import gzip
+import io
+
+import pytest
+from tests.shared.artifacts import (
+    Artifact,
+    ArtifactPipeline,
+    ArtifactSettings,
+    RawArtifacts,
+    build_har,
+    compress_screenshot,
+    encode,
+    pack_text,
+)
+
+pytestmark = pytest.mark.no_browser
+
+EVENTS = [
+    {"method": "Network.requestWillBeSent", "params": {
+        "requestId": "1", "timestamp": 10.0, "wallTime": 1700000000.0,
+        "request": {"method": "GET", "url": "https://example.com/", "headers": {"Accept": "text/html"}},
+    }},
+    {"method": "Network.responseReceived", "params": {
+        "requestId": "1",
+        "response": {"status": 200, "statusText": "OK", "protocol": "h2", "mimeType": "text/html", "headers": {}},
+    }},
+    {"method": "Network.loadingFinished", "params": {"requestId": "1", "timestamp": 10.25, "encodedDataLength": 512}},
+    {"method": "Network.requestWillBeSent", "params": {
+        "requestId": "2", "timestamp": 10.1, "wallTime": 1700000000.1,
+        "request": {"method": "GET", "url": "https://counter.example/tag.js"},
+    }},
+    {"method": "Network.loadingFailed", "params": {"requestId": "2", "timestamp": 10.2, "blockedReason": "inspector"}},
+]
+
+
+def test_build_har_pairs_request_and_response():
+    entries = build_har(EVENTS)["log"]["entries"]
+
+    assert [entry["request"]["url"] for entry in entries] == ["https://example.com/", "https://counter.example/tag.js"]
+    assert entries[0]["response"]["status"] == 200
+    assert entries[0]["response"]["bodySize"] == 512
+    assert entries[0]["time"] == pytest.approx(250)
+    assert entries[1]["response"]["_error"] == "inspector"
+
+
+def test_large_text_is_gzipped():
+    small = pack_text("HTML", "<p>ok</p>", 100, None, "html")
+    large = pack_text("HTML", "x" * 1000, 100, None, "html")
+
+    assert small.body == "<p>ok</p>"
+    assert large.extension == "html.gz"
+    assert gzip.decompress(large.body) == b"x" * 1000
+
+
+def test_screenshot_is_reencoded_and_downscaled():
+    Image = pytest.importorskip("PIL.Image")
+    buffer = io.BytesIO()
+    Image.new("RGB", (400, 200), (200, 100, 50)).save(buffer, format="PNG")
+
+    artifact = compress_screenshot(buffer.getvalue(), ArtifactSettings(image_format="jpeg", scale=0.5))
+
+    assert artifact.extension == "jpeg"
+    assert Image.open(io.BytesIO(artifact.body)).size == (200, 100)
+
+
+def test_encode_orders_artifacts_by_priority():
+    raw = RawArtifacts(url="https://example.com/", page_source="<html></html>", network_events=EVENTS,
+                       errors=["dom: WebDriverException"])
+
+    names = [artifact.name for artifact in encode(raw, ArtifactSettings())]
+
+    assert names == ["URL страницы", "Сетевые запросы (HAR)", "HTML страницы", "Не удалось снять артефакты"]
+
+
+def test_pipeline_drops_artifacts_over_budget(monkeypatch):
+    artifacts = [Artifact("first", b"a" * 60), Artifact("second", b"b" * 60), Artifact("third", b"c" * 30)]
+    monkeypatch.setattr("tests.shared.artifacts.encode", lambda raw, settings: artifacts)
+    pipeline = ArtifactPipeline(ArtifactSettings(test_budget=100, run_budget=120))
+
+    pipeline.submit("test_a", RawArtifacts())
+    first = pipeline.collect("test_a")
+    pipeline.submit("test_b", RawArtifacts())
+    second = pipeline.collect("test_b")
+    pipeline.close()
+
+    assert [artifact.name for artifact in first] == ["first", "third", "Артефакты вне бюджета"]
+    assert [artifact.name for artifact in second] == ["third", "Артефакты вне бюджета"]
+    assert pipeline.attached_bytes == 120
+    assert pipeline.dropped == 3
+    assert pipeline.collect("test_c") == []
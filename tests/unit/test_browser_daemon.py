@@ -0,0 +1,143 @@
+"""Тесты демона тёплых браузеров: лимиты пула, перезапуск, API и подключение к сессии"""
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+from tests.shared.browser_daemon import (
+    AttachedChrome,
+    DaemonClient,
+    DaemonError,
+    DaemonServer,
+    DaemonSettings,
+    PoolExhausted,
+    WarmPool,
+)
+from tests.unit.stub_server import StubRequest, StubResponse
+
+pytestmark = pytest.mark.no_browser
+
+
+class FakeBrowsers:
+    """Фабрика браузеров-заглушек: память и «живость» задаются тестом"""
+
+    def __init__(self):
+        self.launched = []
+        self.quit = []
+        self.reset = []
+
+    def factory(self, profile, page_load_strategy):
+        driver = SimpleNamespace(
+            profile=profile, alive=True, rss=100, session_id=f"session-{len(self.launched)}",
+            caps={"browserName": "chrome"}, service=SimpleNamespace(service_url="http://127.0.0.1:9"),
+        )
+        self.launched.append(driver)
+        return driver
+
+    def pool(self, **settings) -> WarmPool:
+        return WarmPool(
+            self.factory, DaemonSettings(**settings), rss=lambda driver: driver.rss,
+            reset=self.reset.append, alive=lambda driver: driver.alive, quit=self.quit.append,
+        )
+
+
+def test_pool_keeps_warm_browsers_within_size_limit():
+    browsers = FakeBrowsers()
+    pool = browsers.pool(size=2, warm=2, profile="headless")
+    pool.fill()
+
+    first = pool.lease("headless", "normal")
+    second = pool.lease("headless", "normal")
+
+    assert len(browsers.launched) == 2
+    assert [first.driver, second.driver] == browsers.launched
+    with pytest.raises(PoolExhausted):
+        pool.lease("headless", "normal", timeout=0)
+    pool.release(first.lease)
+    assert browsers.reset == [first.driver]
+    # Свободный браузер другого профиля уступает место
+    assert pool.lease("full", "normal").driver.profile == "full"
+    assert browsers.quit == [first.driver]
+
+
+def test_browser_is_recycled_after_test_limit_or_memory_threshold():
+    browsers = FakeBrowsers()
+    pool = browsers.pool(size=2, warm=1, profile="headless", max_tests=2, max_rss=1000)
+
+    worn = pool.lease("headless", "normal")
+    assert not pool.checkin(worn.lease)
+    assert pool.checkin(worn.lease)
+    pool.release(worn.lease)
+
+    heavy = pool.lease("headless", "normal")
+    heavy.driver.rss = 5000
+    assert pool.checkin(heavy.lease)
+    pool.release(heavy.lease)
+
+    assert browsers.quit == [worn.driver, heavy.driver]
+    assert pool.stats["recycled"] == 2
+    assert [b["tests"] for b in pool.status()["browsers"]] == [0]
+
+
+def test_health_check_replaces_dead_idle_browsers():
+    browsers = FakeBrowsers()
+    pool = browsers.pool(size=2, warm=2, profile="headless")
+    pool.fill()
+    browsers.launched[0].alive = False
+
+    pool.check_health()
+
+    assert browsers.quit == [browsers.launched[0]]
+    assert len(pool.status()["browsers"]) == 2 and pool.stats["unhealthy"] == 1
+    assert pool.lease("headless", "normal").driver.alive
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    browsers = FakeBrowsers()
+    server = DaemonServer(browsers.pool(size=1, warm=0, profile="headless"))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state = tmp_path / "browser-daemon.json"
+    state.write_text(json.dumps({"url": server.url, "token": server.token}))
+    yield browsers, state
+    server.shutdown()
+    server.server_close()
+
+
+def test_client_leases_and_returns_browsers(daemon, tmp_path):
+    browsers, state = daemon
+    client = DaemonClient.from_state(state)
+
+    lease = client.lease("headless", "normal")
+    assert lease["session_id"] == "session-0" and lease["executor"] == "http://127.0.0.1:9"
+    assert client.checkin(lease["lease"]) is False
+    client.release(lease["lease"])
+    assert client.lease("headless", "normal")["session_id"] == "session-0"
+
+    assert DaemonClient.from_state(tmp_path / "missing.json") is None
+    with pytest.raises(DaemonError, match="токен"):
+        DaemonClient(client.url, "wrong-token").lease("headless", "normal")
+
+
+def webdriver_session(request: StubRequest) -> StubResponse:
+    """Endpoint WebDriver одной открытой сессии: новых сессий не создаёт"""
+    known = request.path.startswith("/session/warm-1/")
+    body = json.dumps({"value": "about:blank" if known else None}).encode()
+    return StubResponse(200 if known else 404, body, {"Content-Type": "application/json"})
+
+
+def test_attached_driver_reuses_existing_session(stub_server):
+    server = stub_server(webdriver_session)
+    driver = AttachedChrome({
+        "lease": "x", "executor": server.url, "session_id": "warm-1",
+        "capabilities": {"browserName": "chrome"},
+    })
+    assert driver.current_url == "about:blank"
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    driver.quit()
+
+    assert [(request.method, request.path) for request in server.requests] == [
+        ("GET", "/session/warm-1/url"),
+        ("POST", "/session/warm-1/goog/cdp/execute"),
+    ]
+    assert json.loads(server.requests[1].body) == {"cmd": "Network.clearBrowserCookies", "params": {}}
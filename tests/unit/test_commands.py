@@ -0,0 +1,58 @@
+"""Тесты учёта команд WebDriver"""
+import pytest
+from tests.shared.commands import CommandStats, command_log
+
+pytestmark = pytest.mark.no_browser
+
+
+class FakeDriver:
+    def __init__(self):
+        self.sent = []
+
+    def execute(self, driver_command, params=None):
+        self.sent.append(driver_command)
+        return {"value": None}
+
+
+def test_commands_are_counted_per_test():
+    driver = FakeDriver()
+    log = command_log(driver)
+    assert command_log(driver) is log
+
+    driver.execute("get", {"url": "/"})
+    log.start()
+    driver.execute("findElement")
+    driver.execute("findElement")
+    driver.execute("getElementAttribute")
+    stats = log.stop()
+
+    assert driver.sent == ["get", "findElement", "findElement", "getElementAttribute"]
+    assert stats.total == 3
+    assert stats.counts == {"findElement": 2, "getElementAttribute": 1}
+    assert sum(stats.histogram) == 3
+
+
+def test_listeners_see_every_command():
+    driver = FakeDriver()
+    seen = []
+    command_log(driver).subscribe(lambda command, seconds: seen.append(command))
+
+    driver.execute("executeScript")
+
+    assert seen == ["executeScript"]
+
+
+def test_histogram_buckets_and_merge():
+    first = CommandStats()
+    first.record("findElement", 0.0005)
+    first.record("get", 1.5)
+    second = CommandStats(first.data)
+    second.record("findElement", 0.003)
+
+    first.merge(second)
+
+    assert first.counts == {"findElement": 3, "get": 2}
+    assert first.histogram[0] == 2
+    assert first.histogram[2] == 1
+    assert first.histogram[-1] == 2
+    assert "findElement" in "\n".join(first.lines())
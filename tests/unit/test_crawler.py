@@ -0,0 +1,118 @@
+"""Тесты обхода сайта на локальном сервере-заглушке"""
+import pytest
+from tests.shared.crawler import CrawlCache, CrawledPage, crawl, fetch_pages, site_host
+from tests.unit.stub_server import StubRequest, StubResponse
+
+pytestmark = pytest.mark.no_browser
+
+# Сайт-цепочка: / -> /a -> /b -> /c, плюс внешняя ссылка, картинка и почта
+PAGES = {
+    "/": '<title>Главная</title><a href="/a">A</a><a href="https://example.com/">ext</a>'
+         '<a href="/logo.png">img</a><a href="mailto:x@example.com">mail</a>',
+    "/a": '<a href="/">home</a><a href="/b#top">B</a><a href="/a">self</a>',
+    "/b": '<a href="/c">C</a>',
+    "/c": '<a href="/">home</a>',
+    "/wide": "".join(f'<a href="/w{i}">{i}</a>' for i in range(20)),
+}
+
+
+def route(request: StubRequest) -> StubResponse:
+    """HTML-страницы из PAGES; остальные пути — пустые страницы, /slow* — через 0.3 с"""
+    if request.path.endswith(".png"):
+        return StubResponse(body=b"\x89PNG", headers={"Content-Type": "image/png"})
+    body = PAGES.get(request.path, "<p></p>").encode()
+    return StubResponse(
+        body=body, headers={"Content-Type": "text/html; charset=utf-8"},
+        delay=0.3 if request.path.startswith("/slow") else 0,
+    )
+
+
+@pytest.fixture
+def stub_site(stub_server):
+    return stub_server(route)
+
+
+def requested(site) -> list:
+    return [request.path for request in site.requests]
+
+
+def test_crawl_respects_depth_and_stays_on_site(stub_site):
+    pages = crawl(stub_site.url, max_depth=2)
+
+    assert sorted(page.path for page in pages) == ["/", "/a", "/b"]
+    # Внешние ссылки, файлы и повторы не запрашиваются
+    assert sorted(requested(stub_site)) == ["/", "/a", "/b"]
+
+
+def test_crawl_respects_page_budget(stub_site):
+    pages = crawl(stub_site.url, seeds=("/wide",), max_depth=1, max_pages=5)
+
+    assert len(pages) == 5
+    assert len(requested(stub_site)) == 5
+
+
+def test_fetch_pages_returns_html_facts(stub_site):
+    page = fetch_pages(stub_site.url, ["/"])["/"]
+
+    assert page.status == 200
+    assert page.facts.title == "Главная"
+    assert f"{stub_site.url}/a" in page.links()
+
+
+def test_pages_waiting_for_a_connection_do_not_time_out(stub_site):
+    # 12 страниц по 0.3 с через 2 соединения — около 1.8 с, каждая отвечает быстрее таймаута
+    paths = [f"/slow/{i}" for i in range(12)]
+
+    pages = fetch_pages(stub_site.url, paths, concurrency=2, timeout=1)
+
+    assert [path for path, page in pages.items() if page is None] == []
+
+
+def test_facts_read_charset_from_meta():
+    html = '<meta charset="utf-8"><meta http-equiv="Content-Type" content="text/html; charset=windows-1251">'
+    page = CrawledPage("http://example.com/", 200, {}, html)
+
+    assert page.facts.meta_charset == "utf-8"
+    assert page.facts.meta_content_type == "text/html; charset=windows-1251"
+    assert page.facts.title is None
+
+
+def test_cache_reuses_paths_until_refresh(tmp_path):
+    cache = CrawlCache(tmp_path / "crawler.json")
+    calls = []
+
+    def discover():
+        calls.append(1)
+        return ["/", "/a"]
+
+    assert cache.paths("site", discover) == ["/", "/a"]
+    assert cache.paths("site", discover) == ["/", "/a"]
+    assert len(calls) == 1
+
+    # --recrawl обходит сайт заново, но только один раз за прогон
+    cache.paths("site", discover, refresh=True, run_id="run-1")
+    cache.paths("site", discover, refresh=True, run_id="run-1")
+    assert len(calls) == 2
+
+
+def test_cache_does_not_store_empty_result(tmp_path):
+    cache = CrawlCache(tmp_path / "crawler.json")
+
+    assert cache.paths("site", lambda: []) == []
+    assert cache.paths("site", lambda: ["/"]) == ["/"]
+
+
+def test_failed_crawl_is_shared_by_workers_of_one_run(tmp_path):
+    cache = CrawlCache(tmp_path / "crawler.json")
+
+    # Первый воркер не смог обойти сайт, второй получил бы страницы — но должен собрать то же
+    assert cache.paths("site", lambda: [], run_id="run-1") == []
+    assert cache.paths("site", lambda: ["/", "/a"], run_id="run-1") == []
+    # Следующий прогон обходит сайт заново, а при новой неудаче берёт прежние пути
+    assert cache.paths("site", lambda: ["/", "/a"], run_id="run-2") == ["/", "/a"]
+    assert cache.paths("site", lambda: [], refresh=True, run_id="run-3") == ["/", "/a"]
+
+
+def test_www_and_bare_host_are_one_site():
+    assert site_host("https://www.Elvirra.ru/catalog") == site_host("https://elvirra.ru/") == "elvirra.ru"
+    assert site_host("https://shop.elvirra.ru/") != "elvirra.ru"
@@ -0,0 +1,108 @@
+"""Тесты модели формы"""
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException
+from tests.shared.forms import CHECK_SCRIPT, FIELDS_SELECTOR, FORM_SCRIPT, MATCH_SCRIPT, FormModel
+
+pytestmark = pytest.mark.no_browser
+
+
+def field_data(element, **overrides):
+    data = {
+        "element": element, "tag": "input", "type": "text", "name": element, "id": "", "label": "",
+        "aria_label": "", "placeholder": "", "required": False, "asterisk": False, "tabindex": None,
+        "disabled": False, "visible": True,
+    }
+    data.update(overrides)
+    return data
+
+
+class FakeDriver:
+    """Форма из двух полей; stale, detached и gone имитируют перерисовку, удаление полей и переход"""
+
+    def __init__(self):
+        self.scripts = []
+        self.stale = False
+        self.detached = False
+        self.gone = False
+        self.url = "https://site.test/"
+        self.generation = 0
+
+    def execute_script(self, script, *args):
+        self.scripts.append(script)
+        if script == FORM_SCRIPT and args[1] != FIELDS_SELECTOR:
+            # Поиск одного поля по всей странице
+            return {"url": self.url, "fields": [field_data("send", type="submit")] if args[1] == "#send" else []}
+        if script == FORM_SCRIPT:
+            self.generation += 1
+            self.detached = self.gone = False
+            return {"url": self.url, "fields": [
+                field_data(f"name-{self.generation}", label="Имя *", asterisk=True),
+                field_data(f"phone-{self.generation}", type="tel", placeholder="+7", tabindex="-1"),
+            ]}
+        if script == CHECK_SCRIPT and self.gone:
+            raise StaleElementReferenceException("stale")
+        if script == CHECK_SCRIPT:
+            return [self.url, not self.detached]
+        if script == MATCH_SCRIPT:
+            if self.stale:
+                self.stale = False
+                raise StaleElementReferenceException("stale")
+            selector, elements = args
+            return {"#name": 0, "#phone": 1}.get(selector, -1)
+        raise AssertionError(script)
+
+
+def test_fields_are_read_once_and_matches_are_memoized():
+    driver = FakeDriver()
+    model = FormModel(driver)
+
+    assert model.field("#name").marked_required
+    assert model.field("#name").title == "Имя *"
+    assert model.field("#phone").placeholder == "+7"
+    assert not model.field("#phone").focusable
+    assert model.field("#missing") is None
+    assert model.field("#phone").hint == "+7"
+
+    # Форма прочитана один раз, плюс один поиск #missing по всей странице; кэш сверяется со страницей
+    assert driver.scripts.count(FORM_SCRIPT) == 2
+    assert driver.scripts.count(MATCH_SCRIPT) == 3
+    assert driver.scripts.count(CHECK_SCRIPT) == 5
+
+
+def test_cache_is_dropped_after_navigation_or_rerender():
+    driver = FakeDriver()
+    model = FormModel(driver)
+    assert model.field("#name").element == "name-1"
+
+    driver.url = "https://site.test/contacts/"
+    assert model.field("#name").element == "name-2"
+
+    driver.detached = True
+    assert model.field("#name").element == "name-3"
+
+    driver.gone = True
+    assert model.field("#name").element == "name-4"
+    assert model.field("#name").element == "name-4"
+
+
+def test_stale_elements_reload_the_form():
+    driver = FakeDriver()
+    model = FormModel(driver)
+    model.fields()
+    driver.stale = True
+
+    assert model.field("#phone").element == "phone-2"
+
+
+def test_fields_outside_the_model_are_found_on_the_whole_page():
+    driver = FakeDriver()
+    model = FormModel(driver, root="form")
+
+    assert model.field("#send").type == "submit"
+    assert model.field("#send").element == "send"
+    assert model.field("#missing") is None
+    assert driver.scripts.count(FORM_SCRIPT) == 3
+
+    model.invalidate()
+    assert model.field("#send") is not None
+    assert driver.scripts.count(FORM_SCRIPT) == 5
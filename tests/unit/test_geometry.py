@@ -0,0 +1,113 @@
+"""Тесты поиска наслоений и тесных расстояний по прямоугольникам элементов"""
+import random
+import time
+from itertools import combinations
+
+import pytest
+from tests.shared.geometry import (
+    Box,
+    Layout,
+    candidate_pairs,
+    find_overlaps,
+    find_spacing_violations,
+    layout_svg,
+    violations_csv,
+)
+
+pytestmark = pytest.mark.no_browser
+
+
+def box(left, top, width, height, pre, post=None, kind="text", label=""):
+    return Box(left, top, width, height, pre, pre if post is None else post, kind, label or f"#{pre}")
+
+
+def test_overlapping_siblings_are_reported():
+    first = box(0, 0, 100, 20, pre=1)
+    second = box(50, 10, 100, 20, pre=2)
+
+    violation, = find_overlaps([first, second])
+
+    assert violation.rule == "overlap"
+    assert violation.value == 50 * 10
+
+
+def test_nested_elements_and_rounding_are_not_overlaps():
+    parent = box(0, 0, 200, 50, pre=1, post=4, kind="link")
+    child = box(10, 10, 50, 20, pre=2, post=3)
+    # Соседи касаются с погрешностью в 1 px
+    neighbour = box(199, 0, 100, 50, pre=5)
+
+    assert find_overlaps([parent, child, neighbour]) == []
+
+
+def test_wrapped_text_lines_do_not_overlap_inline_neighbours():
+    # Абзац перенесён на две строки, во второй строке за ним идёт ссылка
+    first_line = box(0, 0, 1000, 20, pre=1)
+    second_line = box(0, 18, 300, 20, pre=1)
+    link = box(310, 18, 100, 20, pre=2, kind="link")
+
+    assert find_overlaps([first_line, second_line, link]) == []
+
+
+def test_spacing_checks_only_close_controls():
+    button = box(0, 0, 100, 30, pre=1, kind="control")
+    field = box(102, 0, 100, 30, pre=2, kind="control")
+    far_field = box(0, 100, 100, 30, pre=3, kind="control")
+    close_text = box(0, 31, 100, 10, pre=4, kind="text")
+
+    violation, = find_spacing_violations([button, field, far_field, close_text], min_gap=4)
+
+    assert {violation.first.label, violation.second.label} == {"#1", "#2"}
+    assert violation.value == 2
+
+
+def test_diagonal_gap_is_euclidean():
+    first = box(0, 0, 10, 10, pre=1, kind="control")
+    second = box(13, 14, 10, 10, pre=2, kind="control")
+
+    violation, = find_spacing_violations([first, second], min_gap=6)
+
+    assert violation.value == 5.0
+
+
+def test_grid_finds_the_same_pairs_as_brute_force():
+    rng = random.Random(7)
+    boxes = [
+        box(rng.uniform(0, 1500), rng.uniform(0, 3000), rng.uniform(5, 300), rng.uniform(5, 80), pre=i)
+        for i in range(400)
+    ]
+    brute = {
+        (i, j) for i, j in combinations(range(len(boxes)), 2)
+        if min(boxes[i].right, boxes[j].right) > max(boxes[i].left, boxes[j].left)
+        and min(boxes[i].bottom, boxes[j].bottom) > max(boxes[i].top, boxes[j].top)
+    }
+
+    assert brute <= candidate_pairs(boxes)
+
+
+def test_thousands_of_elements_are_analysed_quickly():
+    # Сетка строк текста 1200x20000 px: 5000 элементов без наслоений
+    boxes = [box(20 + (i % 5) * 240, (i // 5) * 20, 230, 18, pre=i, kind="control") for i in range(5000)]
+
+    started = time.perf_counter()
+    overlaps = find_overlaps(boxes)
+    spacing = find_spacing_violations(boxes, min_gap=4)
+    elapsed = time.perf_counter() - started
+
+    assert overlaps == []
+    assert len(spacing) > 0
+    assert elapsed < 2
+
+
+def test_reports_describe_violations():
+    first = box(0, 0, 100, 20, pre=1, label='a "Войти"')
+    second = box(50, 10, 100, 20, pre=2, label="button#send")
+    layout = Layout(1000, 500, (first, second))
+    violations = find_overlaps(layout.boxes)
+
+    table = violations_csv(violations)
+    svg = layout_svg(layout, violations)
+
+    assert "button#send" in table and '"a ""Войти"""' in table
+    assert svg.startswith("<svg") and svg.count('stroke="red"') == 2
+    assert "Войти" in svg
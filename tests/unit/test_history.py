@@ -0,0 +1,69 @@
+"""Тесты истории прогонов и расписания по длительности"""
+from types import SimpleNamespace
+
+import pytest
+from tests.shared.history import HistoryEntry, RunHistory, RunRecorder, schedule
+
+pytestmark = pytest.mark.no_browser
+
+
+def report(nodeid, when, outcome, duration=1.0, user_properties=()):
+    return SimpleNamespace(
+        nodeid=nodeid, when=when, outcome=outcome, duration=duration,
+        failed=outcome == "failed", skipped=outcome == "skipped", user_properties=list(user_properties),
+    )
+
+
+def test_recorder_sums_phases_and_counts_reruns():
+    recorder = RunRecorder()
+    for item in (
+        report("a", "setup", "passed", 0.5), report("a", "call", "rerun", 2), report("a", "call", "passed", 2),
+        report("a", "teardown", "passed", 0.5),
+        report("b", "setup", "passed"), report("b", "call", "failed"), report("b", "teardown", "passed"),
+        report("c", "setup", "skipped", 0),
+    ):
+        recorder.pytest_runtest_logreport(item)
+
+    assert recorder.results == {"a": ["passed", 5.0, 1], "b": ["failed", 3.0, 0], "c": ["skipped", 0, 0]}
+
+
+def test_history_keeps_window_and_detects_flaky(tmp_path):
+    history = RunHistory(tmp_path / "history.sqlite", keep_runs=3)
+    history.record({"a": ("passed", 2.0, 0), "b": ("passed", 1.0, 0)})
+    history.record({"a": ("failed", 4.0, 0), "b": ("skipped", 0.0, 0)})
+    history.record({"a": ("passed", 3.0, 0), "b": ("passed", 1.0, 1)})
+    history.record({"a": ("passed", 5.0, 0), "b": ("passed", 3.0, 0)})
+
+    loaded = history.load(window=10)
+
+    assert loaded["a"].runs == 3
+    assert loaded["a"].duration == pytest.approx(4.0)
+    assert loaded["a"].flaky and loaded["a"].last_failed is not None
+    assert loaded["b"].runs == 2 and loaded["b"].retries == 1 and loaded["b"].flaky
+    assert history.load(window=1)["a"] == HistoryEntry(5.0, 1, 0, 0, None)
+    assert RunHistory(tmp_path / "missing.sqlite").load() == {}
+
+
+def test_schedule_runs_longest_groups_first_and_keeps_groups_together():
+    history = {
+        "short": HistoryEntry(duration=1, runs=1),
+        "long": HistoryEntry(duration=10, runs=1),
+        "scenario-1": HistoryEntry(duration=3, runs=1),
+        "scenario-2": HistoryEntry(duration=3, runs=1),
+    }
+
+    order = schedule([["short"], ["scenario-1", "scenario-2"], ["new"], ["long"]], history)
+
+    assert order == [["long"], ["scenario-1", "scenario-2"], ["new"], ["short"]]
+
+
+def test_fail_fast_order_puts_recent_failures_first():
+    history = {
+        "long": HistoryEntry(duration=10, runs=3),
+        "old-failure": HistoryEntry(duration=1, runs=3, failures=1, last_failed=1),
+        "new-failure": HistoryEntry(duration=1, runs=3, failures=1, last_failed=3),
+    }
+
+    order = schedule([["long"], ["old-failure"], ["new-failure"]], history, fail_fast=True)
+
+    assert order == [["new-failure"], ["old-failure"], ["long"]]
@@ -0,0 +1,126 @@
+"""Тесты инкрементальных прогонов: отпечатки страниц и кэшированные успехи"""
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from types import SimpleNamespace
+
+import pytest
+from tests.shared.history import RunHistory, RunRecorder
+from tests.shared.incremental import IncrementalStore, bound_pages, code_fingerprint, fingerprint_of
+from tests.unit.stub_server import StubRequest, StubResponse
+
+pytestmark = pytest.mark.no_browser
+
+
+class Page:
+    """Страница с ETag: на совпавший If-None-Match отвечает 304 без тела, /missing — 404"""
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+    def __call__(self, request: StubRequest) -> StubResponse:
+        if request.path == "/missing":
+            return StubResponse(404)
+        etag = f'"{len(self.body)}-{hash(self.body)}"'
+        if request.headers.get("If-None-Match") == etag:
+            return StubResponse(304)
+        return StubResponse(body=self.body, headers={"ETag": etag})
+
+
+@pytest.fixture
+def site(stub_server):
+    return stub_server(Page(b"<html>v1</html>"))
+
+
+def test_conditional_get_reuses_fingerprint_until_page_changes(site, tmp_path):
+    store = IncrementalStore(RunHistory(tmp_path / "history.sqlite"))
+
+    first = store.check_pages([f"{site.url}/", f"{site.url}/missing"])
+    second = store.check_pages([f"{site.url}/"])
+    site.routes.body = b"<html>v2</html>"
+    third = store.check_pages([f"{site.url}/"])
+
+    assert first[f"{site.url}/missing"] is None
+    assert second[f"{site.url}/"] == first[f"{site.url}/"] != third[f"{site.url}/"]
+    # Второй запрос подтвердил страницу по ETag (304)
+    assert site.requests[2].headers.get("If-None-Match") is not None
+
+
+def test_workers_of_one_run_share_page_checks(site, tmp_path):
+    store = IncrementalStore(RunHistory(tmp_path / "history.sqlite"))
+
+    first = store.check_pages([f"{site.url}/"], run_id="run-1")
+    again = store.check_pages([f"{site.url}/"], run_id="run-1")
+
+    assert again == first
+    assert len(site.requests) == 1
+
+
+def test_queued_pages_do_not_time_out_and_do_not_lock_history(site, tmp_path):
+    store = IncrementalStore(RunHistory(tmp_path / "history.sqlite"))
+    store.check_pages([f"{site.url}/warmup"])
+    site.delay = 0.3
+    # 8 страниц по 0.3 с через 2 соединения — около 1.2 с, каждая отвечает быстрее таймаута
+    urls = [f"{site.url}/page-{i}" for i in range(8)]
+    checked = {}
+    thread = threading.Thread(target=lambda: checked.update(store.check_pages(urls, concurrency=2, timeout=1)))
+    thread.start()
+    time.sleep(0.2)
+
+    # Пока идут запросы, другой воркер может писать в историю
+    with closing(sqlite3.connect(tmp_path / "history.sqlite", timeout=0.1)) as connection:
+        connection.execute("BEGIN IMMEDIATE")
+        connection.rollback()
+    thread.join()
+
+    assert sorted(checked) == urls and None not in checked.values()
+
+
+def test_fingerprint_depends_on_code_and_pages(tmp_path):
+    (tmp_path / "page.py").write_text("A = 1")
+    code = code_fingerprint([tmp_path])
+    pages = {"https://site/": "sha-1"}
+
+    assert fingerprint_of(code, pages) == fingerprint_of(code, dict(pages))
+    assert fingerprint_of(code, {"https://site/": "sha-2"}) != fingerprint_of(code, pages)
+    assert fingerprint_of(code, {"https://site/": None}) is None
+    (tmp_path / "page.py").write_text("A = 2")
+    assert code_fingerprint([tmp_path]) != code
+
+
+def test_bound_pages_prefers_parameter_then_markers():
+    def item(params=None, **markers):
+        return SimpleNamespace(
+            callspec=SimpleNamespace(params=params) if params is not None else None,
+            get_closest_marker=lambda name: SimpleNamespace(args=markers[name]) if name in markers else None,
+        )
+
+    assert bound_pages(item({"site_path": "/about"}, pages=("/",))) == ("/about",)
+    assert bound_pages(item(static=("/contacts",), pages=("/",))) == ("/contacts",)
+    assert bound_pages(item(pages=("/", "/about"))) == ("/", "/about")
+    assert bound_pages(item()) == ()
+
+
+def test_only_passed_tests_keep_cached_pass(tmp_path):
+    history = RunHistory(tmp_path / "history.sqlite")
+    store = IncrementalStore(history)
+    recorder = RunRecorder()
+    for nodeid, outcome in (("a", "passed"), ("b", "failed")):
+        recorder.pytest_runtest_logreport(SimpleNamespace(
+            nodeid=nodeid, when="call", outcome=outcome, duration=1.0, failed=outcome == "failed",
+            skipped=False, user_properties=[("page_fingerprint", f"fp-{nodeid}")],
+        ))
+    recorder.pytest_runtest_logreport(SimpleNamespace(
+        nodeid="c", when="call", outcome="passed", duration=0.0, failed=False, skipped=False,
+        user_properties=[("cached_pass", 1)],
+    ))
+    results = {nodeid: tuple(result) for nodeid, result in recorder.results.items()}
+
+    run_id = history.record(results)
+    store.save_results(run_id, recorder.fingerprints, {nodeid: result[0] for nodeid, result in results.items()})
+
+    assert "c" not in results
+    cached = store.cached_passes({"a": "fp-a", "b": "fp-b"})
+    assert list(cached) == ["a"] and cached["a"][0] == run_id
+    assert store.cached_passes({"a": "fp-changed"}) == {}
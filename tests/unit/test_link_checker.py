@@ -0,0 +1,104 @@
+"""Тесты асинхронной проверки ссылок на локальном сервере-заглушке"""
+import json
+
+import pytest
+from tests.shared.link_checker import LinkChecker, normalize_links
+from tests.unit.stub_server import StubRequest, StubResponse
+
+pytestmark = pytest.mark.no_browser
+
+
+def route(request: StubRequest) -> StubResponse:
+    """/ok — 200, /broken — 404, /no-head — 405 на HEAD, /slow — 0.2 с, /slower — 0.3 с"""
+    if request.path == "/broken":
+        return StubResponse(404)
+    if request.path == "/no-head" and request.method == "HEAD":
+        return StubResponse(405)
+    delay = 0.3 if request.path.startswith("/slower") else 0.2 if request.path.startswith("/slow") else 0
+    return StubResponse(200, delay=delay)
+
+
+@pytest.fixture
+def stub_site(stub_server):
+    return stub_server(route)
+
+
+def calls(site) -> list:
+    return [(request.method, request.path) for request in site.requests]
+
+
+def test_normalize_links_dedupes_and_drops_non_http():
+    hrefs = [
+        "https://example.com/a#top",
+        "https://example.com/a",
+        "mailto:info@example.com",
+        "tel:+70000000000",
+        "javascript:void(0)",
+        "",
+        None,
+        "http://example.com/b",
+    ]
+    assert normalize_links(hrefs) == ["http://example.com/b", "https://example.com/a"]
+
+
+def test_reports_broken_links_and_falls_back_to_get(stub_site):
+    urls = [f"{stub_site.url}/ok", f"{stub_site.url}/broken", f"{stub_site.url}/no-head"]
+
+    results = {result.url: result for result in LinkChecker().check(urls)}
+
+    assert results[f"{stub_site.url}/ok"].ok
+    assert results[f"{stub_site.url}/broken"].status == 404
+    assert not results[f"{stub_site.url}/broken"].ok
+    assert results[f"{stub_site.url}/no-head"].ok
+    assert ("GET", "/no-head") in calls(stub_site)
+
+
+def test_limits_concurrency_per_host(stub_site):
+    urls = [f"{stub_site.url}/slow/{i}" for i in range(8)]
+
+    results = LinkChecker(per_host=2).check(urls)
+
+    assert all(result.ok for result in results)
+    assert stub_site.max_active <= 2
+
+
+def test_waiting_for_host_connection_does_not_count_towards_timeout(stub_site):
+    # 12 ссылок по 0.3 с через 2 соединения — около 1.8 с, каждая же отвечает быстрее таймаута
+    urls = [f"{stub_site.url}/slower/{i}" for i in range(12)]
+
+    results = LinkChecker(timeout=1, per_host=2).check(urls)
+
+    assert [result.error for result in results if not result.ok] == []
+    assert stub_site.max_active <= 2
+
+
+def test_timeout_is_reported_as_error(stub_site):
+    result, = LinkChecker(timeout=0.05).check([f"{stub_site.url}/slow"])
+
+    assert not result.ok
+    assert "таймаут" in result.error
+
+
+def test_cache_skips_recently_checked_links(stub_site, tmp_path):
+    cache_path = tmp_path / "links.json"
+    urls = [f"{stub_site.url}/ok", f"{stub_site.url}/broken"]
+
+    LinkChecker(cache_path=cache_path).check(urls)
+    stub_site.requests.clear()
+    LinkChecker(cache_path=cache_path).check(urls)
+
+    # Рабочая ссылка взята из кэша, битая проверена заново
+    assert calls(stub_site) == [("HEAD", "/broken")]
+
+    stub_site.requests.clear()
+    LinkChecker(cache_path=cache_path, ttl=0).check(urls)
+    assert ("HEAD", "/ok") in calls(stub_site)
+
+
+def test_cache_drops_expired_entries(stub_site, tmp_path):
+    cache_path = tmp_path / "links.json"
+    cache_path.write_text(json.dumps({"https://gone.example/": {"status": 200, "checked_at": 0}}))
+
+    LinkChecker(cache_path=cache_path).check([f"{stub_site.url}/ok"])
+
+    assert list(json.loads(cache_path.read_text())) == [f"{stub_site.url}/ok"]
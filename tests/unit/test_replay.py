@@ -0,0 +1,48 @@
+"""Тесты записи сайта в архив и ответов replay-архива"""
+import pytest
+from tests.shared.replay import ReplayArchive, record_site
+from tests.unit.stub_server import StubResponse
+
+pytestmark = pytest.mark.no_browser
+
+PAGES = {
+    "/": b'<link rel="stylesheet" href="/broken.css"><img src="/logo.png"><a href="https://site.test">home</a>',
+    "/logo.png": b"\x89PNG",
+}
+
+
+# Страница с подресурсами; /broken.css обрывает соединение без ответа
+ROUTES = {
+    "/": StubResponse(body=PAGES["/"], headers={"Content-Type": "text/html"}),
+    "/logo.png": StubResponse(body=PAGES["/logo.png"], headers={"Content-Type": "image/png"}),
+    "/broken.css": StubResponse(drop=True),
+}
+
+
+@pytest.fixture
+def site(stub_server):
+    return stub_server(ROUTES).url
+
+
+def test_failed_resource_does_not_stop_recording(site, tmp_path):
+    saved = record_site(site, ["/"], tmp_path)
+
+    archive = ReplayArchive(tmp_path)
+    assert saved == 2 and archive.get("/logo.png")[2] == b"\x89PNG"
+    assert list(archive.failed) == ["/broken.css"]
+
+
+def test_absolute_links_to_site_root_become_root_path(tmp_path):
+    (tmp_path / "bodies").mkdir()
+    (tmp_path / "bodies" / "page").write_bytes(
+        b'<a href="https://site.test">1</a><a href="https://www.site.test/a">2</a>'
+        b'<a href="//site.test?q=1">3</a><a href="https://site.test.other/">4</a>'
+    )
+    (tmp_path / "index.json").write_text(
+        '{"base_url": "https://site.test", "responses": {"/": '
+        '{"status": 200, "headers": {"Content-Type": "text/html"}, "body": "page"}}}'
+    )
+
+    status, headers, body = ReplayArchive(tmp_path).get("/")
+
+    assert body == b'<a href="/">1</a><a href="/a">2</a><a href="/?q=1">3</a><a href="https://site.test.other/">4</a>'
@@ -0,0 +1,106 @@
+"""Тесты реестра сайтов и параллельного прогона сайтов"""
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from tests.shared import sites
+from tests.shared.driver_resolver import ENV_DRIVER_PATH, LOCKFILE_NAME, ROOT_DIR, DriverResolution
+from tests.shared.sites import Site, SiteLimits, SiteRegistry, SiteRun, run_site, site_command
+
+pytestmark = pytest.mark.no_browser
+
+SITE_MODULE = '''
+from tests.shared.sites import Site, SiteLimits
+SITE = Site(name="{name}", base_url="https://{name}", limits=SiteLimits(workers={workers}))
+'''
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """Пакет fake_sites с двумя сайтами; у второго тесты и conftest, которые нельзя импортировать"""
+    package = tmp_path / "fake_sites"
+    for slug, name, workers in (("alpha_ru", "alpha.ru", 1), ("beta_com", "beta.com", 3)):
+        (package / slug).mkdir(parents=True)
+        (package / slug / "__init__.py").write_text("")
+        (package / slug / "site.py").write_text(SITE_MODULE.format(name=name, workers=workers))
+        (package / slug / "conftest.py").write_text("raise RuntimeError('пакет сайта импортирован')")
+    (package / "__init__.py").write_text("")
+    (package / "shared").mkdir()
+    monkeypatch.syspath_prepend(str(tmp_path))
+    return SiteRegistry.discover(package, "fake_sites")
+
+
+def test_registry_reads_only_site_modules(registry, tmp_path):
+    assert [site.slug for site in registry] == ["alpha_ru", "beta_com"]
+    beta = registry.get("beta_com")
+    assert beta.name == "beta.com" and beta.directory == tmp_path / "fake_sites" / "beta_com"
+    assert registry.for_path(beta.directory / "tests" / "test_x.py") == beta
+    assert registry.for_path(tmp_path / "fake_sites" / "shared") is None
+    assert "fake_sites.beta_com.conftest" not in sys.modules
+    with pytest.raises(KeyError, match="alpha_ru, beta_com"):
+        registry.get("gamma")
+
+
+def test_site_command_applies_worker_limit(registry, tmp_path):
+    alpha, beta = registry.get("alpha_ru"), registry.get("beta_com")
+
+    assert "-n" not in site_command(alpha, ["-m", "smoke"])
+    command = site_command(beta, ["-m", "smoke"], history_dir=tmp_path)
+    assert command[command.index("--site") + 1] == "beta_com"
+    assert command[command.index("-n") + 1] == "3"
+    assert command[command.index("--history") + 1] == str(tmp_path / "run-history-beta_com.sqlite")
+    assert command[-2:] == ["-m", "smoke"]
+
+
+def test_parallel_run_finds_lockfile_and_logs_from_repo_root(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv(ENV_DRIVER_PATH, raising=False)
+    lockfiles, log_dirs = [], []
+    monkeypatch.setattr(sites, "resolve_chromedriver", lambda lockfile, offline: (
+        lockfiles.append(lockfile) or DriverResolution("/usr/bin/chromedriver", "lockfile", 0)
+    ))
+    monkeypatch.setattr(sites, "run_site", lambda site, pytest_args, log_dir, env: (
+        log_dirs.append(log_dir) or SiteRun(site, 0, 0, log_dir / f"{site.slug}.log")
+    ))
+
+    assert sites.main([]) == 0
+
+    assert lockfiles == [ROOT_DIR / LOCKFILE_NAME]
+    assert set(log_dirs) == {ROOT_DIR / ".cache" / "sites"}
+    assert not (tmp_path / ".cache").exists()
+
+
+# Процесс сайта запускает «воркера» и ждёт; воркер печатает свой pid и тоже ждёт
+SLOW_SITE = """
+import subprocess, sys, time
+child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+print(child.pid, flush=True)
+time.sleep(30)
+"""
+
+
+def test_site_over_time_limit_is_stopped_with_its_children(tmp_path, monkeypatch):
+    site = Site(name="slow.ru", base_url="https://slow.ru", limits=SiteLimits(timeout=1), slug="slow_ru")
+    monkeypatch.setattr(sites, "site_command", lambda *args: [sys.executable, "-c", SLOW_SITE])
+
+    run = run_site(site, [], tmp_path, env=None)
+
+    assert run.returncode is None and run.seconds < 10
+    assert run.status == "прерван по лимиту 1 с"
+    child = int(run.log.read_text().split()[0])
+    deadline = time.monotonic() + 5
+    while child_alive(child) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not child_alive(child)
+
+
+def child_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # Убитый процесс, которого ещё не забрал init, остаётся зомби
+    stat = Path(f"/proc/{pid}/stat")
+    return not (stat.exists() and stat.read_text().rsplit(")", 1)[-1].split()[0] == "Z")
@@ -0,0 +1,62 @@
+"""Тесты статического анализа HTML"""
+import pytest
+from tests.shared.static_analysis import charset_of, declared_charsets, parse_html
+
+pytestmark = pytest.mark.no_browser
+
+PAGE = """<!doctype html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>  Главная  </title>
+    <link rel="shortcut icon" href="/favicon.png">
+    <link rel="stylesheet" href="/style.css">
+</head>
+<body>
+    <a href="/">Главная</a>
+    <a href="/contacts">Контакты</a>
+    <a name="anchor">без href</a>
+    <form>
+        <input type="text" name="name">
+        <input type="submit" value="Отправить">
+        <select><option>1</option></select>
+        <textarea></textarea>
+        <button>OK</button>
+    </form>
+</body>
+</html>
+"""
+
+
+def test_parse_html_collects_facts():
+    facts = parse_html(PAGE)
+
+    assert facts.title == "Главная"
+    assert facts.meta_charset == "UTF-8"
+    assert facts.favicon_links == ["/favicon.png"]
+    assert facts.hrefs == ["/", "/contacts"]
+    assert facts.links == 2
+    assert facts.buttons == 2
+    assert facts.inputs == 4
+    assert facts.interactive == 8
+
+
+def test_empty_title_is_reported_as_empty():
+    assert parse_html("<title> </title>").title == ""
+    assert parse_html("<p>нет заголовка</p>").title is None
+
+
+def test_charset_of_content_type():
+    assert charset_of("text/html; charset=utf-8") == "utf-8"
+    assert charset_of('text/html; charset="windows-1251"') == "windows-1251"
+    assert charset_of("text/html") is None
+    assert charset_of(None) is None
+
+
+def test_declared_charsets_lists_every_source():
+    facts = parse_html('<meta http-equiv="Content-Type" content="text/html; charset=windows-1251">')
+
+    assert declared_charsets("text/html; charset=UTF-8", facts) == {
+        "Content-Type": "UTF-8",
+        "meta http-equiv": "windows-1251",
+    }
@@ -0,0 +1,90 @@
+"""Тесты профиля шагов Allure"""
+import allure
+import allure_commons
+import pytest
+from selene.core.exceptions import TimeoutException
+from selene.core.wait import Wait
+from tests.shared.commands import command_log
+from tests.shared.step_profiler import StepProfiler, folded_stacks, load_profiles
+
+pytestmark = pytest.mark.no_browser
+
+
+class FakeDriver:
+    def execute(self, driver_command, params=None):
+        return {"value": driver_command}
+
+
+@pytest.fixture
+def profiler():
+    profiler = StepProfiler()
+    allure_commons.plugin_manager.register(profiler)
+    profiler.start_test("test_page")
+    yield profiler
+    allure_commons.plugin_manager.unregister(profiler)
+
+
+def test_nested_steps_record_commands_and_self_time(profiler):
+    driver = FakeDriver()
+    command_log(driver).subscribe(profiler.on_command)
+    command_log(driver).subscribe(profiler.on_command)
+
+    with allure.step("Открыть страницу"):
+        driver.execute("get")
+        with allure.step("Дождаться загрузки"):
+            driver.execute("executeScript")
+            driver.execute("executeScript")
+
+    inner, outer = profiler.records
+    assert inner.path == ("Открыть страницу", "Дождаться загрузки")
+    assert (inner.commands, outer.commands) == (2, 3)
+    assert outer.self_seconds == pytest.approx(outer.seconds - inner.seconds)
+    assert all(record.test == "test_page" for record in profiler.records)
+
+
+def test_failed_step_is_marked(profiler):
+    with pytest.raises(AssertionError):
+        with allure.step("Проверить заголовок"):
+            raise AssertionError
+
+    assert profiler.records[0].failed
+
+
+def test_wait_time_is_counted_until_last_attempt(profiler):
+    attempts = []
+
+    def condition(entity):
+        attempts.append(entity)
+        if len(attempts) < 3:
+            raise AssertionError("ещё нет")
+        return entity
+
+    with allure.step("Дождаться кнопки"):
+        assert Wait("кнопка", at_most=1, _decorator=profiler.wait_decorator).for_(condition) == "кнопка"
+
+    assert len(attempts) == 3
+    assert profiler.records[0].wait_seconds > 0
+
+
+def test_timeout_message_keeps_condition_name(profiler):
+    def button_is_visible(entity):
+        raise AssertionError("не видна")
+
+    with pytest.raises(TimeoutException, match="button_is_visible"):
+        Wait("кнопка", at_most=0.05, _decorator=profiler.wait_decorator).for_(button_is_visible)
+
+
+def test_profiles_are_saved_and_folded_across_runs(profiler, tmp_path):
+    with allure.step("Открыть страницу"):
+        with allure.step("Дождаться загрузки"):
+            pass
+    profiler.write(tmp_path, "1")
+    profiler.write(tmp_path, "2")
+
+    records = load_profiles([tmp_path])
+    stacks = folded_stacks(records)
+
+    assert len(records) == 4
+    assert set(stacks) == {"test_page;Открыть страницу", "test_page;Открыть страницу;Дождаться загрузки"}
+    assert (tmp_path / "steps-1.csv").read_text(encoding="utf-8").count("\n") == 3
+    assert "Открыть страницу" in profiler.lines()[0]
@@ -0,0 +1,83 @@
+"""Тесты перцептивного сравнения снимков и хранилища эталонов"""
+import io
+
+import pytest
+from tests.shared.visual import VisualChecker, VisualStore, compare_images
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+pytestmark = pytest.mark.no_browser
+
+
+def png(pixels) -> bytes:
+    buffer = io.BytesIO()
+    Image.fromarray(np.asarray(pixels, dtype=np.uint8)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def page(width=200, height=100, color=(240, 240, 240)):
+    return np.full((height, width, 3), color, dtype=np.uint8)
+
+
+def test_identical_images_match_without_decoding(monkeypatch):
+    image = png(page())
+    monkeypatch.setattr("tests.shared.visual._decode", lambda data: pytest.fail("снимок не должен декодироваться"))
+
+    assert compare_images(image, image).matched
+
+
+def test_imperceptible_noise_is_tolerated():
+    actual = page()
+    actual[10:20, 10:20] = (242, 241, 240)
+
+    result = compare_images(png(page()), png(actual))
+
+    assert result.matched
+    assert result.diff_ratio == 0
+
+
+def test_changed_region_fails_with_diff_image():
+    actual = page()
+    actual[0:50, 0:100] = (20, 20, 20)
+
+    result = compare_images(png(page()), png(actual))
+
+    assert not result.matched
+    assert result.diff_ratio == pytest.approx(0.25)
+    diff = np.asarray(Image.open(io.BytesIO(result.diff_png)))
+    assert tuple(diff[10, 10]) == (255, 0, 0)
+    assert tuple(diff[90, 190]) != (255, 0, 0)
+
+
+def test_masked_region_is_ignored():
+    actual = page()
+    actual[0:50, 0:100] = (20, 20, 20)
+
+    result = compare_images(png(page()), png(actual), masks=[(0, 0, 100, 50)])
+
+    assert result.matched
+
+
+def test_size_change_is_a_mismatch():
+    result = compare_images(png(page()), png(page(width=150)))
+
+    assert not result.matched
+    assert "150x100" in result.reason
+
+
+def test_checker_creates_updates_and_compares_baselines(tmp_path):
+    store = VisualStore(tmp_path)
+    original, changed = png(page()), png(page(color=(0, 0, 0)))
+
+    with pytest.raises(AssertionError, match="Эталон home/mobile создан"):
+        VisualChecker(store).check("home", "mobile", original)
+    assert store.path("home", "mobile").read_bytes() == original
+    VisualChecker(store).check("home", "mobile", original)
+    VisualChecker(store, update=True).check("home", "desktop", original)
+
+    with pytest.raises(AssertionError, match="home/mobile"):
+        VisualChecker(store).check("home", "mobile", changed)
+
+    VisualChecker(store, update=True).check("home", "mobile", changed)
+    VisualChecker(store).check("home", "mobile", changed)